@@ -1,21 +1,74 @@
-from django.db import transaction
+import hashlib
+from itertools import islice
+from operator import attrgetter
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.http import quote_etag
 
 from ..services.purchase_order import PurchaseOrderService
+from ..services.purchase_order_document import PurchaseOrderDocumentService
+from ..services.supplier_daily_spend import SupplierDailySpendService
+from supplier.model.line_items import LineItem
+from supplier.model.supplier import Supplier
 from supplier.services.line_item import LineItemService
 from supplier.services.supplier import SupplierService
-from order.serializers.purchase_order import PurchaseOrderSerialzier
+from order.cache import get_purchase_order_cache
+from order.exceptions import InvalidOrderTimeFilter, InvalidPurchaseOrderData, PurchaseOrderNotFound
+from order.fieldsets import PurchaseOrderFieldsets
+from order.models.purchase_order import PurchaseOrder
+from order.pagination import PurchaseOrderCursorPagination
+from order.serializers.purchase_order import PurchaseOrderSerialzier, purchase_order_row_serializer
+from sumtracker_project.metrics import PURCHASE_ORDER_LINE_ITEMS, count_rows_written, instrument_service
+from sumtracker_project.performance import measure_serialization
 
 
+@instrument_service
 class PurchaseOrderAPIService:
     """
         Service class to handle operations related to PurchaseOrder instances.
 
         Methods:
         - create(data)
-        - get_by_id(purchase_order_id)
+        - bulk_create(purchase_orders_data)
+        - save_bulk_chunk(chunk, results)
+        - get_bulk_creation_data(data)
+        - get_bulk_supplier_id(supplier_id)
+        - validate_max_length(model, field_name, value, label)
+        - get_by_id(purchase_order_id, query_params, version)
+        - serialize_purchase_order_by_id(purchase_order_id)
+        - serialize_sparse_purchase_order_by_id(purchase_order_id, fieldset)
+        - get_version_by_id(purchase_order_id)
+        - get_etag_by_id(purchase_order_id, query_params, version)
+        - aget_by_id(purchase_order_id, query_params, version)
+        - aserialize_purchase_order_by_id(purchase_order_id)
+        - aserialize_sparse_purchase_order_by_id(purchase_order_id, fieldset)
+        - aget_version_by_id(purchase_order_id)
+        - aget_etag_by_id(purchase_order_id, query_params, version)
         - update(purchase_order_id, data)
         - delete_by_id(purchase_order_id)
+        - invalidate_cached_purchase_orders(purchase_order_ids)
+        - invalidate_cached_purchase_orders_of_suppliers(supplier_ids)
         - get_by_query_params(query_params)
+        - get_etag_by_query_params(query_params)
+        - aget_by_query_params(query_params)
+        - aget_etag_by_query_params(query_params)
+        - make_etag(versions)
+        - get_page_etag_columns(fieldset)
+        - get_page_etag(page, fieldset)
+        - get_purchase_orders_for_query_params(query_params)
+        - get_order_time_filter(query_params, query_param)
+        - iterate_by_query_params(query_params, chunk_size)
+        - serialize_in_chunks(purchase_orders, chunk_size)
+        - serialize_purchase_orders(purchase_orders)
+        - get_purchase_order_rows(purchase_orders, fieldset)
+        - serialize_purchase_order_rows(purchase_order_rows)
+        - serialize_sparse_purchase_order_rows(purchase_order_rows, fieldset)
+        - aserialize_purchase_order_rows(purchase_order_rows)
+        - aserialize_sparse_purchase_order_rows(purchase_order_rows, fieldset)
         - get_supplier_data_from_request(data)
         - get_line_item_data_from_request(data):
         - get_total_quantity_of_order(line_items_data)
@@ -26,7 +79,21 @@ class PurchaseOrderAPIService:
     line_item_service = LineItemService()
     supplier_service = SupplierService()
     purchase_order_service = PurchaseOrderService()
+    purchase_order_document_service = PurchaseOrderDocumentService()
+    supplier_daily_spend_service = SupplierDailySpendService()
+    pagination = PurchaseOrderCursorPagination()
+    fieldsets = PurchaseOrderFieldsets()
+    # columns the ETag of a page is made of, the supplier ones only when the supplier is embedded
+    page_etag_columns = ("id", "version")
+    supplier_etag_columns = ("supplier_id", "supplier__name", "supplier__email")
+    # serialized results of get_by_id(), see the PURCHASE_ORDER_CACHE setting
+    purchase_order_cache = get_purchase_order_cache()
+    # lists and exports serialize values_list() rows instead of model instances, see FAST_SERIALIZATION
+    fast_serialization = settings.FAST_SERIALIZATION
+    # orders written per transaction by bulk_create()
+    bulk_chunk_size = 500
 
+    @count_rows_written("create")
     @transaction.atomic
     def create(self, data):
         """
@@ -40,6 +107,7 @@ class PurchaseOrderAPIService:
         """
         supplier_data = self.get_supplier_data_from_request(data)
         line_items_data = self.get_line_item_data_from_request(data)
+        PURCHASE_ORDER_LINE_ITEMS.observe(len(line_items_data))
         supplier_object = self.supplier_service.update_or_create(**supplier_data)
         total_quantity = self.get_total_quantity_of_order(line_items_data)
         total_amount = self.get_total_amount_of_order(line_items_data)
@@ -53,27 +121,258 @@ class PurchaseOrderAPIService:
         serialized_line_items_after_saving = self.line_item_service.create_all_line_items_for_purchase_order(
             line_items=line_items_data, purchase_order=purchase_order
         )
+        self.purchase_order_document_service.write_documents([purchase_order.id])
+        self.supplier_daily_spend_service.add_purchase_orders([purchase_order.id])
         return {
             **PurchaseOrderSerialzier(purchase_order).data,
             "line_items": serialized_line_items_after_saving,
         }
 
-    def get_by_id(self, purchase_order_id):
+    def bulk_create(self, purchase_orders_data):
+        """
+        Creates many PurchaseOrders with their Suppliers and LineItems.
+
+        The Suppliers of all orders are resolved in one pass, then the orders and their line items
+        are inserted with multi-row INSERTs, one transaction per chunk of bulk_chunk_size orders.
+        An invalid or failing order does not prevent the other orders from being created.
+
+        Args:
+        - purchase_orders_data (list): Data of each PurchaseOrder, in the shape create() accepts.
+
+        Returns:
+        - list: {"id": ...} of the created PurchaseOrder or {"error": ...} for each order, in order.
+        """
+        results = [None] * len(purchase_orders_data)
+        valid_orders = []
+        for index, data in enumerate(purchase_orders_data):
+            try:
+                valid_orders.append((index, self.get_bulk_creation_data(data)))
+            except InvalidPurchaseOrderData as e:
+                results[index] = e.__dict__
+
+        with transaction.atomic():
+            suppliers = self.supplier_service.bulk_update_or_create(
+                [creation_data["supplier_data"] for _, creation_data in valid_orders]
+            )
+        for (_, creation_data), supplier_object in zip(valid_orders, suppliers):
+            creation_data["purchase_order_data"]["supplier_object"] = supplier_object
+
+        for chunk_start in range(0, len(valid_orders), self.bulk_chunk_size):
+            self.save_bulk_chunk(valid_orders[chunk_start:chunk_start + self.bulk_chunk_size], results)
+        return results
+
+    def save_bulk_chunk(self, chunk, results):
+        """
+        Inserts a chunk of (index, creation data) orders of bulk_create() in one transaction, recording
+        the id or the error of each order in results.
+
+        A chunk the database rejects is retried order by order, so only the orders it rejects
+        again are reported as failed.
+        """
+        try:
+            with count_rows_written("bulk_create"), transaction.atomic():
+                purchase_orders = self.purchase_order_service.bulk_create_purchase_orders(
+                    [creation_data["purchase_order_data"] for _, creation_data in chunk]
+                )
+                self.line_item_service.create_line_items_for_purchase_orders(
+                    [
+                        (purchase_order, creation_data["line_items_data"])
+                        for purchase_order, (_, creation_data) in zip(purchase_orders, chunk)
+                    ]
+                )
+                purchase_order_ids = [purchase_order.id for purchase_order in purchase_orders]
+                self.purchase_order_document_service.write_documents(purchase_order_ids)
+                self.supplier_daily_spend_service.add_purchase_orders(purchase_order_ids)
+        except DatabaseError as e:
+            if len(chunk) > 1:
+                for order in chunk:
+                    self.save_bulk_chunk([order], results)
+            else:
+                results[chunk[0][0]] = {"error": f"Purchase order could not be saved: {e}"}
+            return
+        for purchase_order, (index, creation_data) in zip(purchase_orders, chunk):
+            results[index] = {"id": purchase_order.id}
+            PURCHASE_ORDER_LINE_ITEMS.observe(len(creation_data["line_items_data"]))
+
+    def get_bulk_creation_data(self, data):
+        """
+        Extracts and validates the Supplier, LineItems and totals of one order of a bulk request.
+        """
+        if not isinstance(data, dict):
+            raise InvalidPurchaseOrderData("expected an object")
+        for key in ("supplier", "line_items"):
+            if key not in data:
+                raise InvalidPurchaseOrderData(f"missing '{key}'")
+        try:
+            supplier_data = self.get_supplier_data_from_request(data)
+            line_items_data = self.get_line_item_data_from_request(data)
+            supplier_data["supplier_id"] = self.get_bulk_supplier_id(supplier_data["supplier_id"])
+            for field_name in ("name", "email"):
+                if not isinstance(supplier_data[field_name], str):
+                    raise InvalidPurchaseOrderData(f"supplier {field_name} must be a string")
+                self.validate_max_length(Supplier, field_name, supplier_data[field_name], "supplier")
+            purchase_order_data = {
+                "total_quantity": self.get_total_quantity_of_order(line_items_data),
+                "total_amount": self.get_total_amount_of_order(line_items_data),
+                "total_tax": self.get_total_tax_of_order(line_items_data),
+            }
+            for line_item in line_items_data:
+                for field_name in ("item_name", "tax_name"):
+                    if not isinstance(line_item[field_name], str):
+                        raise InvalidPurchaseOrderData(f"line item {field_name} must be a string")
+                    self.validate_max_length(LineItem, field_name, line_item[field_name], "line item")
+        except KeyError as e:
+            raise InvalidPurchaseOrderData(f"missing {e}")
+        except (AttributeError, TypeError, ValueError) as e:
+            raise InvalidPurchaseOrderData(e)
+        return {
+            "supplier_data": supplier_data,
+            "line_items_data": line_items_data,
+            "purchase_order_data": purchase_order_data,
+        }
+
+    def get_bulk_supplier_id(self, supplier_id):
+        """
+        Converts the supplier id of a bulk order to the type of Supplier ids, None when there is none.
+        """
+        if supplier_id in (None, ""):
+            return None
+        try:
+            return Supplier._meta.pk.to_python(supplier_id)
+        except ValidationError:
+            raise InvalidPurchaseOrderData(f"invalid supplier id {supplier_id}")
+
+    def validate_max_length(self, model, field_name, value, label):
         """
-        Retrieves a PurchaseOrder by its ID.
+        Rejects a value too long for its column up front, rather than failing the INSERT of its chunk.
+        """
+        max_length = model._meta.get_field(field_name).max_length
+        if len(value) > max_length:
+            raise InvalidPurchaseOrderData(f"{label} {field_name} is longer than {max_length} characters")
+
+    def get_by_id(self, purchase_order_id, query_params=None, version=None):
+        """
+        Retrieves a PurchaseOrder by its ID, from purchase_order_cache when it is cached at its
+        current version, else from its PurchaseOrderDocument when that is current, else from the tables.
+        A sparse fieldset is always read from the tables, with only the columns it needs.
 
         Args:
         - purchase_order_id (int): ID of the PurchaseOrder.
+        - query_params (dict): Optional fields and include params, see PurchaseOrderFieldsets.
+        - version: The version of the PurchaseOrder from PurchaseOrderService.get_version_by_id(),
+          read here when not given.
 
         Returns:
         - dict: Serialized data of the PurchaseOrder and its LineItems.
         """
+        fieldset = self.fieldsets.parse(query_params or {})
+        if fieldset is not None:
+            return self.serialize_sparse_purchase_order_by_id(purchase_order_id, fieldset)
+        if version is None:
+            version = self.purchase_order_service.get_version_by_id(purchase_order_id)
+        complete_purchase_order_data = self.purchase_order_cache.get(purchase_order_id, version)
+        if complete_purchase_order_data is None:
+            complete_purchase_order_data = (
+                self.purchase_order_document_service.get_document(purchase_order_id)
+                or self.serialize_purchase_order_by_id(purchase_order_id)
+            )
+            self.purchase_order_cache.set(purchase_order_id, version, complete_purchase_order_data)
+        return complete_purchase_order_data
+
+    @measure_serialization()
+    def serialize_purchase_order_by_id(self, purchase_order_id):
+        """
+        Serializes a PurchaseOrder and its LineItems from the tables.
+        """
         purchase_order = self.purchase_order_service.get_purchase_order_object_by_id(purchase_order_id)
         line_items = self.line_item_service.get_items_for_purchase_order(purchase_order)
         complete_purchase_order_data = PurchaseOrderSerialzier(purchase_order).data
         complete_purchase_order_data["line_items"] = line_items
         return complete_purchase_order_data
 
+    def serialize_sparse_purchase_order_by_id(self, purchase_order_id, fieldset):
+        """
+        Serializes the fields of a PurchaseOrder in the fieldset, with its LineItems only when included.
+        """
+        purchase_order_row = self.get_purchase_order_rows(
+            PurchaseOrder.objects.filter(id=purchase_order_id), fieldset
+        ).first()
+        if purchase_order_row is None:
+            raise PurchaseOrderNotFound(purchase_order_id)
+        return self.serialize_sparse_purchase_order_rows([purchase_order_row], fieldset)[0]
+
+    def get_version_by_id(self, purchase_order_id):
+        """
+        Reads the version of a PurchaseOrder, to build its ETag and read it at that same version
+        with get_by_id(), so the body served is never older than its ETag.
+        """
+        return self.purchase_order_service.get_version_by_id(purchase_order_id)
+
+    def get_etag_by_id(self, purchase_order_id, query_params=None, version=None):
+        """
+        Builds the ETag of the data get_by_id() returns from the version of the PurchaseOrder,
+        with a single query that neither loads the LineItems nor serializes anything, or none
+        when the version is given.
+        """
+        versions = version if version is not None else self.purchase_order_service.get_version_by_id(purchase_order_id)
+        fieldset = self.fieldsets.parse(query_params or {})
+        return self.make_etag(versions if fieldset is None else [versions, fieldset])
+
+    async def aget_by_id(self, purchase_order_id, query_params=None, version=None):
+        """
+        Async version of get_by_id(), serializing from the tables with the row serializers.
+        """
+        fieldset = self.fieldsets.parse(query_params or {})
+        if fieldset is not None:
+            return await self.aserialize_sparse_purchase_order_by_id(purchase_order_id, fieldset)
+        if version is None:
+            version = await self.purchase_order_service.aget_version_by_id(purchase_order_id)
+        complete_purchase_order_data = await self.purchase_order_cache.aget(purchase_order_id, version)
+        if complete_purchase_order_data is None:
+            complete_purchase_order_data = (
+                await self.purchase_order_document_service.aget_document(purchase_order_id)
+                or await self.aserialize_purchase_order_by_id(purchase_order_id)
+            )
+            await self.purchase_order_cache.aset(purchase_order_id, version, complete_purchase_order_data)
+        return complete_purchase_order_data
+
+    async def aserialize_purchase_order_by_id(self, purchase_order_id):
+        """
+        Async version of serialize_purchase_order_by_id(), reading a values_list() row.
+        """
+        purchase_order_row = await self.get_purchase_order_rows(
+            PurchaseOrder.objects.filter(id=purchase_order_id)
+        ).afirst()
+        if purchase_order_row is None:
+            raise PurchaseOrderNotFound(purchase_order_id)
+        return (await self.aserialize_purchase_order_rows([purchase_order_row]))[0]
+
+    async def aserialize_sparse_purchase_order_by_id(self, purchase_order_id, fieldset):
+        """
+        Async version of serialize_sparse_purchase_order_by_id().
+        """
+        purchase_order_row = await self.get_purchase_order_rows(
+            PurchaseOrder.objects.filter(id=purchase_order_id), fieldset
+        ).afirst()
+        if purchase_order_row is None:
+            raise PurchaseOrderNotFound(purchase_order_id)
+        return (await self.aserialize_sparse_purchase_order_rows([purchase_order_row], fieldset))[0]
+
+    async def aget_version_by_id(self, purchase_order_id):
+        """
+        Async version of get_version_by_id().
+        """
+        return await self.purchase_order_service.aget_version_by_id(purchase_order_id)
+
+    async def aget_etag_by_id(self, purchase_order_id, query_params=None, version=None):
+        """
+        Async version of get_etag_by_id().
+        """
+        versions = version if version is not None else await self.purchase_order_service.aget_version_by_id(purchase_order_id)
+        fieldset = self.fieldsets.parse(query_params or {})
+        return self.make_etag(versions if fieldset is None else [versions, fieldset])
+
+    @count_rows_written("update")
     @transaction.atomic
     def update(self, purchase_order_id, data):
         """
@@ -88,10 +387,13 @@ class PurchaseOrderAPIService:
         """
         supplier_data = self.get_supplier_data_from_request(data)
         line_items_data = self.get_line_item_data_from_request(data)
+        PURCHASE_ORDER_LINE_ITEMS.observe(len(line_items_data))
         supplier_object = self.supplier_service.update_or_create(**supplier_data)
         total_quantity = self.get_total_quantity_of_order(line_items_data)
         total_amount = self.get_total_amount_of_order(line_items_data)
         total_tax = self.get_total_tax_of_order(line_items_data)
+        # the order leaves the rollup of its previous supplier and totals, locked until the commit
+        self.supplier_daily_spend_service.remove_purchase_orders([purchase_order_id])
         purchase_order = self.update_purchase_order_by_id(
             purchase_order_id=purchase_order_id,
             updated_quantity=total_quantity,
@@ -102,25 +404,147 @@ class PurchaseOrderAPIService:
         serialized_line_items_after_saving = self.line_item_service.update_all_line_items_for_purchase_order(
             line_items=line_items_data, purchase_order=purchase_order
         )
+        self.purchase_order_document_service.write_documents([purchase_order.id])
+        self.supplier_daily_spend_service.add_purchase_orders([purchase_order.id])
+        self.invalidate_cached_purchase_orders([purchase_order.id])
         return {
             **PurchaseOrderSerialzier(purchase_order).data,
             "line_items": serialized_line_items_after_saving,
         }
 
+    @count_rows_written("delete")
+    @transaction.atomic
     def delete_by_id(self, purchase_order_id):
         """
         Deletes a PurchaseOrder by its ID.
         """
         purchase_order_object = self.purchase_order_service.get_purchase_order_object_by_id(purchase_order_id)
+        self.supplier_daily_spend_service.remove_purchase_orders([purchase_order_id])
         purchase_order_object.delete()
+        self.invalidate_cached_purchase_orders([purchase_order_id])
+
+    def invalidate_cached_purchase_orders(self, purchase_order_ids):
+        """
+        Drops PurchaseOrders from purchase_order_cache, right away and again once the current
+        transaction commits, so a read racing the transaction cannot leave the old data cached.
+        """
+        self.purchase_order_cache.delete_many(purchase_order_ids)
+        transaction.on_commit(lambda: self.purchase_order_cache.delete_many(purchase_order_ids))
+
+    def invalidate_cached_purchase_orders_of_suppliers(self, supplier_ids):
+        """
+        Drops the PurchaseOrders of changed Suppliers from purchase_order_cache, like
+        invalidate_cached_purchase_orders does.
+        """
+        self.purchase_order_cache.delete_for_suppliers(supplier_ids)
+        transaction.on_commit(lambda: self.purchase_order_cache.delete_for_suppliers(supplier_ids))
 
     def get_by_query_params(self, query_params):
         """
-        Retrieves PurchaseOrders based on query parameters.
+        Retrieves a page of PurchaseOrders based on query parameters.
+
+        Args:
+        - query_params (dict): Optional supplier_name, item_name, order_time_from and order_time_to filters
+          with the limit and cursor of the page, and the fields and include params of a sparse fieldset.
+
+        Returns:
+        - tuple: The Page, with serialized data of the PurchaseOrders and the cursors around it, and its
+          ETag, built from the rows of the page itself so it always matches the data returned.
+        """
+        purchase_orders = self.get_purchase_orders_for_query_params(query_params)
+        fieldset = self.fieldsets.parse(query_params)
+        if fieldset is not None:
+            page = self.pagination.paginate_queryset(self.get_purchase_order_rows(purchase_orders, fieldset), query_params)
+            results = self.serialize_sparse_purchase_order_rows(page.results, fieldset)
+        elif self.fast_serialization:
+            page = self.pagination.paginate_queryset(self.get_purchase_order_rows(purchase_orders), query_params)
+            results = self.serialize_purchase_order_rows(page.results)
+        else:
+            page = self.pagination.paginate_queryset(purchase_orders, query_params)
+            results = self.serialize_purchase_orders(page.results)
+        return page._replace(results=results), self.get_page_etag(page, fieldset)
+
+    def get_etag_by_query_params(self, query_params):
+        """
+        Builds the ETag of the page get_by_query_params() would return now, to answer an unchanged page
+        with 304 Not Modified. The response to a changed one carries the ETag get_by_query_params()
+        returns, of the page it has read.
+
+        The page is fetched with the same keyset query but only with the columns the ETag is made of,
+        the versions of its PurchaseOrders and the fields of their Suppliers, so an unchanged page is
+        answered without loading its LineItems.
+        """
+        fieldset = self.fieldsets.parse(query_params)
+        purchase_orders = self.get_purchase_orders_for_query_params(query_params).values_list(
+            "order_time", *self.get_page_etag_columns(fieldset), named=True
+        )
+        return self.get_page_etag(self.pagination.paginate_queryset(purchase_orders, query_params), fieldset)
+
+    async def aget_by_query_params(self, query_params):
+        """
+        Async version of get_by_query_params(), always serializing values_list() rows.
+        """
+        purchase_orders = self.get_purchase_orders_for_query_params(query_params)
+        fieldset = self.fieldsets.parse(query_params)
+        if fieldset is not None:
+            page = await self.pagination.apaginate_queryset(
+                self.get_purchase_order_rows(purchase_orders, fieldset), query_params
+            )
+            results = await self.aserialize_sparse_purchase_order_rows(page.results, fieldset)
+        else:
+            page = await self.pagination.apaginate_queryset(self.get_purchase_order_rows(purchase_orders), query_params)
+            results = await self.aserialize_purchase_order_rows(page.results)
+        return page._replace(results=results), self.get_page_etag(page, fieldset)
+
+    async def aget_etag_by_query_params(self, query_params):
+        """
+        Async version of get_etag_by_query_params().
+        """
+        fieldset = self.fieldsets.parse(query_params)
+        purchase_orders = self.get_purchase_orders_for_query_params(query_params).values_list(
+            "order_time", *self.get_page_etag_columns(fieldset), named=True
+        )
+        return self.get_page_etag(await self.pagination.apaginate_queryset(purchase_orders, query_params), fieldset)
+
+    def make_etag(self, versions):
+        """
+        Hashes the version markers of a response into a strong ETag.
+        """
+        return quote_etag(hashlib.md5(repr(versions).encode(), usedforsecurity=False).hexdigest())
+
+    def get_page_etag_columns(self, fieldset):
+        if fieldset is not None and "supplier" not in fieldset.include:
+            return list(self.page_etag_columns)
+        return list(self.page_etag_columns + self.supplier_etag_columns)
+
+    def get_page_etag(self, page, fieldset):
+        """
+        Builds the ETag of a page of rows of get_purchase_order_rows() or of PurchaseOrders, from the
+        versions of the orders, the fields of their Suppliers when embedded and the cursors around it.
+        """
+        columns = self.get_page_etag_columns(fieldset)
+        # model instances hold the supplier columns on their supplier
+        get_versions = attrgetter(*(column.replace("__", ".") for column in columns))
+        versions = [
+            [
+                get_versions(purchase_order) if isinstance(purchase_order, PurchaseOrder)
+                else tuple(getattr(purchase_order, column) for column in columns)
+                for purchase_order in page.results
+            ],
+            page.next_cursor,
+            page.prev_cursor,
+        ]
+        return self.make_etag(versions if fieldset is None else versions + [fieldset])
+
+    def get_purchase_orders_for_query_params(self, query_params):
+        """
+        Builds the PurchaseOrders queryset matching the filters in the query parameters.
+        order_time_from and order_time_to select the orders placed in [order_time_from, order_time_to).
         """
         supplier_name = query_params.get("supplier_name")
         item_name = query_params.get("item_name")
-        response_data = []
+        order_time_from = self.get_order_time_filter(query_params, "order_time_from")
+        order_time_to = self.get_order_time_filter(query_params, "order_time_to")
         if supplier_name and item_name:
             purchase_orders = self.purchase_order_service.get_purchase_orders_by_supplier_name_and_line_item_name(
                 supplier_name=supplier_name,
@@ -128,30 +552,150 @@ class PurchaseOrderAPIService:
             )
         elif supplier_name:
             purchase_orders = self.purchase_order_service.get_purchase_orders_by_supplier_name(supplier_name)
-        else:
+        elif item_name:
             purchase_orders = self.purchase_order_service.get_purchase_orders_by_item_name(item_name)
-        for purchase_order in purchase_orders:
-            line_items = self.line_item_service.get_items_for_purchase_order(purchase_order)
-            response_data.append(
-                {
-                    **PurchaseOrderSerialzier(purchase_order).data,
-                    "line_items": line_items,
-                }
+        else:
+            purchase_orders = self.purchase_order_service.get_all_purchase_orders()
+        return self.purchase_order_service.filter_by_order_time(
+            purchase_orders, order_time_from=order_time_from, order_time_to=order_time_to
+        )
+
+    def get_order_time_filter(self, query_params, query_param):
+        """
+        Parses an ISO 8601 date and time query param, read in TIME_ZONE when it has no offset.
+        """
+        value = query_params.get(query_param)
+        if not value:
+            return None
+        try:
+            order_time = parse_datetime(value)
+        except ValueError:
+            order_time = None
+        if order_time is None:
+            raise InvalidOrderTimeFilter(query_param, value)
+        if timezone.is_naive(order_time):
+            order_time = timezone.make_aware(order_time)
+        return order_time
+
+    def iterate_by_query_params(self, query_params, chunk_size=2000):
+        """
+        Returns an iterator of the serialized PurchaseOrders matching the query parameters, ordered by id.
+
+        The orders are read through a server-side cursor and serialized chunk by chunk,
+        so memory use is bounded by chunk_size rather than by the number of orders.
+        Invalid filters raise here rather than once the iteration starts.
+        """
+        purchase_orders = self.get_purchase_orders_for_query_params(query_params).order_by("id")
+        if self.fast_serialization:
+            purchase_orders = self.get_purchase_order_rows(purchase_orders)
+        return self.serialize_in_chunks(purchase_orders.iterator(chunk_size=chunk_size), chunk_size)
+
+    def serialize_in_chunks(self, purchase_orders, chunk_size):
+        """
+        Yields the serialized PurchaseOrders of an iterator, serializing chunk_size of them at a time.
+        """
+        while chunk := list(islice(purchase_orders, chunk_size)):
+            if self.fast_serialization:
+                yield from self.serialize_purchase_order_rows(chunk)
+            else:
+                yield from self.serialize_purchase_orders(chunk)
+
+    @measure_serialization()
+    def serialize_purchase_orders(self, purchase_orders):
+        """
+        Serializes PurchaseOrders with their Supplier and LineItems.
+
+        The supplier is expected to be joined by the queryset and the line items of all
+        orders are loaded in one query, so the number of queries does not grow with the
+        number of orders.
+        """
+        purchase_orders = list(purchase_orders)
+        line_items_by_purchase_order = self.line_item_service.get_items_for_purchase_orders(purchase_orders)
+        serialized_purchase_orders = PurchaseOrderSerialzier(purchase_orders, many=True).data
+        return [
+            {
+                **serialized_purchase_order,
+                "line_items": line_items_by_purchase_order[purchase_order.id],
+            }
+            for purchase_order, serialized_purchase_order in zip(purchase_orders, serialized_purchase_orders)
+        ]
+
+    def get_purchase_order_rows(self, purchase_orders, fieldset=None):
+        """
+        Turns a PurchaseOrders queryset into one of the named row tuples purchase_order_row_serializer reads,
+        or the row serializer of the fieldset when one is given, followed by the columns of the ETag of
+        their page, which the row serializers ignore.
+        """
+        columns = self.fieldsets.get_columns(fieldset) if fieldset is not None else purchase_order_row_serializer.columns
+        etag_columns = [column for column in self.get_page_etag_columns(fieldset) if column not in columns]
+        return purchase_orders.values_list(*columns, *etag_columns, named=True)
+
+    def serialize_purchase_order_rows(self, purchase_order_rows):
+        """
+        Same as serialize_purchase_orders for rows of get_purchase_order_rows(), producing the same
+        data without building model instances or running the DRF serializers.
+        """
+        purchase_order_rows = list(purchase_order_rows)
+        line_items_by_purchase_order = self.line_item_service.get_item_rows_for_purchase_orders(
+            [purchase_order_row.id for purchase_order_row in purchase_order_rows],
+            [purchase_order_row.order_time for purchase_order_row in purchase_order_rows],
+        )
+        return [
+            {
+                **serialized_purchase_order,
+                "line_items": line_items_by_purchase_order[serialized_purchase_order["id"]],
+            }
+            for serialized_purchase_order in purchase_order_row_serializer.serialize_rows(purchase_order_rows)
+        ]
+
+    @measure_serialization()
+    def serialize_sparse_purchase_order_rows(self, purchase_order_rows, fieldset):
+        """
+        Same as serialize_purchase_order_rows for rows of get_purchase_order_rows() with a fieldset,
+        querying the LineItems only when the fieldset includes them.
+        """
+        purchase_order_rows = list(purchase_order_rows)
+        serialized_purchase_orders = self.fieldsets.get_row_serializer(fieldset).serialize_rows(purchase_order_rows)
+        if "line_items" in fieldset.include:
+            line_items_by_purchase_order = self.line_item_service.get_item_rows_for_purchase_orders(
+                [purchase_order_row.id for purchase_order_row in purchase_order_rows],
+                [purchase_order_row.order_time for purchase_order_row in purchase_order_rows],
             )
-        return response_data
-
-    def get_all_purchase_orders(self):
-        response_data = []
-        purchase_orders = self.purchase_order_service.get_all_purchase_orders()
-        for purchase_order in purchase_orders:
-            line_items = self.line_item_service.get_items_for_purchase_order(purchase_order)
-            response_data.append(
-                {
-                    **PurchaseOrderSerialzier(purchase_order).data,
-                    "line_items": line_items,
-                }
+            for purchase_order_row, serialized_purchase_order in zip(purchase_order_rows, serialized_purchase_orders):
+                serialized_purchase_order["line_items"] = line_items_by_purchase_order[purchase_order_row.id]
+        return serialized_purchase_orders
+
+    async def aserialize_purchase_order_rows(self, purchase_order_rows):
+        """
+        Async version of serialize_purchase_order_rows().
+        """
+        purchase_order_rows = list(purchase_order_rows)
+        line_items_by_purchase_order = await self.line_item_service.aget_item_rows_for_purchase_orders(
+            [purchase_order_row.id for purchase_order_row in purchase_order_rows],
+            [purchase_order_row.order_time for purchase_order_row in purchase_order_rows],
+        )
+        return [
+            {
+                **serialized_purchase_order,
+                "line_items": line_items_by_purchase_order[serialized_purchase_order["id"]],
+            }
+            for serialized_purchase_order in purchase_order_row_serializer.serialize_rows(purchase_order_rows)
+        ]
+
+    async def aserialize_sparse_purchase_order_rows(self, purchase_order_rows, fieldset):
+        """
+        Async version of serialize_sparse_purchase_order_rows().
+        """
+        purchase_order_rows = list(purchase_order_rows)
+        serialized_purchase_orders = self.fieldsets.get_row_serializer(fieldset).serialize_rows(purchase_order_rows)
+        if "line_items" in fieldset.include:
+            line_items_by_purchase_order = await self.line_item_service.aget_item_rows_for_purchase_orders(
+                [purchase_order_row.id for purchase_order_row in purchase_order_rows],
+                [purchase_order_row.order_time for purchase_order_row in purchase_order_rows],
             )
-        return response_data
+            for purchase_order_row, serialized_purchase_order in zip(purchase_order_rows, serialized_purchase_orders):
+                serialized_purchase_order["line_items"] = line_items_by_purchase_order[purchase_order_row.id]
+        return serialized_purchase_orders
 
     def get_supplier_data_from_request(self, data):
         """
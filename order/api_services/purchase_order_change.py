@@ -0,0 +1,96 @@
+from ..services.purchase_order import PurchaseOrderService
+from ..services.purchase_order_change import PurchaseOrderChangeService
+from .purchase_order import PurchaseOrderAPIService
+from order.pagination import PurchaseOrderChangePagination
+from order.serializers.purchase_order import PurchaseOrderChangeSerializer
+from sumtracker_project.metrics import instrument_service
+
+
+@instrument_service
+class PurchaseOrderChangeAPIService:
+    """
+        Service class for the change feed of PurchaseOrders, read from the PurchaseOrderChanges so
+        clients can sync the orders written since their last read instead of all of them.
+
+        Methods:
+        - get_changes_by_query_params(query_params)
+        - serialize_changes(changes)
+        - serialize_current_purchase_orders(changes)
+    """
+    purchase_order_change_service = PurchaseOrderChangeService()
+    purchase_order_service = PurchaseOrderService()
+    purchase_order_api_service = PurchaseOrderAPIService()
+    pagination = PurchaseOrderChangePagination()
+
+    def get_changes_by_query_params(self, query_params):
+        """
+        Retrieves a batch of the changes after a cursor.
+
+        Args:
+        - query_params (dict): since, the next_cursor of the previous batch, omitted to read from the
+          oldest change kept, and the limit of changes read.
+
+        Returns:
+        - dict: The serialized changes with the next_cursor to read from and whether more changes
+          are already waiting.
+        """
+        limit = self.pagination.get_limit(query_params)
+        cursor = self.pagination.decode_cursor(query_params.get(self.pagination.since_query_param))
+        changes = self.purchase_order_change_service.get_changes_after(
+            transaction_id=cursor.transaction_id if cursor else None,
+            change_id=cursor.id if cursor else None,
+            limit=limit + 1,
+        )
+        page = self.pagination.get_page(changes, limit, cursor)
+        return {
+            "changes": self.serialize_changes(page.results),
+            "next_cursor": self.pagination.encode_cursor(page.next_cursor),
+            "has_more": page.has_more,
+        }
+
+    def serialize_changes(self, changes):
+        """
+        Serializes the last change of each PurchaseOrder in changes, in the order of those changes,
+        with the current data of the orders written.
+
+        An order deleted after the change read is left out, its tombstone comes later in the feed.
+        """
+        last_changes = {}
+        for change in changes:
+            last_changes.pop(change.purchase_order_id, None)
+            last_changes[change.purchase_order_id] = change
+        serialized_purchase_orders = self.serialize_current_purchase_orders(
+            [change for change in last_changes.values() if not change.deleted]
+        )
+        serialized_changes = []
+        for change, serialized_change in zip(
+            last_changes.values(), PurchaseOrderChangeSerializer(last_changes.values(), many=True).data
+        ):
+            if change.deleted:
+                serialized_changes.append({**serialized_change, "purchase_order": None})
+            elif change.purchase_order_id in serialized_purchase_orders:
+                serialized_changes.append(
+                    {**serialized_change, "purchase_order": serialized_purchase_orders[change.purchase_order_id]}
+                )
+        return serialized_changes
+
+    def serialize_current_purchase_orders(self, changes):
+        """
+        Serializes the PurchaseOrders of changes by id, read from the partitions of their order_time.
+        """
+        if not changes:
+            return {}
+        purchase_orders = self.purchase_order_service.get_all_purchase_orders().filter(
+            id__in=[change.purchase_order_id for change in changes],
+            order_time__in={change.order_time for change in changes},
+        )
+        if self.purchase_order_api_service.fast_serialization:
+            serialized_purchase_orders = self.purchase_order_api_service.serialize_purchase_order_rows(
+                self.purchase_order_api_service.get_purchase_order_rows(purchase_orders)
+            )
+        else:
+            serialized_purchase_orders = self.purchase_order_api_service.serialize_purchase_orders(purchase_orders)
+        return {
+            serialized_purchase_order["id"]: serialized_purchase_order
+            for serialized_purchase_order in serialized_purchase_orders
+        }
@@ -0,0 +1,61 @@
+from django.utils.dateparse import parse_date
+
+from ..services.supplier_daily_spend import SupplierDailySpendService
+from order.exceptions import InvalidReportFilter
+from order.serializers.purchase_order import SupplierDailySpendSerializer
+from sumtracker_project.metrics import instrument_service
+
+
+@instrument_service
+class SupplierDailySpendAPIService:
+    """
+        Service class for the supplier daily spend report, read from the SupplierDailySpend rollups
+        instead of aggregating the PurchaseOrders on every request.
+
+        Methods:
+        - get_report_by_query_params(query_params)
+        - get_date_filter(query_params, query_param)
+        - get_supplier_filter(query_params)
+    """
+    supplier_daily_spend_service = SupplierDailySpendService()
+    # longest date range of a report, so a request cannot read the rollups of every day at once
+    max_report_days = 366
+
+    def get_report_by_query_params(self, query_params):
+        """
+        Retrieves the spend of each supplier per day.
+
+        Args:
+        - query_params (dict): date_from and date_to, days in YYYY-MM-DD both included, and an optional supplier_id.
+
+        Returns:
+        - list: Serialized spend of a supplier on a day, ordered by day and supplier.
+        """
+        date_from = self.get_date_filter(query_params, "date_from")
+        date_to = self.get_date_filter(query_params, "date_to")
+        if date_to < date_from:
+            raise InvalidReportFilter("date_to", date_to, f"a day from date_from {date_from} on")
+        if (date_to - date_from).days >= self.max_report_days:
+            raise InvalidReportFilter("date_to", date_to, f"at most {self.max_report_days} days from date_from")
+        rollups = self.supplier_daily_spend_service.get_report(
+            date_from=date_from, date_to=date_to, supplier_id=self.get_supplier_filter(query_params)
+        )
+        return SupplierDailySpendSerializer(rollups, many=True).data
+
+    def get_date_filter(self, query_params, query_param):
+        value = query_params.get(query_param)
+        try:
+            day = parse_date(value or "")
+        except ValueError:
+            day = None
+        if day is None:
+            raise InvalidReportFilter(query_param, value, "a day in YYYY-MM-DD")
+        return day
+
+    def get_supplier_filter(self, query_params):
+        value = query_params.get("supplier_id")
+        if not value:
+            return None
+        if not value.isdigit():
+            raise InvalidReportFilter("supplier_id", value, "a supplier id")
+        return int(value)
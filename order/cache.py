@@ -0,0 +1,156 @@
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+from sumtracker_project.lru_cache import LRUCache
+
+
+class PurchaseOrderCache:
+    """
+    Base class of the caches of serialized PurchaseOrders, line items included, keyed by PurchaseOrder id.
+
+    Every entry is stored with the version of the PurchaseOrder it was serialized at, as returned by
+    PurchaseOrderService.get_version_by_id(), and is only returned for that same version. A write
+    only invalidates the entries of the process making it, so this is what keeps the other processes
+    from serving the data from before the write.
+
+    Methods:
+    - get(purchase_order_id, version)
+    - aget(purchase_order_id, version)
+    - set(purchase_order_id, version, purchase_order_data)
+    - aset(purchase_order_id, version, purchase_order_data)
+    - delete_many(purchase_order_ids)
+    - delete_for_suppliers(supplier_ids)
+    - stats()
+    """
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, purchase_order_id, version):
+        entry = self.get_entry(purchase_order_id)
+        if entry is None or entry["version"] != version:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry["data"]
+
+    async def aget(self, purchase_order_id, version):
+        return await sync_to_async(self.get)(purchase_order_id, version)
+
+    async def aset(self, purchase_order_id, version, purchase_order_data):
+        await sync_to_async(self.set)(purchase_order_id, version, purchase_order_data)
+
+    def stats(self):
+        """
+        Returns the hit and miss counts of this process.
+        """
+        return {"hits": self.hits, "misses": self.misses}
+
+    def get_entry(self, purchase_order_id):
+        """
+        Returns the {"version": ..., "data": ...} entry of a PurchaseOrder, None when there is none.
+        """
+        raise NotImplementedError
+
+    def set(self, purchase_order_id, version, purchase_order_data):
+        raise NotImplementedError
+
+    def delete_many(self, purchase_order_ids):
+        raise NotImplementedError
+
+    def delete_for_suppliers(self, supplier_ids):
+        """
+        Drops the PurchaseOrders of the given Suppliers, whose data is serialized with them.
+        """
+        raise NotImplementedError
+
+
+class LocalPurchaseOrderCache(PurchaseOrderCache):
+    """
+    Keeps the PurchaseOrders in the memory of each process, bounded by max_size entries.
+    """
+    def __init__(self, max_size=1000, ttl=300):
+        super().__init__()
+        self.entries = LRUCache(max_size=max_size, ttl=ttl)
+
+    # nothing here blocks, the event loop does not need to hand these to a thread
+    async def aget(self, purchase_order_id, version):
+        return self.get(purchase_order_id, version)
+
+    async def aset(self, purchase_order_id, version, purchase_order_data):
+        self.set(purchase_order_id, version, purchase_order_data)
+
+    def get_entry(self, purchase_order_id):
+        return self.entries.get(purchase_order_id)
+
+    def set(self, purchase_order_id, version, purchase_order_data):
+        self.entries.set(purchase_order_id, {"version": version, "data": purchase_order_data})
+
+    def delete_many(self, purchase_order_ids):
+        for purchase_order_id in purchase_order_ids:
+            self.entries.delete(purchase_order_id)
+
+    def delete_for_suppliers(self, supplier_ids):
+        supplier_ids = set(supplier_ids)
+        self.entries.delete_matching(
+            lambda purchase_order_id, entry: entry["data"]["supplier"]["id"] in supplier_ids
+        )
+
+
+class DjangoPurchaseOrderCache(PurchaseOrderCache):
+    """
+    Keeps the PurchaseOrders in one of the caches of the CACHES setting, shared between processes.
+
+    Shared caches cannot be searched by Supplier, so every entry records the version of its Supplier
+    at the time it was written and changing a Supplier replaces that version, which turns the
+    entries of all its PurchaseOrders into misses.
+    """
+    def __init__(self, cache_alias="default", ttl=300, key_prefix="purchase_order"):
+        super().__init__()
+        self.cache = caches[cache_alias]
+        self.ttl = ttl
+        self.key_prefix = key_prefix
+
+    def get_entry(self, purchase_order_id):
+        entry = self.cache.get(self.get_purchase_order_key(purchase_order_id))
+        if entry is None:
+            return None
+        supplier_version = self.cache.get(self.get_supplier_key(entry["data"]["supplier"]["id"]))
+        if entry["supplier_version"] != supplier_version:
+            return None
+        return entry
+
+    def set(self, purchase_order_id, version, purchase_order_data):
+        supplier_version = self.cache.get(self.get_supplier_key(purchase_order_data["supplier"]["id"]))
+        self.cache.set(
+            self.get_purchase_order_key(purchase_order_id),
+            {"supplier_version": supplier_version, "version": version, "data": purchase_order_data},
+            timeout=self.ttl,
+        )
+
+    def delete_many(self, purchase_order_ids):
+        self.cache.delete_many([self.get_purchase_order_key(purchase_order_id) for purchase_order_id in purchase_order_ids])
+
+    def delete_for_suppliers(self, supplier_ids):
+        # versions are random so that one evicted from the cache cannot come back with an old value
+        self.cache.set_many(
+            {self.get_supplier_key(supplier_id): uuid.uuid4().hex for supplier_id in supplier_ids}, timeout=None
+        )
+
+    def get_purchase_order_key(self, purchase_order_id):
+        return f"{self.key_prefix}:{purchase_order_id}"
+
+    def get_supplier_key(self, supplier_id):
+        return f"{self.key_prefix}:supplier_version:{supplier_id}"
+
+
+def get_purchase_order_cache():
+    """
+    Builds the cache configured by the PURCHASE_ORDER_CACHE setting.
+    """
+    backend = import_string(settings.PURCHASE_ORDER_CACHE["BACKEND"])
+    return backend(**settings.PURCHASE_ORDER_CACHE.get("OPTIONS", {}))
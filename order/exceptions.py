@@ -1,3 +1,51 @@
 class PurchaseOrderNotFound(Exception):
     def __init__(self, purchase_order_id):
         self.error = f"Purchase id not found for id {purchase_order_id}"
+
+
+class InvalidCursor(Exception):
+    def __init__(self, cursor):
+        self.error = f"Invalid cursor {cursor}"
+
+
+class ExpiredChangeCursor(Exception):
+    def __init__(self, cursor, retention_days):
+        self.error = (
+            f"Expired cursor {cursor}, changes are only kept for {retention_days} days, "
+            f"sync the purchase orders in full again"
+        )
+
+
+class InvalidPageLimit(Exception):
+    def __init__(self, limit):
+        self.error = f"Invalid limit {limit}, expected a positive integer"
+
+
+class InvalidExportFormat(Exception):
+    def __init__(self, export_format, supported_formats):
+        self.error = f"Invalid export format {export_format}, expected one of {', '.join(supported_formats)}"
+
+
+class InvalidPurchaseOrderData(Exception):
+    def __init__(self, reason):
+        self.error = f"Invalid purchase order data: {reason}"
+
+
+class InvalidOrderTimeFilter(Exception):
+    def __init__(self, query_param, value):
+        self.error = f"Invalid {query_param} {value}, expected an ISO 8601 date and time"
+
+
+class InvalidFieldset(Exception):
+    def __init__(self, query_param, names, supported_names):
+        self.error = f"Invalid {query_param} {', '.join(names)}, expected any of {', '.join(supported_names)}"
+
+
+class InvalidReportFilter(Exception):
+    def __init__(self, query_param, value, expected):
+        self.error = f"Invalid {query_param} {value}, expected {expected}"
+
+
+class PurchaseOrderPartitioningError(Exception):
+    def __init__(self, reason):
+        self.error = f"Cannot change the purchase order partitions, {reason}"
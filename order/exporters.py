@@ -0,0 +1,102 @@
+import csv
+import json
+import zlib
+
+from rest_framework.utils.encoders import JSONEncoder
+
+from order.exceptions import InvalidExportFormat
+
+# Rows are joined into blocks of about this size before they are handed to the response,
+# so the server does not write (and gzip does not flush) once per row
+STREAM_BLOCK_SIZE = 64 * 1024
+
+
+class Echo:
+    """
+    File-like object handing back whatever csv.writer writes to it.
+    """
+    def write(self, value):
+        return value
+
+
+class NDJSONExporter:
+    """
+    Writes one serialized PurchaseOrder, line items included, per line.
+    """
+    content_type = "application/x-ndjson"
+    extension = "ndjson"
+
+    def rows(self, serialized_purchase_orders):
+        encoder = JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+        for serialized_purchase_order in serialized_purchase_orders:
+            yield encoder.encode(serialized_purchase_order) + "\n"
+
+
+class CSVExporter:
+    """
+    Writes one row per LineItem, repeating the PurchaseOrder and Supplier columns.
+    PurchaseOrders without LineItems are written as a single row with empty LineItem columns.
+    """
+    content_type = "text/csv"
+    extension = "csv"
+    purchase_order_columns = ["id", "order_number", "order_time", "total_quantity", "total_amount", "total_tax"]
+    supplier_columns = ["id", "name", "email"]
+    line_item_columns = ["id", "item_name", "quantity", "price_without_tax", "tax_name", "tax_total", "line_total"]
+
+    def header(self):
+        return (
+            self.purchase_order_columns
+            + [f"supplier_{column}" for column in self.supplier_columns]
+            + [f"line_item_{column}" for column in self.line_item_columns]
+        )
+
+    def rows(self, serialized_purchase_orders):
+        writer = csv.writer(Echo())
+        yield writer.writerow(self.header())
+        empty_line_item = dict.fromkeys(self.line_item_columns, "")
+        for serialized_purchase_order in serialized_purchase_orders:
+            purchase_order_values = [serialized_purchase_order[column] for column in self.purchase_order_columns]
+            purchase_order_values += [serialized_purchase_order["supplier"][column] for column in self.supplier_columns]
+            for line_item in serialized_purchase_order["line_items"] or [empty_line_item]:
+                yield writer.writerow(purchase_order_values + [line_item[column] for column in self.line_item_columns])
+
+
+EXPORTERS = {
+    "ndjson": NDJSONExporter,
+    "csv": CSVExporter,
+}
+
+
+def get_exporter(export_format):
+    try:
+        return EXPORTERS[export_format]()
+    except KeyError:
+        raise InvalidExportFormat(export_format, EXPORTERS.keys())
+
+
+def iter_blocks(rows, block_size=STREAM_BLOCK_SIZE):
+    """
+    Groups text rows into encoded blocks of roughly block_size bytes.
+    """
+    block, size = [], 0
+    for row in rows:
+        encoded_row = row.encode()
+        block.append(encoded_row)
+        size += len(encoded_row)
+        if size >= block_size:
+            yield b"".join(block)
+            block, size = [], 0
+    if block:
+        yield b"".join(block)
+
+
+def gzip_blocks(blocks):
+    """
+    Compresses a stream of blocks into a single gzip member without buffering the whole stream.
+    """
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for block in blocks:
+        compressed = compressor.compress(block)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
@@ -0,0 +1,82 @@
+from collections import namedtuple
+
+from rest_framework.serializers import BaseSerializer
+
+from order.exceptions import InvalidFieldset
+from order.serializers.purchase_order import PurchaseOrderSerialzier
+from sumtracker_project.row_serializer import RowSerializer
+
+Fieldset = namedtuple("Fieldset", ["fields", "include"])
+
+
+class PurchaseOrderFieldsets:
+    """
+        Sparse fieldsets of PurchaseOrders, read from the 'fields' and 'include' query params.
+
+        'fields' names the plain fields of PurchaseOrderSerialzier to return and 'include' the
+        embedded supplier and line_items. Without either param the whole representation is
+        returned. With 'fields' alone nothing is embedded, with 'include' alone every plain field is
+        returned. Only the columns of the requested fields are selected, the supplier is only joined
+        when it is included and the line items are only queried when they are.
+
+        Methods:
+        - parse(query_params)
+        - parse_names(query_params, query_param, supported_names)
+        - get_row_serializer(fieldset)
+        - get_columns(fieldset)
+    """
+    fields_query_param = "fields"
+    include_query_param = "include"
+    embedded_names = ("supplier", "line_items")
+    # selected even when not requested, the pagination and the line items are keyed on them
+    key_columns = ("id", "order_time")
+
+    def __init__(self):
+        self.field_names = tuple(
+            field_name for field_name, field in PurchaseOrderSerialzier().fields.items()
+            if not isinstance(field, BaseSerializer)
+        )
+        self.row_serializers = {}
+
+    def parse(self, query_params):
+        """
+        Returns the Fieldset requested by the query params, None when the whole representation is.
+        """
+        if self.fields_query_param not in query_params and self.include_query_param not in query_params:
+            return None
+        fields = self.parse_names(query_params, self.fields_query_param, self.field_names)
+        include = self.parse_names(query_params, self.include_query_param, self.embedded_names)
+        if fields is None:
+            fields = self.field_names
+        return Fieldset(fields=fields, include=include or ())
+
+    def parse_names(self, query_params, query_param, supported_names):
+        """
+        Reads a comma separated list of names, in the order of supported_names.
+        """
+        value = query_params.get(query_param)
+        if value is None:
+            return None
+        names = {name.strip() for name in value.split(",") if name.strip()}
+        unsupported_names = sorted(names.difference(supported_names))
+        if unsupported_names:
+            raise InvalidFieldset(query_param, unsupported_names, supported_names)
+        return tuple(name for name in supported_names if name in names)
+
+    def get_row_serializer(self, fieldset):
+        """
+        Returns the RowSerializer of the fieldset, the line items being serialized separately.
+        """
+        row_serializer = self.row_serializers.get(fieldset)
+        if row_serializer is None:
+            fields = fieldset.fields + (("supplier",) if "supplier" in fieldset.include else ())
+            row_serializer = self.row_serializers[fieldset] = RowSerializer(PurchaseOrderSerialzier, fields=fields)
+        return row_serializer
+
+    def get_columns(self, fieldset):
+        """
+        Returns the values_list() columns of the fieldset: those of its row serializer followed by
+        the key columns it does not select already, which the row serializer ignores.
+        """
+        columns = self.get_row_serializer(fieldset).columns
+        return columns + [column for column in self.key_columns if column not in columns]
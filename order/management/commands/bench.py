@@ -0,0 +1,243 @@
+import json
+import math
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.urls import reverse
+
+from order.services.purchase_order_document import PurchaseOrderDocumentService
+from order.tests.factory.purchase_order import PurchaseOrderFactory
+from supplier.model.line_items import LineItem
+from supplier.model.supplier import Supplier
+from supplier.tests.factory.line_item import LineItemFactory
+from supplier.tests.factory.supplier import SupplierFactory
+
+ENDPOINTS = ["create", "get", "list", "search", "update", "delete"]
+
+
+def percentile(sorted_values, fraction):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return 0.0
+    return sorted_values[max(math.ceil(fraction * len(sorted_values)) - 1, 0)]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks the purchase order API in process: seeds a supplier with orders and line items through "
+        "the test factories, drives create, get by id, list, search, update and delete through the full "
+        "request stack from concurrent threads, and reports the latency percentiles, throughput and database "
+        "queries per request of each endpoint. The seeded and created rows are deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--orders", type=int, default=200, help="Seeded purchase orders")
+        parser.add_argument("--line-items-per-order", type=int, default=5)
+        parser.add_argument("--requests", type=int, default=500, help="Requests per endpoint")
+        parser.add_argument("--concurrency", type=int, default=8, help="Threads sending requests")
+        parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=ENDPOINTS)
+        parser.add_argument("--output", help="Write the results as JSON to this file")
+        parser.add_argument("--compare", help="JSON results of an earlier run to compare with")
+        parser.add_argument("--keep", action="store_true", help="Keep the seeded rows")
+
+    def handle(self, *args, **options):
+        if options["orders"] < 1:
+            raise CommandError("--orders must be at least 1, the reads and updates go to the seeded orders")
+        baseline = self.read_results(options["compare"]) if options["compare"] else None
+        started_at = datetime.now(timezone.utc)
+        supplier = self.seed(options)
+        try:
+            results = {}
+            for endpoint in options["endpoints"]:
+                jobs = getattr(self, f"get_{endpoint}_jobs")(supplier, options["requests"])
+                results[endpoint] = self.run(jobs, options["concurrency"])
+                self.report(endpoint, results[endpoint], baseline)
+        finally:
+            if not options["keep"]:
+                # cascades to every order of the supplier, the ones created by the benchmark included
+                Supplier.objects.filter(id=supplier.id).delete()
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump({
+                    "started_at": started_at.isoformat(),
+                    "options": {
+                        key: options[key]
+                        for key in ("orders", "line_items_per_order", "requests", "concurrency", "endpoints")
+                    },
+                    "results": results,
+                }, output, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def read_results(self, path):
+        try:
+            with open(path) as results_file:
+                return json.load(results_file)["results"]
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(f"Cannot read the results to compare with from {path}: {e}")
+
+    def seed(self, options):
+        """
+        Creates a supplier of its own with the orders read and updated by the benchmark, plus one
+        order per request for the delete endpoint.
+        """
+        orders = options["orders"] + (options["requests"] if "delete" in options["endpoints"] else 0)
+        with transaction.atomic():
+            supplier = SupplierFactory.create(name=f"bench supplier {uuid.uuid4().hex[:8]}")
+            purchase_orders = PurchaseOrderFactory.create_batch(size=orders, supplier=supplier)
+            LineItem.objects.bulk_create([
+                line_item
+                for purchase_order in purchase_orders
+                for line_item in LineItemFactory.build_batch(
+                    size=options["line_items_per_order"], purchase_order=purchase_order, item_name="bench item"
+                )
+            ])
+            PurchaseOrderDocumentService().write_documents([purchase_order.id for purchase_order in purchase_orders])
+        self.stdout.write(f"Seeded {orders} orders with {options['line_items_per_order']} line items each")
+        purchase_order_ids = [purchase_order.id for purchase_order in purchase_orders]
+        supplier.purchase_order_ids = purchase_order_ids[:options["orders"]]
+        supplier.deleted_purchase_order_ids = purchase_order_ids[options["orders"]:]
+        return supplier
+
+    def get_supplier_data(self, supplier):
+        return {"id": supplier.id, "name": supplier.name, "email": supplier.email}
+
+    def get_read_order_ids(self, supplier, requests):
+        return [supplier.purchase_order_ids[i % len(supplier.purchase_order_ids)] for i in range(requests)]
+
+    def get_create_jobs(self, supplier, requests):
+        data = {
+            "supplier": self.get_supplier_data(supplier),
+            "line_items": [
+                {"item_name": "bench item", "quantity": 2, "price_without_tax": "10.00",
+                 "tax_name": "GST 5%", "tax_amount": "0.50"}
+            ],
+        }
+        return [("post", reverse("purchase_order_creation"), data, 201)] * requests
+
+    def get_get_jobs(self, supplier, requests):
+        return [
+            ("get", reverse("purchase_order_view", kwargs={"purchase_order_id": purchase_order_id}), None, 200)
+            for purchase_order_id in self.get_read_order_ids(supplier, requests)
+        ]
+
+    def get_list_jobs(self, supplier, requests):
+        return [("get", f"{reverse('purchase_order_creation')}?limit=50", None, 200)] * requests
+
+    def get_search_jobs(self, supplier, requests):
+        query = urlencode({"limit": 50, "supplier_name": supplier.name, "item_name": "bench"})
+        path = f"{reverse('purchase_order_creation')}?{query}"
+        return [("get", path, None, 200)] * requests
+
+    def get_update_jobs(self, supplier, requests):
+        line_item_ids = {}
+        for line_item_id, purchase_order_id in LineItem.objects.filter(
+            purchase_order_id__in=supplier.purchase_order_ids
+        ).values_list("id", "purchase_order_id"):
+            line_item_ids.setdefault(purchase_order_id, []).append(line_item_id)
+        jobs = []
+        for i, purchase_order_id in enumerate(self.get_read_order_ids(supplier, requests)):
+            data = {
+                "id": purchase_order_id,
+                "supplier": self.get_supplier_data(supplier),
+                "line_items": [
+                    # a different quantity on every pass so each update writes
+                    {"id": line_item_id, "item_name": "bench item", "quantity": i % 5 + 1,
+                     "price_without_tax": "10.00", "tax_name": "GST 5%", "tax_amount": "0.50"}
+                    for line_item_id in line_item_ids[purchase_order_id]
+                ],
+            }
+            jobs.append(("put", reverse("purchase_order_view", kwargs={"purchase_order_id": purchase_order_id}), data, 200))
+        return jobs
+
+    def get_delete_jobs(self, supplier, requests):
+        return [
+            ("delete", reverse("purchase_order_view", kwargs={"purchase_order_id": purchase_order_id}), None, 204)
+            for purchase_order_id in supplier.deleted_purchase_order_ids
+        ]
+
+    def run(self, jobs, concurrency):
+        """
+        Sends the jobs from concurrency threads, each taking every concurrency-th job.
+        """
+        started_at = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            samples = [
+                sample
+                for thread_samples in executor.map(self.send, [jobs[i::concurrency] for i in range(concurrency)])
+                for sample in thread_samples
+            ]
+        duration = time.perf_counter() - started_at
+        latencies = sorted(latency for latency, queries, ok in samples)
+        queries = [queries for latency, queries, ok in samples]
+        return {
+            "requests": len(samples),
+            "errors": sum(1 for latency, queries, ok in samples if not ok),
+            "concurrency": concurrency,
+            "duration_s": duration,
+            "throughput_rps": len(samples) / duration if duration else 0.0,
+            "latency_ms": {
+                "p50": percentile(latencies, 0.50),
+                "p95": percentile(latencies, 0.95),
+                "p99": percentile(latencies, 0.99),
+                "max": latencies[-1] if latencies else 0.0,
+            },
+            "queries_per_request": {
+                "mean": sum(queries) / len(queries) if queries else 0.0,
+                "max": max(queries, default=0),
+            },
+        }
+
+    def send(self, jobs):
+        """
+        Sends jobs one after the other, timing each and counting the queries it runs on the database
+        connection of this thread.
+        """
+        client = Client()
+        samples = []
+        query_count = [0]
+
+        def count_query(execute, sql, params, many, context):
+            query_count[0] += 1
+            return execute(sql, params, many, context)
+
+        try:
+            with connection.execute_wrapper(count_query):
+                for method, path, data, expected_status in jobs:
+                    query_count[0] = 0
+                    kwargs = {} if data is None else {"data": json.dumps(data), "content_type": "application/json"}
+                    started_at = time.perf_counter()
+                    response = getattr(client, method)(path, **kwargs)
+                    latency = (time.perf_counter() - started_at) * 1000
+                    samples.append((latency, query_count[0], response.status_code == expected_status))
+        finally:
+            connection.close()
+        return samples
+
+    def report(self, endpoint, result, baseline):
+        latency = result["latency_ms"]
+        line = (
+            f"{endpoint:>6}: {result['throughput_rps']:7.1f} req/s, p50 {latency['p50']:6.1f} ms, "
+            f"p95 {latency['p95']:6.1f} ms, p99 {latency['p99']:6.1f} ms, "
+            f"{result['queries_per_request']['mean']:.1f} queries/request, {result['errors']} errors"
+        )
+        previous = (baseline or {}).get(endpoint)
+        if previous:
+            line += (
+                f" | vs baseline: throughput {self.change(previous['throughput_rps'], result['throughput_rps'])}, "
+                f"p95 {self.change(previous['latency_ms']['p95'], latency['p95'])}, "
+                f"queries {previous['queries_per_request']['mean']:.1f} -> {result['queries_per_request']['mean']:.1f}"
+            )
+        self.stdout.write(line)
+
+    def change(self, previous, current):
+        if not previous:
+            return "n/a"
+        return f"{(current - previous) / previous * 100:+.0f}%"
@@ -0,0 +1,130 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from order.api_services.purchase_order import PurchaseOrderAPIService
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds suppliers, purchase orders and line items and measures the latency of the "
+        "supplier_name / item_name searches with and without the trigram indexes. "
+        "The seeded rows are rolled back at the end unless --keep is given."
+    )
+    purchase_order_api_service = PurchaseOrderAPIService()
+
+    def add_arguments(self, parser):
+        parser.add_argument("--suppliers", type=int, default=10_000)
+        parser.add_argument("--orders", type=int, default=500_000)
+        parser.add_argument("--line-items", type=int, default=5_000_000)
+        parser.add_argument("--distinct-item-names", type=int, default=100_000)
+        parser.add_argument("--runs", type=int, default=5, help="Timed runs per search")
+        parser.add_argument("--limit", type=int, default=50, help="Page size of every search")
+        parser.add_argument("--keep", action="store_true", help="Keep the seeded rows")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.seed(options)
+                self.report_indexes()
+                for query_params in self.get_searches():
+                    self.benchmark(query_params, options["runs"], options["limit"])
+                if not options["keep"]:
+                    raise Rollback
+        except Rollback:
+            self.stdout.write("Seeded rows rolled back")
+
+    def seed(self, options):
+        started_at = time.perf_counter()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                WITH seeded AS (
+                    INSERT INTO suppliers (name, email)
+                    SELECT 'supplier ' || md5(i::text), 'supplier' || i || '@example.com'
+                    FROM generate_series(1, %s) i
+                    RETURNING id
+                )
+                SELECT min(id), max(id) FROM seeded
+                """,
+                [options["suppliers"]],
+            )
+            first_supplier_id, last_supplier_id = cursor.fetchone()
+            cursor.execute(
+                """
+                WITH seeded AS (
+                    INSERT INTO purchase_orders (supplier_id, order_time, total_quantity, total_amount, total_tax)
+                    SELECT %s + i %% (%s - %s + 1), now() - i * interval '1 minute', 1, 10.50, 0.50
+                    FROM generate_series(1, %s) i
+                    RETURNING id
+                )
+                SELECT min(id), max(id) FROM seeded
+                """,
+                [first_supplier_id, last_supplier_id, first_supplier_id, options["orders"]],
+            )
+            first_order_id, last_order_id = cursor.fetchone()
+            cursor.execute(
+                """
+                INSERT INTO line_items (purchase_order_id, order_time, item_name, quantity, price_without_tax,
+                                        tax_name, tax_total, line_total)
+                SELECT po.id, po.order_time, 'item ' || md5((i %% %s)::text), 1, 10.00, 'GST 5%%', 0.50, 10.50
+                FROM generate_series(1, %s) i
+                JOIN purchase_orders po ON po.id = %s + i %% (%s - %s + 1)
+                """,
+                [options["distinct_item_names"], options["line_items"], first_order_id, last_order_id, first_order_id],
+            )
+            cursor.execute("ANALYZE suppliers")
+            cursor.execute("ANALYZE purchase_orders")
+            cursor.execute("ANALYZE line_items")
+        self.stdout.write(
+            f"Seeded {options['suppliers']} suppliers, {options['orders']} orders and "
+            f"{options['line_items']} line items in {time.perf_counter() - started_at:.1f}s"
+        )
+
+    def report_indexes(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT indexname FROM pg_indexes WHERE indexname LIKE %s ORDER BY indexname", ["%_trgm_idx"])
+            trigram_indexes = [row[0] for row in cursor.fetchall()]
+        self.stdout.write(f"Trigram indexes: {', '.join(trigram_indexes) or 'none, pg_trgm is not installed'}")
+
+    def get_searches(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT substr(name, 12, 6) FROM suppliers ORDER BY id DESC LIMIT 1")
+            supplier_term = cursor.fetchone()[0]
+            cursor.execute("SELECT substr(item_name, 8, 6) FROM line_items ORDER BY id DESC LIMIT 1")
+            item_term = cursor.fetchone()[0]
+        return [
+            {"supplier_name": supplier_term},
+            {"item_name": item_term},
+            {"supplier_name": supplier_term, "item_name": item_term},
+            # matches every line item, an index cannot help here
+            {"item_name": "item"},
+        ]
+
+    def benchmark(self, query_params, runs, limit):
+        purchase_orders = self.purchase_order_api_service.get_purchase_orders_for_query_params(query_params)
+        purchase_orders = purchase_orders.order_by("order_time", "id")[:limit]
+        indexed = self.time_query(purchase_orders, runs)
+        with connection.cursor() as cursor:
+            # GIN indexes are only read through bitmap scans
+            cursor.execute("SET LOCAL enable_bitmapscan = off")
+        sequential = self.time_query(purchase_orders, runs)
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_bitmapscan = on")
+        self.stdout.write(
+            f"{query_params}: median {indexed:.1f} ms with indexes, {sequential:.1f} ms without bitmap scans"
+        )
+
+    def time_query(self, purchase_orders, runs):
+        timings = []
+        for _ in range(runs):
+            started_at = time.perf_counter()
+            list(purchase_orders.all())
+            timings.append((time.perf_counter() - started_at) * 1000)
+        return statistics.median(timings)
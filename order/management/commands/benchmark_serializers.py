@@ -0,0 +1,111 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from rest_framework.renderers import JSONRenderer
+
+from order.api_services.purchase_order import PurchaseOrderAPIService
+from order.models.purchase_order import PurchaseOrder
+from supplier.model.line_items import LineItem
+from supplier.serializers.line_items import LineItemSerializer, line_item_row_serializer
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds purchase orders with line items and compares the DRF serializers with the row serializers "
+        "of FAST_SERIALIZATION: line items alone, and whole orders as the list and export serialize them. "
+        "Fails when the JSON of both paths differs. The seeded rows are rolled back."
+    )
+    purchase_order_api_service = PurchaseOrderAPIService()
+
+    def add_arguments(self, parser):
+        parser.add_argument("--line-items", type=int, default=100_000)
+        parser.add_argument("--line-items-per-order", type=int, default=10)
+        parser.add_argument("--runs", type=int, default=5, help="Timed runs per path")
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                purchase_order_ids = self.seed(options["line_items"], options["line_items_per_order"])
+                self.benchmark_line_items(purchase_order_ids, options["runs"])
+                self.benchmark_purchase_orders(purchase_order_ids, options["runs"])
+                raise Rollback
+        except Rollback:
+            self.stdout.write("Seeded rows rolled back")
+
+    def seed(self, line_items, line_items_per_order):
+        orders = max(line_items // line_items_per_order, 1)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO suppliers (name, email) VALUES ('benchmark supplier', 'benchmark@example.com') "
+                "ON CONFLICT (name, email) DO UPDATE SET name = EXCLUDED.name RETURNING id"
+            )
+            supplier_id = cursor.fetchone()[0]
+            cursor.execute(
+                """
+                INSERT INTO purchase_orders (supplier_id, order_time, total_quantity, total_amount, total_tax)
+                SELECT %s, now() - i * interval '1.5 second', %s, 10.5 * %s, 0.5 * %s
+                FROM generate_series(1, %s) i
+                RETURNING id
+                """,
+                [supplier_id, line_items_per_order, line_items_per_order, line_items_per_order, orders],
+            )
+            purchase_order_ids = [row[0] for row in cursor.fetchall()]
+            cursor.execute(
+                """
+                INSERT INTO line_items (purchase_order_id, order_time, item_name, quantity, price_without_tax,
+                                        tax_name, tax_total, line_total)
+                SELECT po.id, po.order_time, 'item ' || n, 1, 10.00 + n / 100.0, 'GST 5%%', 0.50, 10.50 + n / 100.0
+                FROM purchase_orders po, generate_series(1, %s) n
+                WHERE po.id = ANY(%s)
+                """,
+                [line_items_per_order, purchase_order_ids],
+            )
+        self.stdout.write(f"Seeded {len(purchase_order_ids)} orders with {len(purchase_order_ids) * line_items_per_order} line items")
+        return purchase_order_ids
+
+    def benchmark_line_items(self, purchase_order_ids, runs):
+        line_items = LineItem.objects.filter(purchase_order_id__in=purchase_order_ids).order_by("id")
+        instances = list(line_items)
+        rows = list(line_items.values_list(*line_item_row_serializer.columns))
+        self.compare(
+            f"{len(instances)} line items, serialization only",
+            lambda: LineItemSerializer(instances, many=True).data,
+            lambda: line_item_row_serializer.serialize_rows(rows),
+            runs,
+        )
+
+    def benchmark_purchase_orders(self, purchase_order_ids, runs):
+        purchase_orders = PurchaseOrder.objects.select_related("supplier").filter(id__in=purchase_order_ids).order_by("id")
+        api_service = self.purchase_order_api_service
+        self.compare(
+            f"{len(purchase_order_ids)} orders with their line items, queries included",
+            lambda: api_service.serialize_purchase_orders(purchase_orders.all()),
+            lambda: api_service.serialize_purchase_order_rows(api_service.get_purchase_order_rows(purchase_orders.all())),
+            runs,
+        )
+
+    def compare(self, label, serialize_with_drf, serialize_with_rows, runs):
+        drf_output = JSONRenderer().render(serialize_with_drf())
+        rows_output = JSONRenderer().render(serialize_with_rows())
+        if drf_output != rows_output:
+            raise CommandError(f"{label}: the row serializers render different JSON than the DRF serializers")
+        drf_timing = self.time(serialize_with_drf, runs)
+        rows_timing = self.time(serialize_with_rows, runs)
+        self.stdout.write(
+            f"{label}: DRF serializers {drf_timing:.0f} ms, row serializers {rows_timing:.0f} ms "
+            f"({drf_timing / rows_timing:.1f}x), identical {len(drf_output)} bytes of JSON"
+        )
+
+    def time(self, serialize, runs):
+        timings = []
+        for _ in range(runs):
+            started_at = time.perf_counter()
+            serialize()
+            timings.append((time.perf_counter() - started_at) * 1000)
+        return statistics.median(timings)
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from supplier.services.search_index import TrigramIndexService
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates the pg_trgm extension and the trigram indexes of the supplier name and item name searches "
+        "which are missing, e.g. because pg_trgm was not available when supplier migration 0002 was applied. "
+        "The indexes are built concurrently, without blocking writes."
+    )
+    trigram_index_service = TrigramIndexService()
+
+    def handle(self, *args, **options):
+        if not self.trigram_index_service.is_available():
+            raise CommandError("pg_trgm is not available, install the PostgreSQL contrib package first")
+        created_indexes = self.trigram_index_service.create_indexes()
+        if created_indexes:
+            self.stdout.write(self.style.SUCCESS(f"Created {', '.join(created_indexes)}"))
+        else:
+            self.stdout.write("No trigram index to create")
@@ -0,0 +1,227 @@
+import csv
+import json
+import os
+import time
+from itertools import groupby, islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from order.api_services.purchase_order import PurchaseOrderAPIService
+from order.exceptions import InvalidPurchaseOrderData
+from order.models.purchase_order import PurchaseOrder
+from order.services.purchase_order_partition import PurchaseOrderPartitionService
+from supplier.model.line_items import LineItem
+
+PURCHASE_ORDER_COLUMNS = ["id", "supplier_id", "order_time", "total_quantity", "total_amount", "total_tax"]
+LINE_ITEM_COLUMNS = [
+    "purchase_order_id", "order_time", "item_name", "quantity", "price_without_tax", "tax_name", "tax_total", "line_total"
+]
+CSV_COLUMNS = [
+    "order_ref", "order_time", "supplier_id", "supplier_name", "supplier_email",
+    "item_name", "quantity", "price_without_tax", "tax_name", "tax_amount",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports purchase orders from an NDJSON file, one order per line in the shape POST /purchase/orders/ "
+        "accepts plus an optional order_time, or from a CSV file with one line item per row and the columns "
+        f"{', '.join(CSV_COLUMNS)}, rows of one order sharing the same consecutive order_ref. "
+        "Orders and line items are written with COPY, one transaction per chunk. After a failed chunk the "
+        "import can be continued from that chunk with --resume."
+    )
+    purchase_order_api_service = PurchaseOrderAPIService()
+    purchase_order_partition_service = PurchaseOrderPartitionService()
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=["ndjson", "csv"], help="Defaults to the file extension")
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Orders per transaction")
+        parser.add_argument("--resume", action="store_true", help="Skip the orders imported by a previous run")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        import_format = options["format"] or os.path.splitext(path)[1].lstrip(".").lower()
+        if import_format not in ("ndjson", "csv"):
+            raise CommandError(f"Cannot tell the format of {path}, use --format")
+        checkpoint_path = f"{path}.checkpoint"
+        imported_orders = self.read_checkpoint(checkpoint_path) if options["resume"] else 0
+        if imported_orders:
+            self.stdout.write(f"Resuming after {imported_orders} orders")
+
+        started_at = time.perf_counter()
+        total_orders = total_line_items = 0
+        with open(path, newline="", encoding="utf-8") as file:
+            records = self.read_ndjson(file) if import_format == "ndjson" else self.read_csv(file)
+            records = islice(records, imported_orders, None)
+            while chunk := list(islice(records, options["chunk_size"])):
+                chunk_started_at = time.perf_counter()
+                try:
+                    with transaction.atomic():
+                        line_items_count = self.import_chunk(chunk, first_record=imported_orders + 1)
+                except Exception as e:
+                    raise CommandError(
+                        f"Chunk starting at order {imported_orders + 1} failed, nothing of it was imported: {e}\n"
+                        f"Fix the input and rerun with --resume to continue from this chunk"
+                    )
+                imported_orders += len(chunk)
+                self.write_checkpoint(checkpoint_path, imported_orders)
+                total_orders += len(chunk)
+                total_line_items += line_items_count
+                elapsed = time.perf_counter() - chunk_started_at
+                self.stdout.write(
+                    f"Imported orders up to {imported_orders}: {len(chunk) / elapsed:.0f} orders/s, "
+                    f"{line_items_count / elapsed:.0f} line items/s"
+                )
+
+        elapsed = time.perf_counter() - started_at
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {total_orders} orders and {total_line_items} line items in {elapsed:.1f}s "
+            f"({total_orders / elapsed:.0f} orders/s, {total_line_items / elapsed:.0f} line items/s)"
+        ))
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+
+    def read_ndjson(self, file):
+        for line_number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                raise CommandError(f"Line {line_number} is not valid JSON: {e}")
+
+    def read_csv(self, file):
+        reader = csv.DictReader(file)
+        missing_columns = set(CSV_COLUMNS) - set(reader.fieldnames or [])
+        if missing_columns:
+            raise CommandError(f"Missing CSV columns: {', '.join(sorted(missing_columns))}")
+        for order_ref, rows in groupby(reader, key=lambda row: row["order_ref"]):
+            rows = list(rows)
+            try:
+                quantities = [int(row["quantity"]) for row in rows if row["item_name"]]
+            except ValueError as e:
+                raise CommandError(f"Order {order_ref} has an invalid quantity: {e}")
+            yield {
+                "order_time": rows[0]["order_time"] or None,
+                "supplier": {
+                    "id": rows[0]["supplier_id"] or None,
+                    "name": rows[0]["supplier_name"],
+                    "email": rows[0]["supplier_email"],
+                },
+                "line_items": [
+                    {
+                        "item_name": row["item_name"],
+                        "quantity": quantity,
+                        "price_without_tax": row["price_without_tax"],
+                        "tax_name": row["tax_name"],
+                        "tax_amount": row["tax_amount"],
+                    }
+                    for row, quantity in zip([row for row in rows if row["item_name"]], quantities)
+                ],
+            }
+
+    def import_chunk(self, chunk, first_record):
+        """
+        Writes one chunk of orders, returning the number of line items written.
+        """
+        orders = []
+        for record_number, data in enumerate(chunk, start=first_record):
+            try:
+                order_time = self.get_order_time(data)
+                orders.append((order_time, self.purchase_order_api_service.get_bulk_creation_data(data)))
+            except InvalidPurchaseOrderData as e:
+                raise CommandError(f"Order {record_number}: {e.error}")
+
+        connection = connections[DEFAULT_DB_ALIAS]
+        purchase_order_fields = [PurchaseOrder._meta.get_field(column) for column in PURCHASE_ORDER_COLUMNS]
+        line_item_fields = [LineItem._meta.get_field(column) for column in LINE_ITEM_COLUMNS]
+        suppliers = self.purchase_order_api_service.supplier_service.bulk_update_or_create(
+            [creation_data["supplier_data"] for _, creation_data in orders]
+        )
+        purchase_order_ids = self.allocate_purchase_order_ids(connection, len(orders))
+        # past orders may predate the partitions created ahead of time
+        self.purchase_order_partition_service.ensure_partitions([order_time for order_time, _ in orders])
+
+        purchase_order_rows = []
+        line_item_rows = []
+        for purchase_order_id, supplier, (order_time, creation_data) in zip(purchase_order_ids, suppliers, orders):
+            purchase_order_data = creation_data["purchase_order_data"]
+            purchase_order_rows.append(self.get_db_values(connection, purchase_order_fields, {
+                "id": purchase_order_id,
+                "supplier_id": supplier.id,
+                "order_time": order_time,
+                **purchase_order_data,
+            }))
+            for line_item_data in creation_data["line_items_data"]:
+                line_item_rows.append(self.get_db_values(connection, line_item_fields, {
+                    "purchase_order_id": purchase_order_id,
+                    "order_time": order_time,
+                    "item_name": line_item_data["item_name"],
+                    "quantity": line_item_data["quantity"],
+                    "price_without_tax": line_item_data["price_without_tax"],
+                    "tax_name": line_item_data["tax_name"],
+                    "tax_total": line_item_data["tax_amount"],
+                    # the same computation LineItem.save() does
+                    "line_total": LineItem.calculate_line_total(
+                        line_item_data["tax_amount"], line_item_data["price_without_tax"]
+                    ),
+                }))
+
+        # order_number and the line item ids are left to their column defaults
+        self.copy_rows(connection, PurchaseOrder._meta.db_table, PURCHASE_ORDER_COLUMNS, purchase_order_rows)
+        self.copy_rows(connection, LineItem._meta.db_table, LINE_ITEM_COLUMNS, line_item_rows)
+        self.purchase_order_api_service.supplier_daily_spend_service.add_purchase_orders(purchase_order_ids)
+        return len(line_item_rows)
+
+    def get_order_time(self, data):
+        order_time = data.get("order_time") if isinstance(data, dict) else None
+        if order_time is None:
+            return timezone.now()
+        parsed_order_time = parse_datetime(order_time) if isinstance(order_time, str) else None
+        if parsed_order_time is None:
+            raise InvalidPurchaseOrderData(f"invalid order_time {order_time}")
+        if timezone.is_naive(parsed_order_time):
+            parsed_order_time = timezone.make_aware(parsed_order_time)
+        return parsed_order_time
+
+    def allocate_purchase_order_ids(self, connection, count):
+        """
+        Reserves ids from the purchase order id sequence so line items can reference their orders.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)",
+                [PurchaseOrder._meta.db_table, count],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    def get_db_values(self, connection, fields, values):
+        """
+        Converts values the way the ORM would before saving them, e.g. rounding floats for DecimalFields.
+        """
+        return [field.get_db_prep_save(values[field.attname], connection) for field in fields]
+
+    def copy_rows(self, connection, table, columns, rows):
+        quoted_columns = ", ".join(connection.ops.quote_name(column) for column in columns)
+        with connection.cursor() as cursor:
+            with cursor.copy(f"COPY {connection.ops.quote_name(table)} ({quoted_columns}) FROM STDIN") as copy:
+                for row in rows:
+                    copy.write_row(row)
+
+    def read_checkpoint(self, checkpoint_path):
+        try:
+            with open(checkpoint_path) as checkpoint_file:
+                return json.load(checkpoint_file)["imported_orders"]
+        except FileNotFoundError:
+            return 0
+
+    def write_checkpoint(self, checkpoint_path, imported_orders):
+        # written right after the chunk's transaction commits and replaced atomically
+        temporary_path = f"{checkpoint_path}.tmp"
+        with open(temporary_path, "w") as checkpoint_file:
+            json.dump({"imported_orders": imported_orders}, checkpoint_file)
+        os.replace(temporary_path, checkpoint_path)
@@ -0,0 +1,79 @@
+import json
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Sends concurrent GET requests to a running server, once to the sync purchase order views and once "
+        "to their async counterparts, and reports the throughput and latencies of both. Start the server "
+        "with an ASGI server first, e.g. uvicorn sumtracker_project.asgi:application --workers 1."
+    )
+    sync_prefix = "/purchase/orders/"
+    async_prefix = "/purchase/orders/async/"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument("--path", default="?limit=50", help="Path below the purchase orders url, e.g. 1/")
+        parser.add_argument("--concurrency", type=int, default=32)
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+
+    def handle(self, *args, **options):
+        base_url = options["base_url"].rstrip("/")
+        results = {}
+        for label, prefix in (("sync", self.sync_prefix), ("async", self.async_prefix)):
+            url = f"{base_url}{prefix}{options['path']}"
+            # a first request fails fast on a wrong url and warms the connections up
+            self.fetch(url)
+            results[label] = self.run(url, options["concurrency"], options["requests"])
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for label, result in results.items():
+            self.stdout.write(
+                f"{label:>5}: {result['requests_per_second']:.0f} req/s, p50 {result['p50_ms']:.1f} ms, "
+                f"p95 {result['p95_ms']:.1f} ms, p99 {result['p99_ms']:.1f} ms, {result['errors']} errors"
+            )
+
+    def run(self, url, concurrency, requests):
+        started_at = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            responses = list(executor.map(self.timed_fetch, [url] * requests))
+        elapsed = time.perf_counter() - started_at
+        latencies = sorted(latency for latency, ok in responses)
+        percentiles = statistics.quantiles(latencies, n=100)
+        return {
+            "url": url,
+            "concurrency": concurrency,
+            "requests": requests,
+            "errors": sum(1 for latency, ok in responses if not ok),
+            "requests_per_second": requests / elapsed,
+            "p50_ms": percentiles[49],
+            "p95_ms": percentiles[94],
+            "p99_ms": percentiles[98],
+        }
+
+    def timed_fetch(self, url):
+        started_at = time.perf_counter()
+        try:
+            self.fetch(url)
+            ok = True
+        except CommandError:
+            ok = False
+        return (time.perf_counter() - started_at) * 1000, ok
+
+    def fetch(self, url):
+        try:
+            with urllib.request.urlopen(url, timeout=30) as response:
+                response.read()
+        except urllib.error.HTTPError as e:
+            raise CommandError(f"GET {url} answered {e.code}")
+        except OSError as e:
+            # refused connections and timeouts
+            raise CommandError(f"GET {url} failed: {e}")
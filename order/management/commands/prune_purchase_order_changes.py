@@ -0,0 +1,20 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from order.services.purchase_order_change import PurchaseOrderChangeService
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes the purchase order changes older than PURCHASE_ORDER_CHANGES_RETENTION_DAYS, the change feed "
+        "refusing the cursors that old. Meant to run daily, e.g. from cron."
+    )
+    purchase_order_change_service = PurchaseOrderChangeService()
+
+    def handle(self, *args, **options):
+        changed_at = timezone.now() - timedelta(days=settings.PURCHASE_ORDER_CHANGES_RETENTION_DAYS)
+        deleted = self.purchase_order_change_service.prune_changes_before(changed_at)
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} purchase order changes made before {changed_at:%Y-%m-%d %H:%M}"))
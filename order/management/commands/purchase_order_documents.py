@@ -0,0 +1,65 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from order.api_services.purchase_order import PurchaseOrderAPIService
+from order.models.purchase_order import PurchaseOrder
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the purchase order documents from the tables (--rebuild) or checks them against "
+        "the serializers of the API (--verify), chunk by chunk in id order. Verification fails when a "
+        "current document differs from the API representation; missing or outdated documents are only "
+        "reported since reads fall back to the tables for them."
+    )
+    purchase_order_api_service = PurchaseOrderAPIService()
+
+    def add_arguments(self, parser):
+        action = parser.add_mutually_exclusive_group(required=True)
+        action.add_argument("--rebuild", action="store_true")
+        action.add_argument("--verify", action="store_true")
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Orders per transaction / comparison")
+
+    def handle(self, *args, **options):
+        document_service = self.purchase_order_api_service.purchase_order_document_service
+        if not document_service.enabled:
+            raise CommandError("Purchase order documents are disabled by the PURCHASE_ORDER_DOCUMENTS setting")
+        started_at = time.perf_counter()
+        if options["rebuild"]:
+            written = 0
+            for purchase_order_ids in self.iter_id_chunks(options["chunk_size"]):
+                with transaction.atomic():
+                    written += document_service.write_documents(purchase_order_ids)
+            self.stdout.write(self.style.SUCCESS(
+                f"Rebuilt {written} documents in {time.perf_counter() - started_at:.1f}s"
+            ))
+            return
+
+        checked = outdated = 0
+        mismatched_ids = []
+        for purchase_order_ids in self.iter_id_chunks(options["chunk_size"]):
+            documents = document_service.get_documents(purchase_order_ids)
+            purchase_orders = PurchaseOrder.objects.select_related("supplier").filter(id__in=purchase_order_ids)
+            for expected in self.purchase_order_api_service.serialize_purchase_orders(purchase_orders.order_by("id")):
+                checked += 1
+                document = documents.get(expected["id"])
+                if document is None:
+                    outdated += 1
+                elif document != expected:
+                    mismatched_ids.append(expected["id"])
+        self.stdout.write(
+            f"Checked {checked} orders in {time.perf_counter() - started_at:.1f}s: "
+            f"{outdated} without a current document, {len(mismatched_ids)} mismatched"
+        )
+        if mismatched_ids:
+            raise CommandError(f"Documents differing from the API representation: {mismatched_ids[:20]}")
+
+    def iter_id_chunks(self, chunk_size):
+        last_id = 0
+        while purchase_order_ids := list(
+            PurchaseOrder.objects.filter(id__gt=last_id).order_by("id").values_list("id", flat=True)[:chunk_size]
+        ):
+            yield purchase_order_ids
+            last_id = purchase_order_ids[-1]
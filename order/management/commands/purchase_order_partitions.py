@@ -0,0 +1,66 @@
+import argparse
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from order.exceptions import PurchaseOrderPartitioningError
+from order.services.purchase_order_partition import PurchaseOrderPartitionService
+
+
+class Command(BaseCommand):
+    help = (
+        "Manages the monthly partitions of purchase_orders and line_items on order_time. --convert turns the "
+        "tables into partitioned ones once, copying their rows under a lock, --create creates the partitions "
+        "of the current month and of the PURCHASE_ORDER_PARTITIONS_AHEAD next ones and is meant to run monthly, "
+        "--drop-before YYYY-MM drops the partitions of the older months and --list shows the partitions."
+    )
+    purchase_order_partition_service = PurchaseOrderPartitionService()
+
+    def add_arguments(self, parser):
+        action = parser.add_mutually_exclusive_group(required=True)
+        action.add_argument("--convert", action="store_true")
+        action.add_argument("--create", action="store_true")
+        action.add_argument("--drop-before", type=self.parse_month, metavar="YYYY-MM")
+        action.add_argument("--list", action="store_true")
+        parser.add_argument(
+            "--months-ahead", type=int, default=settings.PURCHASE_ORDER_PARTITIONS_AHEAD,
+            help="Months created after the current one by --convert and --create",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            if options["convert"]:
+                months = self.purchase_order_partition_service.convert(options["months_ahead"])
+                self.stdout.write(self.style.SUCCESS(
+                    f"Partitioned the purchase orders and line items by month, {self.format_months(months)}"
+                ))
+            elif options["create"]:
+                with transaction.atomic():
+                    months = self.purchase_order_partition_service.create_partitions_ahead(options["months_ahead"])
+                self.stdout.write(self.style.SUCCESS(
+                    f"Created the partitions of {self.format_months(months)}" if months else "No partition to create"
+                ))
+            elif options["drop_before"]:
+                months = self.purchase_order_partition_service.drop_partitions_before(options["drop_before"])
+                self.stdout.write(self.style.SUCCESS(
+                    f"Dropped the partitions of {self.format_months(months)}" if months else "No partition to drop"
+                ))
+            else:
+                if not self.purchase_order_partition_service.is_partitioned():
+                    self.stdout.write("The purchase orders and line items are not partitioned")
+                    return
+                for month in self.purchase_order_partition_service.get_partition_months():
+                    self.stdout.write(f"{month:%Y-%m}")
+        except PurchaseOrderPartitioningError as e:
+            raise CommandError(e.error)
+
+    def parse_month(self, value):
+        try:
+            return datetime.datetime.strptime(value, "%Y-%m").date()
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"invalid month {value}, expected YYYY-MM")
+
+    def format_months(self, months):
+        return ", ".join(f"{month:%Y-%m}" for month in months)
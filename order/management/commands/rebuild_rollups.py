@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from order.services.supplier_daily_spend import SupplierDailySpendService
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the supplier daily spend rollups from the purchase orders with one GROUP BY, in a single "
+        "transaction so reports keep reading the previous rollups until it commits. Needed after orders were "
+        "written without going through the services, e.g. with SQL."
+    )
+    supplier_daily_spend_service = SupplierDailySpendService()
+
+    def handle(self, *args, **options):
+        started_at = time.perf_counter()
+        with transaction.atomic():
+            written = self.supplier_daily_spend_service.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {written} supplier daily spend rollups in {time.perf_counter() - started_at:.1f}s"
+        ))
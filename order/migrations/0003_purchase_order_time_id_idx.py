@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-18 09:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0002_initial'),
+        ('supplier', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='purchaseorder',
+            index=models.Index(fields=['order_time', 'id'], name='purchase_order_time_id_idx'),
+        ),
+    ]
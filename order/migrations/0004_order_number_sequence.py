@@ -0,0 +1,27 @@
+# Generated by Django 5.0.1 on 2026-10-18 09:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0003_purchase_order_time_id_idx'),
+    ]
+
+    operations = [
+        # Existing orders keep their numbers (their ids), new ones continue after the highest of both
+        migrations.RunSQL(
+            sql=[
+                "CREATE SEQUENCE purchase_orders_order_number_seq AS integer OWNED BY purchase_orders.order_number",
+                "SELECT setval('purchase_orders_order_number_seq', "
+                "GREATEST(COALESCE(MAX(order_number), 0), COALESCE(MAX(id), 0)) + 1, false) FROM purchase_orders",
+            ],
+            reverse_sql="DROP SEQUENCE purchase_orders_order_number_seq",
+        ),
+        migrations.AlterField(
+            model_name='purchaseorder',
+            name='order_number',
+            field=models.IntegerField(db_default=models.Func(models.Value('purchase_orders_order_number_seq'), function='nextval', output_field=models.IntegerField()), editable=False, null=True, unique=True),
+        ),
+    ]
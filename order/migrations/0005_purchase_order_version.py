@@ -0,0 +1,75 @@
+# Generated by Django 5.0.1 on 2026-10-18 09:41
+
+from django.db import migrations, models
+
+# Every UPDATE of a purchase order bumps its version, whatever value the statement writes.
+# Writes to line items touch their orders once per statement, skipping the orders created by the
+# current transaction since nobody can have seen those yet, which keeps bulk_create and COPY imports
+# from rewriting every order they insert.
+CREATE_VERSION_TRIGGERS = """
+CREATE FUNCTION purchase_orders_bump_version() RETURNS trigger AS $$
+BEGIN
+    NEW.version := OLD.version + 1;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER purchase_orders_bump_version
+BEFORE UPDATE ON purchase_orders
+FOR EACH ROW EXECUTE FUNCTION purchase_orders_bump_version();
+
+CREATE FUNCTION line_items_touch_purchase_orders() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE purchase_orders SET version = version
+        WHERE id IN (SELECT purchase_order_id FROM new_rows) AND xmin <> pg_current_xact_id()::xid;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE purchase_orders SET version = version
+        WHERE id IN (SELECT purchase_order_id FROM old_rows) AND xmin <> pg_current_xact_id()::xid;
+    ELSE
+        UPDATE purchase_orders SET version = version
+        WHERE id IN (SELECT purchase_order_id FROM new_rows UNION SELECT purchase_order_id FROM old_rows)
+            AND xmin <> pg_current_xact_id()::xid;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER line_items_touch_purchase_orders_on_insert
+AFTER INSERT ON line_items REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION line_items_touch_purchase_orders();
+
+CREATE TRIGGER line_items_touch_purchase_orders_on_update
+AFTER UPDATE ON line_items REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION line_items_touch_purchase_orders();
+
+CREATE TRIGGER line_items_touch_purchase_orders_on_delete
+AFTER DELETE ON line_items REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION line_items_touch_purchase_orders();
+"""
+
+DROP_VERSION_TRIGGERS = """
+DROP TRIGGER line_items_touch_purchase_orders_on_insert ON line_items;
+DROP TRIGGER line_items_touch_purchase_orders_on_update ON line_items;
+DROP TRIGGER line_items_touch_purchase_orders_on_delete ON line_items;
+DROP FUNCTION line_items_touch_purchase_orders();
+DROP TRIGGER purchase_orders_bump_version ON purchase_orders;
+DROP FUNCTION purchase_orders_bump_version();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0004_order_number_sequence'),
+        ('supplier', '0003_unique_supplier_name_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchaseorder',
+            name='version',
+            field=models.IntegerField(db_default=models.Value(1), editable=False),
+        ),
+        migrations.RunSQL(CREATE_VERSION_TRIGGERS, reverse_sql=DROP_VERSION_TRIGGERS),
+    ]
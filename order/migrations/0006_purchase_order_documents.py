@@ -0,0 +1,28 @@
+# Generated by Django 5.0.1 on 2026-10-18 09:44
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0005_purchase_order_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PurchaseOrderDocument',
+            fields=[
+                ('purchase_order', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='document', serialize=False, to='order.purchaseorder')),
+                ('version', models.IntegerField()),
+                ('document', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+            ],
+            options={
+                'verbose_name': 'Purchase Order Document',
+                'verbose_name_plural': 'Purchase Order Documents',
+                'db_table': 'purchase_order_documents',
+            },
+        ),
+    ]
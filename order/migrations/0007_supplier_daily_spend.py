@@ -0,0 +1,51 @@
+# Generated by Django 5.0.1 on 2026-10-18 10:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Rollups of the existing orders, the same GROUP BY as manage.py rebuild_rollups
+BACKFILL_SQL = """
+INSERT INTO supplier_daily_spend (supplier_id, day, order_count, total_quantity, total_amount, total_tax)
+SELECT supplier_id, (order_time AT TIME ZONE %s)::date, count(*), sum(total_quantity), sum(total_amount), sum(total_tax)
+FROM purchase_orders
+GROUP BY 1, 2
+"""
+
+
+def backfill_supplier_daily_spend(apps, schema_editor):
+    schema_editor.execute(BACKFILL_SQL, [settings.TIME_ZONE])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0006_purchase_order_documents'),
+        ('supplier', '0003_unique_supplier_name_email'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SupplierDailySpend',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('order_count', models.IntegerField()),
+                ('total_quantity', models.BigIntegerField()),
+                ('total_amount', models.DecimalField(decimal_places=2, max_digits=16)),
+                ('total_tax', models.DecimalField(decimal_places=2, max_digits=16)),
+                ('supplier', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_spend', to='supplier.supplier')),
+            ],
+            options={
+                'verbose_name': 'Supplier Daily Spend',
+                'verbose_name_plural': 'Supplier Daily Spend',
+                'db_table': 'supplier_daily_spend',
+                'indexes': [models.Index(fields=['day'], name='supplier_daily_spend_day_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='supplierdailyspend',
+            constraint=models.UniqueConstraint(fields=('supplier', 'day'), name='unique_supplier_daily_spend'),
+        ),
+        migrations.RunPython(backfill_supplier_daily_spend, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.0.1 on 2026-10-18 10:42
+
+from django.db import migrations
+
+# Same as migration 0005, matching the orders on (id, order_time) so that on partitioned tables
+# (see PurchaseOrderPartitionService) only the partitions of the written line items are touched.
+TOUCH_PURCHASE_ORDERS_BY_ORDER_TIME = """
+CREATE OR REPLACE FUNCTION line_items_touch_purchase_orders() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE purchase_orders SET version = version
+        WHERE (id, order_time) IN (SELECT purchase_order_id, order_time FROM new_rows)
+            AND xmin <> pg_current_xact_id()::xid;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE purchase_orders SET version = version
+        WHERE (id, order_time) IN (SELECT purchase_order_id, order_time FROM old_rows)
+            AND xmin <> pg_current_xact_id()::xid;
+    ELSE
+        UPDATE purchase_orders SET version = version
+        WHERE (id, order_time) IN (
+            SELECT purchase_order_id, order_time FROM new_rows
+            UNION SELECT purchase_order_id, order_time FROM old_rows
+        ) AND xmin <> pg_current_xact_id()::xid;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+TOUCH_PURCHASE_ORDERS_BY_ID = """
+CREATE OR REPLACE FUNCTION line_items_touch_purchase_orders() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE purchase_orders SET version = version
+        WHERE id IN (SELECT purchase_order_id FROM new_rows) AND xmin <> pg_current_xact_id()::xid;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE purchase_orders SET version = version
+        WHERE id IN (SELECT purchase_order_id FROM old_rows) AND xmin <> pg_current_xact_id()::xid;
+    ELSE
+        UPDATE purchase_orders SET version = version
+        WHERE id IN (SELECT purchase_order_id FROM new_rows UNION SELECT purchase_order_id FROM old_rows)
+            AND xmin <> pg_current_xact_id()::xid;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0007_supplier_daily_spend'),
+        ('supplier', '0004_line_item_order_time'),
+    ]
+
+    operations = [
+        migrations.RunSQL(TOUCH_PURCHASE_ORDERS_BY_ORDER_TIME, reverse_sql=TOUCH_PURCHASE_ORDERS_BY_ID),
+    ]
@@ -0,0 +1,90 @@
+# Generated by Django 5.0.1 on 2026-10-18 11:05
+
+import django.db.models.functions.datetime
+from django.db import migrations, models
+
+# The version trigger of migration 0005 also sets updated_at, so UPDATEs of the order and the writes
+# to its line items that touch it move it too. Orders existing before this migration get its time.
+# Every INSERT, UPDATE and DELETE of purchase_orders is logged in purchase_order_changes, one row
+# per order and statement, deletes as tombstones. Dropped partitions are not logged.
+CREATE_CHANGE_TRIGGERS = """
+CREATE OR REPLACE FUNCTION purchase_orders_bump_version() RETURNS trigger AS $$
+BEGIN
+    NEW.version := OLD.version + 1;
+    NEW.updated_at := now();
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE FUNCTION purchase_orders_log_changes() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO purchase_order_changes (purchase_order_id, order_time, deleted, transaction_id, changed_at)
+        SELECT id, order_time, true, pg_current_xact_id()::text::bigint, now() FROM old_rows ORDER BY id;
+    ELSE
+        INSERT INTO purchase_order_changes (purchase_order_id, order_time, deleted, transaction_id, changed_at)
+        SELECT id, order_time, false, pg_current_xact_id()::text::bigint, now() FROM new_rows ORDER BY id;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER purchase_orders_log_changes_on_insert
+AFTER INSERT ON purchase_orders REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION purchase_orders_log_changes();
+
+CREATE TRIGGER purchase_orders_log_changes_on_update
+AFTER UPDATE ON purchase_orders REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION purchase_orders_log_changes();
+
+CREATE TRIGGER purchase_orders_log_changes_on_delete
+AFTER DELETE ON purchase_orders REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION purchase_orders_log_changes();
+"""
+
+DROP_CHANGE_TRIGGERS = """
+DROP TRIGGER purchase_orders_log_changes_on_insert ON purchase_orders;
+DROP TRIGGER purchase_orders_log_changes_on_update ON purchase_orders;
+DROP TRIGGER purchase_orders_log_changes_on_delete ON purchase_orders;
+DROP FUNCTION purchase_orders_log_changes();
+
+CREATE OR REPLACE FUNCTION purchase_orders_bump_version() RETURNS trigger AS $$
+BEGIN
+    NEW.version := OLD.version + 1;
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0008_line_items_touch_purchase_orders_by_order_time'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchaseorder',
+            name='updated_at',
+            field=models.DateTimeField(db_default=django.db.models.functions.datetime.Now(), editable=False),
+        ),
+        migrations.CreateModel(
+            name='PurchaseOrderChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('purchase_order_id', models.BigIntegerField()),
+                ('order_time', models.DateTimeField()),
+                ('deleted', models.BooleanField()),
+                ('transaction_id', models.BigIntegerField()),
+                ('changed_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Purchase Order Change',
+                'verbose_name_plural': 'Purchase Order Changes',
+                'db_table': 'purchase_order_changes',
+                'indexes': [models.Index(fields=['transaction_id', 'id'], name='po_change_transaction_id_idx'), models.Index(fields=['changed_at'], name='po_change_changed_at_idx')],
+            },
+        ),
+        migrations.RunSQL(CREATE_CHANGE_TRIGGERS, reverse_sql=DROP_CHANGE_TRIGGERS),
+    ]
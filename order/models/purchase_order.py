@@ -1,24 +1,41 @@
 from django.db import models
+from django.db.models.functions import Now
 from django.utils import timezone
 
 from supplier.model.supplier import Supplier
 
+ORDER_NUMBER_SEQUENCE = "purchase_orders_order_number_seq"
+
 
 class PurchaseOrder(models.Model):
     supplier = models.ForeignKey(Supplier, on_delete=models.CASCADE, help_text="Supplier of Order")
     order_time = models.DateTimeField(default=timezone.now, editable=False)
-    order_number = models.IntegerField(unique=True, editable=False, null=True)
+    # allocated by the database within the INSERT itself, so bulk_create() gets order numbers too
+    order_number = models.IntegerField(
+        unique=True,
+        editable=False,
+        null=True,
+        db_default=models.Func(
+            models.Value(ORDER_NUMBER_SEQUENCE), function="nextval", output_field=models.IntegerField()
+        ),
+    )
     total_quantity = models.IntegerField(editable=False)
     total_amount = models.DecimalField(max_digits=10, decimal_places=2)
     total_tax = models.DecimalField(max_digits=10, decimal_places=2)
-
-    def save(self, *args, **kwargs):
-        super(PurchaseOrder, self).save(*args, **kwargs)
-        if not self.order_number:
-            self.order_number = self.pk
-            super().save()
+    # bumped by database triggers on every UPDATE of the order and every write to its line items
+    # (see migration 0005), the ETag of the order is derived from it
+    version = models.IntegerField(db_default=1, editable=False)
+    # set by the same trigger as version (see migration 0009), so it moves whenever the order or its line items change
+    updated_at = models.DateTimeField(db_default=Now(), editable=False)
 
     class Meta:
+        # once converted by `purchase_order_partitions --convert` the table is partitioned by month of order_time
+        # and its primary key is (id, order_time), which the model state, with id as the primary key, does not
+        # show; migrations changing the keys of purchase_orders or the foreign keys to it have to be hand written
         db_table = "purchase_orders"
         verbose_name = "Purchase Order"
         verbose_name_plural = "Purchase Orders"
+        indexes = [
+            # keyset pagination seeks on (order_time, id)
+            models.Index(fields=["order_time", "id"], name="purchase_order_time_id_idx"),
+        ]
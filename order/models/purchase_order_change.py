@@ -0,0 +1,26 @@
+from django.db import models
+
+
+class PurchaseOrderChange(models.Model):
+    """
+    An insert, update or delete of a PurchaseOrder, logged by database triggers on purchase_orders
+    (see migration 0009) in the transaction making it. Deletes are kept as tombstones.
+    """
+    # no foreign key, the changes outlive the orders they log
+    purchase_order_id = models.BigIntegerField()
+    order_time = models.DateTimeField()
+    deleted = models.BooleanField()
+    # pg_current_xact_id() of the writing transaction, the change feed is read in (transaction_id, id) order
+    transaction_id = models.BigIntegerField()
+    changed_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "purchase_order_changes"
+        verbose_name = "Purchase Order Change"
+        verbose_name_plural = "Purchase Order Changes"
+        indexes = [
+            # the change feed seeks on (transaction_id, id)
+            models.Index(fields=["transaction_id", "id"], name="po_change_transaction_id_idx"),
+            # pruning of the changes older than PURCHASE_ORDER_CHANGES_RETENTION_DAYS
+            models.Index(fields=["changed_at"], name="po_change_changed_at_idx"),
+        ]
@@ -0,0 +1,23 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+from order.models.purchase_order import PurchaseOrder
+
+
+class PurchaseOrderDocument(models.Model):
+    """
+    The API representation of a PurchaseOrder with its Supplier and LineItems, as of `version` of the order.
+    """
+    # once purchase_orders is partitioned this has no foreign key in the database, id alone not being unique
+    # there, documents are deleted with their orders by the services and by dropping partitions instead
+    purchase_order = models.OneToOneField(
+        PurchaseOrder, primary_key=True, on_delete=models.CASCADE, related_name="document"
+    )
+    # a document is only current while it matches PurchaseOrder.version
+    version = models.IntegerField()
+    document = models.JSONField(encoder=DjangoJSONEncoder)
+
+    class Meta:
+        db_table = "purchase_order_documents"
+        verbose_name = "Purchase Order Document"
+        verbose_name_plural = "Purchase Order Documents"
@@ -0,0 +1,29 @@
+from django.db import models
+
+from supplier.model.supplier import Supplier
+
+
+class SupplierDailySpend(models.Model):
+    """
+    Orders and spend of a Supplier on one day (in TIME_ZONE), kept up to date by the writes of
+    PurchaseOrderAPIService with delta upserts.
+    """
+    supplier = models.ForeignKey(Supplier, on_delete=models.CASCADE, related_name="daily_spend")
+    day = models.DateField()
+    order_count = models.IntegerField()
+    total_quantity = models.BigIntegerField()
+    total_amount = models.DecimalField(max_digits=16, decimal_places=2)
+    total_tax = models.DecimalField(max_digits=16, decimal_places=2)
+
+    class Meta:
+        db_table = "supplier_daily_spend"
+        verbose_name = "Supplier Daily Spend"
+        verbose_name_plural = "Supplier Daily Spend"
+        constraints = [
+            # target of the ON CONFLICT of the delta upserts
+            models.UniqueConstraint(fields=["supplier", "day"], name="unique_supplier_daily_spend"),
+        ]
+        indexes = [
+            # reports filtered by date range across suppliers
+            models.Index(fields=["day"], name="supplier_daily_spend_day_idx"),
+        ]
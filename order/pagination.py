@@ -0,0 +1,238 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from order.exceptions import ExpiredChangeCursor, InvalidCursor, InvalidPageLimit
+
+Cursor = namedtuple("Cursor", ["order_time", "id", "reverse"])
+Page = namedtuple("Page", ["results", "next_cursor", "prev_cursor"])
+# complete_at: time from which the changes after (transaction_id, id) may start being pruned
+ChangeCursor = namedtuple("ChangeCursor", ["transaction_id", "id", "complete_at"])
+ChangePage = namedtuple("ChangePage", ["results", "next_cursor", "has_more"])
+
+
+class PurchaseOrderCursorPagination:
+    """
+        Keyset pagination for PurchaseOrders ordered by (order_time, id).
+
+        A page is fetched with a range condition on (order_time, id) instead of an OFFSET,
+        so every page costs one index range scan of `limit` rows no matter how deep it is.
+        Cursors are opaque to clients and only carry the key of the boundary row.
+
+        Methods:
+        - paginate_queryset(queryset, query_params)
+        - apaginate_queryset(queryset, query_params)
+        - get_page_queryset(queryset, limit, cursor)
+        - get_page(purchase_orders, limit, cursor)
+        - get_paginated_response_data(request, page)
+        - get_limit(query_params)
+        - encode_cursor(cursor)
+        - decode_cursor(encoded_cursor)
+    """
+    limit_query_param = "limit"
+    cursor_query_param = "cursor"
+    default_limit = 50
+    max_limit = 500
+
+    def paginate_queryset(self, queryset, query_params):
+        """
+        Fetches a single page of the queryset.
+
+        Returns:
+        - Page: PurchaseOrders of the page with the cursors of the next and previous pages.
+        """
+        limit = self.get_limit(query_params)
+        cursor = self.decode_cursor(query_params.get(self.cursor_query_param))
+        return self.get_page(list(self.get_page_queryset(queryset, limit, cursor)), limit, cursor)
+
+    async def apaginate_queryset(self, queryset, query_params):
+        """
+        Async version of paginate_queryset().
+        """
+        limit = self.get_limit(query_params)
+        cursor = self.decode_cursor(query_params.get(self.cursor_query_param))
+        purchase_orders = [purchase_order async for purchase_order in self.get_page_queryset(queryset, limit, cursor)]
+        return self.get_page(purchase_orders, limit, cursor)
+
+    def get_page_queryset(self, queryset, limit, cursor):
+        """
+        Narrows the queryset down to the rows of the page after (or before) the cursor.
+        """
+        if cursor is None:
+            queryset = queryset.order_by("order_time", "id")
+        elif cursor.reverse:
+            # order_time <= t AND NOT (order_time = t AND id >= x) keeps the range condition usable by the index
+            queryset = queryset.filter(order_time__lte=cursor.order_time).exclude(
+                order_time=cursor.order_time, id__gte=cursor.id
+            ).order_by("-order_time", "-id")
+        else:
+            queryset = queryset.filter(order_time__gte=cursor.order_time).exclude(
+                order_time=cursor.order_time, id__lte=cursor.id
+            ).order_by("order_time", "id")
+        # one extra row tells whether there is anything beyond this page
+        return queryset[:limit + 1]
+
+    def get_page(self, purchase_orders, limit, cursor):
+        """
+        Builds the Page from the rows fetched by get_page_queryset().
+        """
+        has_more = len(purchase_orders) > limit
+        purchase_orders = purchase_orders[:limit]
+        if cursor is not None and cursor.reverse:
+            purchase_orders.reverse()
+            has_next, has_prev = True, has_more
+        else:
+            has_next, has_prev = has_more, cursor is not None
+
+        next_cursor = prev_cursor = None
+        if purchase_orders and has_next:
+            last = purchase_orders[-1]
+            next_cursor = Cursor(order_time=last.order_time, id=last.id, reverse=False)
+        if purchase_orders and has_prev:
+            first = purchase_orders[0]
+            prev_cursor = Cursor(order_time=first.order_time, id=first.id, reverse=True)
+        return Page(results=purchase_orders, next_cursor=next_cursor, prev_cursor=prev_cursor)
+
+    def get_paginated_response_data(self, request, page):
+        """
+        Builds the response body of a page with absolute links to its neighbours.
+        """
+        url = remove_query_param(request.build_absolute_uri(), self.cursor_query_param)
+        return {
+            "next": self.get_link(url, page.next_cursor),
+            "prev": self.get_link(url, page.prev_cursor),
+            "results": page.results,
+        }
+
+    def get_link(self, url, cursor):
+        if cursor is None:
+            return None
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(cursor))
+
+    def get_limit(self, query_params):
+        """
+        Reads the page size from the query params, capped at max_limit.
+        """
+        limit = query_params.get(self.limit_query_param)
+        if limit is None:
+            return self.default_limit
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise InvalidPageLimit(limit)
+        if limit < 1:
+            raise InvalidPageLimit(limit)
+        return min(limit, self.max_limit)
+
+    def encode_cursor(self, cursor):
+        """
+        Encodes a Cursor into an opaque url-safe token.
+        """
+        tokens = {"t": cursor.order_time.isoformat(), "i": cursor.id}
+        if cursor.reverse:
+            tokens["r"] = 1
+        return urlsafe_b64encode(json.dumps(tokens, separators=(",", ":")).encode()).decode()
+
+    def decode_cursor(self, encoded_cursor):
+        """
+        Decodes a token created by encode_cursor, None when no cursor is given.
+        """
+        if not encoded_cursor:
+            return None
+        try:
+            tokens = json.loads(urlsafe_b64decode(encoded_cursor.encode()))
+            order_time = parse_datetime(tokens["t"])
+            cursor_id = int(tokens["i"])
+        except (TypeError, ValueError, KeyError):
+            raise InvalidCursor(encoded_cursor)
+        if order_time is None:
+            raise InvalidCursor(encoded_cursor)
+        return Cursor(order_time=order_time, id=cursor_id, reverse=bool(tokens.get("r")))
+
+
+class PurchaseOrderChangePagination:
+    """
+        Batches of the PurchaseOrderChange feed, read after the position of a `since` cursor.
+
+        Cursors are opaque to clients and carry the (transaction_id, id) of the last change read
+        along with the time the change after it was made, or the time of the read when there was
+        none. Once that time is older than PURCHASE_ORDER_CHANGES_RETENTION_DAYS the changes after
+        the cursor may have been pruned, and it is refused.
+
+        Methods:
+        - get_page(changes, limit, cursor)
+        - get_limit(query_params)
+        - encode_cursor(cursor)
+        - decode_cursor(encoded_cursor)
+    """
+    since_query_param = "since"
+    limit_query_param = "limit"
+    default_limit = 100
+    max_limit = 1000
+    retention = timedelta(days=settings.PURCHASE_ORDER_CHANGES_RETENTION_DAYS)
+
+    def get_page(self, changes, limit, cursor):
+        """
+        Builds the ChangePage from up to limit + 1 changes read after the cursor.
+        """
+        has_more = len(changes) > limit
+        # the change after the page is the oldest one the next read depends on
+        complete_at = changes[limit].changed_at if has_more else timezone.now()
+        changes = changes[:limit]
+        if changes:
+            next_cursor = ChangeCursor(transaction_id=changes[-1].transaction_id, id=changes[-1].id, complete_at=complete_at)
+        elif cursor is not None:
+            next_cursor = cursor._replace(complete_at=complete_at)
+        else:
+            next_cursor = None
+        return ChangePage(results=changes, next_cursor=next_cursor, has_more=has_more)
+
+    def get_limit(self, query_params):
+        """
+        Reads the batch size from the query params, capped at max_limit.
+        """
+        limit = query_params.get(self.limit_query_param)
+        if limit is None:
+            return self.default_limit
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise InvalidPageLimit(limit)
+        if limit < 1:
+            raise InvalidPageLimit(limit)
+        return min(limit, self.max_limit)
+
+    def encode_cursor(self, cursor):
+        """
+        Encodes a ChangeCursor into an opaque url-safe token.
+        """
+        if cursor is None:
+            return None
+        tokens = {"x": cursor.transaction_id, "i": cursor.id, "t": cursor.complete_at.isoformat()}
+        return urlsafe_b64encode(json.dumps(tokens, separators=(",", ":")).encode()).decode()
+
+    def decode_cursor(self, encoded_cursor):
+        """
+        Decodes a token created by encode_cursor, None when no cursor is given.
+        """
+        if not encoded_cursor:
+            return None
+        try:
+            tokens = json.loads(urlsafe_b64decode(encoded_cursor.encode()))
+            transaction_id = int(tokens["x"])
+            change_id = int(tokens["i"])
+            complete_at = parse_datetime(tokens["t"])
+        except (TypeError, ValueError, KeyError):
+            raise InvalidCursor(encoded_cursor)
+        # encode_cursor writes aware times, a naive one cannot be compared with the retention
+        if complete_at is None or timezone.is_naive(complete_at):
+            raise InvalidCursor(encoded_cursor)
+        if complete_at < timezone.now() - self.retention:
+            raise ExpiredChangeCursor(encoded_cursor, self.retention.days)
+        return ChangeCursor(transaction_id=transaction_id, id=change_id, complete_at=complete_at)
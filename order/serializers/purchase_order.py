@@ -1,5 +1,6 @@
 from rest_framework import serializers
 
+from sumtracker_project.row_serializer import RowSerializer
 from supplier.serializers.supplier import SupplierSerializer
 
 
@@ -11,3 +12,23 @@ class PurchaseOrderSerialzier(serializers.Serializer):
     total_quantity = serializers.IntegerField()
     total_amount = serializers.DecimalField(max_digits=10, decimal_places=2)
     total_tax = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+
+# PurchaseOrderSerialzier for rows of PurchaseOrder.objects.values_list(*purchase_order_row_serializer.columns),
+# the supplier being read from the joined supplier__ columns
+purchase_order_row_serializer = RowSerializer(PurchaseOrderSerialzier)
+
+
+class PurchaseOrderChangeSerializer(serializers.Serializer):
+    id = serializers.IntegerField(source="purchase_order_id")
+    deleted = serializers.BooleanField()
+    changed_at = serializers.DateTimeField()
+
+
+class SupplierDailySpendSerializer(serializers.Serializer):
+    day = serializers.DateField()
+    supplier = SupplierSerializer()
+    order_count = serializers.IntegerField()
+    total_quantity = serializers.IntegerField()
+    total_amount = serializers.DecimalField(max_digits=16, decimal_places=2)
+    total_tax = serializers.DecimalField(max_digits=16, decimal_places=2)
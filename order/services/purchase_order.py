@@ -1,7 +1,12 @@
+from django.db.models import Exists, OuterRef
+
 from order.exceptions import PurchaseOrderNotFound
 from order.models.purchase_order import PurchaseOrder
+from supplier.model.line_items import LineItem
+from sumtracker_project.metrics import instrument_service
 
 
+@instrument_service
 class PurchaseOrderService:
     def create_purchase_order(self, supplier_object, total_amount, total_quantity, total_tax):
         return PurchaseOrder.objects.create(
@@ -11,27 +16,87 @@ class PurchaseOrderService:
             total_tax=total_tax
         )
 
+    def bulk_create_purchase_orders(self, purchase_orders_data):
+        """
+        Creates many PurchaseOrders with multi-row INSERTs, order numbers included.
+        """
+        return PurchaseOrder.objects.bulk_create([
+            PurchaseOrder(
+                supplier=purchase_order_data["supplier_object"],
+                total_amount=purchase_order_data["total_amount"],
+                total_quantity=purchase_order_data["total_quantity"],
+                total_tax=purchase_order_data["total_tax"]
+            )
+            for purchase_order_data in purchase_orders_data
+        ])
+
     def get_purchase_order_object_by_id(self, purchase_order_id):
         try:
-            purchase_order = PurchaseOrder.objects.get(id=purchase_order_id)
+            purchase_order = PurchaseOrder.objects.select_related("supplier").get(id=purchase_order_id)
         except PurchaseOrder.DoesNotExist:
             raise PurchaseOrderNotFound(purchase_order_id)
         return purchase_order
 
+    def get_version_by_id(self, purchase_order_id):
+        """
+        Returns the version of a PurchaseOrder with the id, name and email of its Supplier, which
+        together change whenever its serialized data does.
+        """
+        version = self.get_version_queryset(purchase_order_id).first()
+        if version is None:
+            raise PurchaseOrderNotFound(purchase_order_id)
+        return version
+
+    async def aget_version_by_id(self, purchase_order_id):
+        """
+        Async version of get_version_by_id().
+        """
+        version = await self.get_version_queryset(purchase_order_id).afirst()
+        if version is None:
+            raise PurchaseOrderNotFound(purchase_order_id)
+        return version
+
+    def get_version_queryset(self, purchase_order_id):
+        return PurchaseOrder.objects.filter(id=purchase_order_id).values_list(
+            "version", "supplier_id", "supplier__name", "supplier__email"
+        )
+
+    # The name filters are substring matches, served by the trigram GIN indexes on UPPER(name)
+    # and UPPER(item_name) (see TrigramIndexService) where pg_trgm is available.
+    # Line items are matched with an EXISTS semi-join so every order is returned once.
     def get_purchase_orders_by_supplier_name_and_line_item_name(self, supplier_name, item_name):
-        return PurchaseOrder.objects.filter(
-                supplier__name__icontains=supplier_name, lineitem__item_name__icontains=item_name
+        return PurchaseOrder.objects.select_related("supplier").filter(
+                self.has_line_item_named(item_name), supplier__name__icontains=supplier_name
             )
 
     def get_purchase_orders_by_supplier_name(self, supplier_name):
-        return PurchaseOrder.objects.filter(
+        return PurchaseOrder.objects.select_related("supplier").filter(
                 supplier__name__icontains=supplier_name
             )
 
     def get_purchase_orders_by_item_name(self, item_name):
-        return PurchaseOrder.objects.filter(
-                lineitem__item_name__icontains=item_name
+        return PurchaseOrder.objects.select_related("supplier").filter(
+                self.has_line_item_named(item_name)
             )
 
+    def has_line_item_named(self, item_name):
+        # correlated on order_time as well, so only the partition of each order is probed
+        return Exists(LineItem.objects.filter(
+            purchase_order=OuterRef("pk"), order_time=OuterRef("order_time"), item_name__icontains=item_name
+        ))
+
     def get_all_purchase_orders(self):
-        return PurchaseOrder.objects.all()
+        return PurchaseOrder.objects.select_related("supplier")
+
+    # A range on order_time is an index range scan of purchase_order_time_id_idx, which also hands
+    # the rows out in the (order_time, id) order of the pages, so a page of a recent range reads
+    # about `limit` rows. New orders get the current time and land at the end of the index.
+    def filter_by_order_time(self, purchase_orders, order_time_from=None, order_time_to=None):
+        """
+        Narrows PurchaseOrders down to the ones placed from order_time_from on and before order_time_to.
+        """
+        if order_time_from is not None:
+            purchase_orders = purchase_orders.filter(order_time__gte=order_time_from)
+        if order_time_to is not None:
+            purchase_orders = purchase_orders.filter(order_time__lt=order_time_to)
+        return purchase_orders
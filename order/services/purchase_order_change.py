@@ -0,0 +1,48 @@
+from django.db.models import Func, IntegerField
+
+from order.models.purchase_order_change import PurchaseOrderChange
+from sumtracker_project.metrics import instrument_service
+
+
+class OldestRunningTransactionId(Func):
+    """
+    Id of the oldest transaction still running when the current snapshot was taken. Every
+    transaction with a lower id has ended, and no transaction ending later can have a lower one.
+    """
+    template = "pg_snapshot_xmin(pg_current_snapshot())::text::bigint"
+    output_field = IntegerField()
+
+
+@instrument_service
+class PurchaseOrderChangeService:
+    """
+        Service class for the PurchaseOrderChanges, the log of the writes of PurchaseOrders.
+
+        Changes are read in (transaction_id, id) order and only from the transactions that ended
+        before the oldest running one, so a transaction committing later never lands behind a
+        position already read: a change id is allocated at insert time and a transaction can
+        commit after one holding a higher id.
+
+        Methods:
+        - get_changes_after(transaction_id, change_id, limit)
+        - prune_changes_before(changed_at)
+    """
+    def get_changes_after(self, transaction_id=None, change_id=None, limit=100):
+        """
+        Returns up to limit changes after the (transaction_id, change_id) position, from the start
+        of the log when no position is given.
+        """
+        changes = PurchaseOrderChange.objects.filter(transaction_id__lt=OldestRunningTransactionId())
+        if transaction_id is not None:
+            # transaction_id >= t AND NOT (transaction_id = t AND id <= x) keeps the range condition usable by the index
+            changes = changes.filter(transaction_id__gte=transaction_id).exclude(
+                transaction_id=transaction_id, id__lte=change_id
+            )
+        return list(changes.order_by("transaction_id", "id")[:limit])
+
+    def prune_changes_before(self, changed_at):
+        """
+        Deletes the changes made before changed_at, returning how many were deleted.
+        """
+        deleted, _ = PurchaseOrderChange.objects.filter(changed_at__lt=changed_at).delete()
+        return deleted
@@ -0,0 +1,125 @@
+from django.conf import settings
+from django.db import connection
+from django.db.models import F
+
+from order.models.purchase_order_document import PurchaseOrderDocument
+from order.serializers.purchase_order import PurchaseOrderSerialzier
+from supplier.serializers.line_items import LineItemSerializer
+
+# Builds the documents in the database from the current rows, formatting every value the way the
+# serializers do: decimals with their 2 places, order_time in ISO 8601 with a Z for UTC (TIME_ZONE)
+# and microseconds only when there are any, line items ordered by id.
+WRITE_DOCUMENTS_SQL = """
+INSERT INTO purchase_order_documents (purchase_order_id, version, document)
+SELECT po.id, po.version, jsonb_build_object(
+    'id', po.id,
+    'supplier', jsonb_build_object('id', s.id, 'name', s.name, 'email', s.email),
+    'order_time', to_char(po.order_time AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS')
+        || CASE WHEN date_part('microseconds', po.order_time)::bigint %% 1000000 <> 0
+                THEN to_char(po.order_time AT TIME ZONE 'UTC', '.US') ELSE '' END
+        || 'Z',
+    'order_number', po.order_number,
+    'total_quantity', po.total_quantity,
+    'total_amount', po.total_amount::text,
+    'total_tax', po.total_tax::text,
+    'line_items', COALESCE((
+        SELECT jsonb_agg(jsonb_build_object(
+            'id', li.id,
+            'item_name', li.item_name,
+            'quantity', li.quantity,
+            'price_without_tax', li.price_without_tax::text,
+            'tax_name', li.tax_name,
+            'tax_total', li.tax_total::text,
+            'line_total', li.line_total::text
+        ) ORDER BY li.id)
+        FROM line_items li
+        WHERE li.purchase_order_id = po.id AND li.order_time = po.order_time
+    ), '[]'::jsonb)
+)
+FROM purchase_orders po
+JOIN suppliers s ON s.id = po.supplier_id
+WHERE po.id = ANY(%s)
+ON CONFLICT (purchase_order_id) DO UPDATE SET version = EXCLUDED.version, document = EXCLUDED.document
+"""
+
+# jsonb does not keep the order of keys, documents are handed out in the order of the serializers
+PURCHASE_ORDER_KEYS = list(PurchaseOrderSerialzier().fields) + ["line_items"]
+LINE_ITEM_KEYS = list(LineItemSerializer().fields)
+
+
+class PurchaseOrderDocumentService:
+    """
+        Service class for the PurchaseOrderDocuments, a read model of the PurchaseOrders kept next
+        to the tables they are built from. See the PURCHASE_ORDER_DOCUMENTS setting.
+
+        Methods:
+        - write_documents(purchase_order_ids)
+        - get_document(purchase_order_id)
+        - get_documents(purchase_order_ids)
+        - aget_document(purchase_order_id)
+        - get_documents_queryset(purchase_order_ids)
+        - build_documents(rows)
+    """
+    enabled = settings.PURCHASE_ORDER_DOCUMENTS
+
+    def write_documents(self, purchase_order_ids):
+        """
+        Rewrites the documents of PurchaseOrders from their current rows with one statement.
+        Meant to be called by the transaction writing the PurchaseOrders, after their LineItems.
+
+        Returns:
+        - int: number of documents written.
+        """
+        if not self.enabled or not purchase_order_ids:
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(WRITE_DOCUMENTS_SQL, [list(purchase_order_ids)])
+            return cursor.rowcount
+
+    def get_document(self, purchase_order_id):
+        """
+        Retrieves the current document of a PurchaseOrder with a single row fetch.
+
+        Returns:
+        - dict: the serialized PurchaseOrder, or None when it has no document or the order
+          changed since its document was written.
+        """
+        return self.get_documents([purchase_order_id]).get(purchase_order_id)
+
+    def get_documents(self, purchase_order_ids):
+        """
+        Retrieves the current documents of many PurchaseOrders, keyed by purchase order id.
+
+        The Supplier is read along with the document rather than from it, so documents stay
+        current when a Supplier is renamed.
+        """
+        if not self.enabled:
+            return {}
+        return self.build_documents(self.get_documents_queryset(purchase_order_ids))
+
+    async def aget_document(self, purchase_order_id):
+        """
+        Async version of get_document().
+        """
+        if not self.enabled:
+            return None
+        rows = [row async for row in self.get_documents_queryset([purchase_order_id])]
+        return self.build_documents(rows).get(purchase_order_id)
+
+    def get_documents_queryset(self, purchase_order_ids):
+        return PurchaseOrderDocument.objects.filter(
+            purchase_order_id__in=purchase_order_ids, version=F("purchase_order__version")
+        ).values_list(
+            "purchase_order_id", "document",
+            "purchase_order__supplier_id", "purchase_order__supplier__name", "purchase_order__supplier__email",
+        )
+
+    def build_documents(self, rows):
+        documents = {}
+        for purchase_order_id, document, supplier_id, supplier_name, supplier_email in rows:
+            document["supplier"] = {"id": supplier_id, "name": supplier_name, "email": supplier_email}
+            document["line_items"] = [
+                {key: line_item[key] for key in LINE_ITEM_KEYS} for line_item in document["line_items"]
+            ]
+            documents[purchase_order_id] = {key: document[key] for key in PURCHASE_ORDER_KEYS}
+        return documents
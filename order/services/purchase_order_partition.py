@@ -0,0 +1,452 @@
+import datetime
+import logging
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from order.exceptions import PurchaseOrderPartitioningError
+from order.services.supplier_daily_spend import SupplierDailySpendService
+from sumtracker_project.metrics import instrument_service
+
+logger = logging.getLogger(__name__)
+
+# Months of the rows of a DEFAULT partition
+DEFAULT_PARTITION_MONTHS_SQL = """
+SELECT DISTINCT (date_trunc('month', {partition_key} AT TIME ZONE 'UTC'))::date FROM {partition} ORDER BY 1
+"""
+
+# Tables partitioned by month of order_time, referenced tables first
+PARTITIONED_TABLES = ["purchase_orders", "line_items"]
+PARTITION_KEY = "order_time"
+
+# Indexes not backing a constraint, which are recreated as they are on the partitioned table
+INDEXES_SQL = """
+SELECT indexdef FROM pg_indexes
+WHERE schemaname = current_schema() AND tablename = %s
+    AND NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conindid = (quote_ident(indexname))::regclass)
+"""
+
+UNIQUE_CONSTRAINTS_SQL = """
+SELECT conname, array_agg(attname ORDER BY ordinality)
+FROM pg_constraint, unnest(conkey) WITH ORDINALITY AS key(attnum, ordinality)
+JOIN pg_attribute ON attrelid = %s::regclass AND pg_attribute.attnum = key.attnum
+WHERE conrelid = %s::regclass AND contype = 'u'
+GROUP BY conname
+"""
+
+# Foreign keys with their column, the referenced table and their definition
+FOREIGN_KEYS_SQL = """
+SELECT conname, attname, confrelid::regclass::text, pg_get_constraintdef(pg_constraint.oid)
+FROM pg_constraint
+JOIN pg_attribute ON attrelid = conrelid AND attnum = conkey[1]
+WHERE conrelid = %s::regclass AND contype = 'f'
+"""
+
+TRIGGERS_SQL = "SELECT pg_get_triggerdef(oid) FROM pg_trigger WHERE tgrelid = %s::regclass AND NOT tgisinternal"
+
+# Sequences owned by a column other than the identity id, e.g. the order number sequence
+OWNED_SEQUENCES_SQL = """
+SELECT sequence.relname, attname
+FROM pg_depend
+JOIN pg_class sequence ON sequence.oid = objid AND sequence.relkind = 'S'
+JOIN pg_attribute ON attrelid = refobjid AND attnum = refobjsubid
+WHERE refobjid = %s::regclass AND deptype = 'a'
+"""
+
+# Unique constraints of a partitioned table have to include its partition key. Order numbers stay
+# unique across the partitions through a table of their own holding them as its key, kept in step by
+# statement triggers on purchase_orders. Statements run on a partition directly, i.e. moving rows out
+# of the DEFAULT partition and dropping partitions, do not fire them.
+ORDER_NUMBERS_TABLE = "purchase_order_numbers"
+GLOBALLY_UNIQUE_COLUMNS = {"purchase_orders": ["order_number"]}
+CREATE_ORDER_NUMBERS_SQL = """
+CREATE TABLE purchase_order_numbers (order_number integer PRIMARY KEY, purchase_order_id bigint NOT NULL);
+
+INSERT INTO purchase_order_numbers SELECT order_number, id FROM purchase_orders WHERE order_number IS NOT NULL;
+
+CREATE FUNCTION purchase_orders_keep_order_numbers() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO purchase_order_numbers
+        SELECT order_number, id FROM new_rows WHERE order_number IS NOT NULL;
+    ELSIF TG_OP = 'DELETE' THEN
+        DELETE FROM purchase_order_numbers USING old_rows
+        WHERE purchase_order_numbers.order_number = old_rows.order_number;
+    ELSE
+        -- only the orders whose number changed, most updates only bump the version
+        DELETE FROM purchase_order_numbers USING old_rows JOIN new_rows ON new_rows.id = old_rows.id
+        WHERE purchase_order_numbers.order_number = old_rows.order_number
+            AND new_rows.order_number IS DISTINCT FROM old_rows.order_number;
+        INSERT INTO purchase_order_numbers
+        SELECT new_rows.order_number, new_rows.id FROM new_rows JOIN old_rows ON old_rows.id = new_rows.id
+        WHERE new_rows.order_number IS NOT NULL AND new_rows.order_number IS DISTINCT FROM old_rows.order_number;
+    END IF;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER purchase_orders_keep_order_numbers_on_insert
+AFTER INSERT ON purchase_orders REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION purchase_orders_keep_order_numbers();
+
+CREATE TRIGGER purchase_orders_keep_order_numbers_on_update
+AFTER UPDATE ON purchase_orders REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT EXECUTE FUNCTION purchase_orders_keep_order_numbers();
+
+CREATE TRIGGER purchase_orders_keep_order_numbers_on_delete
+AFTER DELETE ON purchase_orders REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT EXECUTE FUNCTION purchase_orders_keep_order_numbers();
+"""
+
+PARTITIONS_SQL = """
+SELECT child.relname
+FROM pg_inherits
+JOIN pg_class child ON child.oid = inhrelid
+WHERE inhparent = %s::regclass
+ORDER BY child.relname
+"""
+
+
+def get_month(moment):
+    """
+    First day of the month of an aware datetime, in UTC like the partition bounds.
+    """
+    return moment.astimezone(datetime.timezone.utc).date().replace(day=1)
+
+
+def add_months(month, months):
+    month_index = month.year * 12 + month.month - 1 + months
+    return datetime.date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def count_months(first_month, last_month):
+    return (last_month.year - first_month.year) * 12 + last_month.month - first_month.month
+
+
+def get_month_bounds(month):
+    """
+    [start, end) of the partition of a month.
+    """
+    return (
+        datetime.datetime(month.year, month.month, 1, tzinfo=datetime.timezone.utc),
+        datetime.datetime.combine(add_months(month, 1), datetime.time(), tzinfo=datetime.timezone.utc),
+    )
+
+
+@instrument_service
+class PurchaseOrderPartitionService:
+    """
+        Service class for the optional monthly range partitioning of purchase_orders and line_items
+        on order_time, which line_items carries denormalized from its purchase order.
+
+        Partitioned tables are converted once with convert(). Partitions are then created ahead of time
+        by create_partitions_ahead(), run monthly. Orders of months without a partition, e.g. when that
+        lapsed, land in a DEFAULT partition instead of failing, and are moved to the partition of their
+        month once it is created. Retention drops whole partitions with
+        drop_partitions_before() instead of deleting orders row by row. Queries bounded by order_time,
+        like the pages of the lists and the line items of known orders, only read the partitions of
+        their months.
+
+        The primary keys of partitioned tables have to include order_time: they become (id, order_time),
+        order numbers are kept unique across the partitions by the purchase_order_numbers table, other
+        unique constraints refuse the conversion, line items reference their order by
+        (purchase_order_id, order_time), and purchase_order_documents loses its foreign key since the
+        id of an order alone is not a key anymore. Deletes through the ORM still cascade to it.
+
+        Methods:
+        - is_partitioned()
+        - convert(months_ahead)
+        - get_definitions(cursor, table)
+        - check_unique_constraints(table, definitions)
+        - convert_table(cursor, table, months)
+        - add_constraints(cursor, table, definitions)
+        - get_partition_months()
+        - get_partition_name(table, month)
+        - get_default_partition_name(table)
+        - get_default_partition_months()
+        - create_partition(cursor, table, month)
+        - create_default_partition(cursor, table)
+        - create_partitions(months)
+        - move_default_rows(cursor, month)
+        - create_partitions_ahead(months_ahead)
+        - ensure_partitions(order_times)
+        - drop_partitions_before(month)
+    """
+    supplier_daily_spend_service = SupplierDailySpendService()
+
+    def is_partitioned(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass)",
+                [PARTITIONED_TABLES[0]],
+            )
+            return cursor.fetchone()[0]
+
+    @transaction.atomic
+    def convert(self, months_ahead):
+        """
+        Replaces purchase_orders and line_items with tables partitioned by month, from the month of
+        the oldest order to months_ahead months from now, and copies their rows over. Both tables
+        are locked for the whole conversion.
+
+        Returns:
+        - list: Months of the partitions created.
+        """
+        if self.is_partitioned():
+            raise PurchaseOrderPartitioningError("the tables are already partitioned")
+        with connection.cursor() as cursor:
+            cursor.execute(f"LOCK TABLE {', '.join(PARTITIONED_TABLES)} IN ACCESS EXCLUSIVE MODE")
+            # tables with deferred foreign key checks pending from earlier writes of the transaction cannot be altered
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+            cursor.execute(f"SELECT min({PARTITION_KEY}) FROM {PARTITIONED_TABLES[0]}")
+            oldest_order_time = cursor.fetchone()[0] or timezone.now()
+            first_month = get_month(oldest_order_time)
+            last_month = add_months(get_month(timezone.now()), months_ahead)
+            months = [add_months(first_month, i) for i in range(count_months(first_month, last_month) + 1)]
+
+            # read before any table is renamed, so the foreign keys still name the tables they reference
+            definitions = {table: self.get_definitions(cursor, table) for table in PARTITIONED_TABLES}
+            for table in PARTITIONED_TABLES:
+                self.check_unique_constraints(table, definitions[table])
+            for table in PARTITIONED_TABLES:
+                self.convert_table(cursor, table, months)
+            # indexes, constraints and triggers are only created once the rows are copied, and the
+            # names of the ones of the old tables only become free once these are dropped
+            cursor.execute(
+                f"DROP TABLE {', '.join(f'{table}_unpartitioned' for table in reversed(PARTITIONED_TABLES))} CASCADE"
+            )
+            for table in PARTITIONED_TABLES:
+                self.add_constraints(cursor, table, definitions[table])
+                cursor.execute(f"ANALYZE {table}")
+            cursor.execute(CREATE_ORDER_NUMBERS_SQL)
+        return months
+
+    def get_definitions(self, cursor, table):
+        """
+        Returns the definitions of the indexes, constraints and triggers of a table.
+        """
+        definitions = {}
+        cursor.execute(INDEXES_SQL, [table])
+        definitions["indexes"] = [row[0] for row in cursor.fetchall()]
+        cursor.execute(UNIQUE_CONSTRAINTS_SQL, [table, table])
+        definitions["unique_constraints"] = cursor.fetchall()
+        cursor.execute(FOREIGN_KEYS_SQL, [table])
+        definitions["foreign_keys"] = cursor.fetchall()
+        cursor.execute(TRIGGERS_SQL, [table])
+        definitions["triggers"] = [row[0] for row in cursor.fetchall()]
+        return definitions
+
+    def check_unique_constraints(self, table, definitions):
+        """
+        Refuses the conversion of a table with unique constraints which would only stay unique per
+        order_time once partitioned.
+        """
+        for name, columns in definitions["unique_constraints"]:
+            if columns != GLOBALLY_UNIQUE_COLUMNS.get(table):
+                raise PurchaseOrderPartitioningError(
+                    f"{name} of {table} would only be unique per {PARTITION_KEY} once partitioned"
+                )
+
+    def convert_table(self, cursor, table, months):
+        """
+        Moves a table aside as <table>_unpartitioned and copies its rows into a new partitioned table
+        with the same columns and defaults.
+        """
+        cursor.execute(OWNED_SEQUENCES_SQL, [table])
+        owned_sequences = cursor.fetchall()
+        # ids keep coming from where the identity sequence of the old table left off
+        cursor.execute("SELECT nextval(pg_get_serial_sequence(%s, 'id'))", [table])
+        next_id = cursor.fetchone()[0]
+
+        unpartitioned_table = f"{table}_unpartitioned"
+        id_sequence = f"{table}_id_seq"
+        cursor.execute(f"ALTER TABLE {table} RENAME TO {unpartitioned_table}")
+        cursor.execute(f"ALTER TABLE {unpartitioned_table} ALTER COLUMN id DROP IDENTITY")
+        cursor.execute(
+            f"CREATE TABLE {table} (LIKE {unpartitioned_table} INCLUDING DEFAULTS) PARTITION BY RANGE ({PARTITION_KEY})"
+        )
+        cursor.execute(f"CREATE SEQUENCE {id_sequence} START WITH {int(next_id)} OWNED BY {table}.id")
+        cursor.execute(f"ALTER TABLE {table} ALTER COLUMN id SET DEFAULT nextval('{id_sequence}')")
+        for sequence, column in owned_sequences:
+            cursor.execute(f"ALTER SEQUENCE {sequence} OWNED BY {table}.{column}")
+        for month in months:
+            self.create_partition(cursor, table, month)
+        self.create_default_partition(cursor, table)
+        cursor.execute(f"INSERT INTO {table} SELECT * FROM {unpartitioned_table}")
+
+    def add_constraints(self, cursor, table, definitions):
+        """
+        Recreates the indexes, constraints and triggers of an old table on its partitioned table,
+        adding order_time to its keys and to its foreign keys to the other partitioned table. The
+        unique constraints with order_time only back the lookups by their columns, see
+        CREATE_ORDER_NUMBERS_SQL.
+        """
+        cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, {PARTITION_KEY})")
+        for name, columns in definitions["unique_constraints"]:
+            cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} UNIQUE ({', '.join(columns)}, {PARTITION_KEY})")
+        for name, column, referenced_table, definition in definitions["foreign_keys"]:
+            if referenced_table in PARTITIONED_TABLES:
+                definition = (
+                    f"FOREIGN KEY ({column}, {PARTITION_KEY}) REFERENCES {referenced_table} (id, {PARTITION_KEY}) "
+                    f"DEFERRABLE INITIALLY DEFERRED"
+                )
+            cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}")
+        for definition in definitions["indexes"] + definitions["triggers"]:
+            cursor.execute(definition)
+
+    def get_partition_months(self):
+        """
+        Returns the months of the partitions of purchase_orders, oldest first.
+        """
+        table = PARTITIONED_TABLES[0]
+        with connection.cursor() as cursor:
+            cursor.execute(PARTITIONS_SQL, [table])
+            partitions = [row[0] for row in cursor.fetchall()]
+        return [
+            datetime.datetime.strptime(partition[-6:], "%Y%m").date()
+            for partition in partitions if partition.startswith(f"{table}_p")
+        ]
+
+    def get_partition_name(self, table, month):
+        return f"{table}_p{month:%Y%m}"
+
+    def get_default_partition_name(self, table):
+        return f"{table}_default"
+
+    def get_default_partition_months(self):
+        """
+        Returns the months of the orders in the DEFAULT partition, which have no partition of their own.
+        """
+        default_partition = self.get_default_partition_name(PARTITIONED_TABLES[0])
+        with connection.cursor() as cursor:
+            # tables converted before DEFAULT partitions were added have none until the next creation
+            cursor.execute("SELECT to_regclass(%s)", [default_partition])
+            if cursor.fetchone()[0] is None:
+                return []
+            cursor.execute(DEFAULT_PARTITION_MONTHS_SQL.format(
+                partition_key=PARTITION_KEY, partition=default_partition
+            ))
+            return [row[0] for row in cursor.fetchall()]
+
+    def create_partition(self, cursor, table, month):
+        start, end = get_month_bounds(month)
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.get_partition_name(table, month)} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+
+    def create_default_partition(self, cursor, table):
+        cursor.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.get_default_partition_name(table)} PARTITION OF {table} DEFAULT"
+        )
+
+    @transaction.atomic
+    def create_partitions(self, months):
+        """
+        Creates the partitions of both tables for the months which have none yet, moving the rows
+        of those months out of the DEFAULT partitions.
+
+        Returns:
+        - list: Months of the partitions created.
+        """
+        if not self.is_partitioned():
+            raise PurchaseOrderPartitioningError("the tables are not partitioned")
+        existing_months = set(self.get_partition_months())
+        created_months = sorted(set(months) - existing_months)
+        if not created_months:
+            return created_months
+        with connection.cursor() as cursor:
+            # tables with deferred foreign key checks pending cannot be altered, the checks are
+            # deferred again afterwards like the foreign keys declare
+            cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+            for table in PARTITIONED_TABLES:
+                self.create_default_partition(cursor, table)
+            for month in created_months:
+                self.move_default_rows(cursor, month)
+            cursor.execute("SET CONSTRAINTS ALL DEFERRED")
+        return created_months
+
+    def move_default_rows(self, cursor, month):
+        """
+        Creates the partitions of a month as tables of their own, moves the rows of the month from the
+        DEFAULT partitions into them and attaches them, the default partitions being checked for
+        rows of the month by attaching.
+        """
+        start, end = get_month_bounds(month)
+        moved_rows = {}
+        # line items first, so no line item left in a DEFAULT partition references a moved order
+        for table in reversed(PARTITIONED_TABLES):
+            partition = self.get_partition_name(table, month)
+            cursor.execute(f"CREATE TABLE {partition} (LIKE {table} INCLUDING DEFAULTS)")
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {self.get_default_partition_name(table)} "
+                f"WHERE {PARTITION_KEY} >= %s AND {PARTITION_KEY} < %s RETURNING *) "
+                f"INSERT INTO {partition} SELECT * FROM moved",
+                [start, end],
+            )
+            moved_rows[table] = cursor.rowcount
+        for table in PARTITIONED_TABLES:
+            cursor.execute(
+                f"ALTER TABLE {table} ATTACH PARTITION {self.get_partition_name(table, month)} "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            )
+        if moved_rows[PARTITIONED_TABLES[0]]:
+            logger.warning(
+                f"Moved {moved_rows['purchase_orders']} purchase orders and {moved_rows['line_items']} line items "
+                f"of {month:%Y-%m} out of the default partitions, their partitions were missing"
+            )
+
+    def create_partitions_ahead(self, months_ahead):
+        """
+        Creates the partitions of the current month and of the months_ahead following ones, and of
+        the months of the orders in the DEFAULT partition.
+        """
+        current_month = get_month(timezone.now())
+        return self.create_partitions(
+            [add_months(current_month, i) for i in range(months_ahead + 1)] + self.get_default_partition_months()
+        )
+
+    def ensure_partitions(self, order_times):
+        """
+        Creates the partitions orders placed at order_times go to, when the tables are partitioned.
+        For writes of past orders, e.g. imports, which the partitions created ahead do not cover.
+        """
+        if self.is_partitioned():
+            self.create_partitions({get_month(order_time) for order_time in order_times})
+
+    def drop_partitions_before(self, month):
+        """
+        Drops the partitions of the months before month, each in its own transaction, taking their
+        orders out of the supplier daily spend rollups and deleting their documents and order numbers first.
+
+        Returns:
+        - list: Months of the partitions dropped.
+        """
+        if not self.is_partitioned():
+            raise PurchaseOrderPartitioningError("the tables are not partitioned")
+        # orders of older months left in the DEFAULT partition are given their partition to drop
+        self.create_partitions([
+            default_month for default_month in self.get_default_partition_months() if default_month < month
+        ])
+        dropped_months = [partition_month for partition_month in self.get_partition_months() if partition_month < month]
+        for partition_month in dropped_months:
+            purchase_orders_partition, line_items_partition = (
+                self.get_partition_name(table, partition_month) for table in PARTITIONED_TABLES
+            )
+            with transaction.atomic(), connection.cursor() as cursor:
+                self.supplier_daily_spend_service.remove_purchase_orders_placed_between(
+                    *get_month_bounds(partition_month)
+                )
+                cursor.execute(
+                    f"DELETE FROM purchase_order_documents USING {purchase_orders_partition} "
+                    f"WHERE purchase_order_documents.purchase_order_id = {purchase_orders_partition}.id"
+                )
+                cursor.execute(
+                    f"DELETE FROM {ORDER_NUMBERS_TABLE} USING {purchase_orders_partition} "
+                    f"WHERE {ORDER_NUMBERS_TABLE}.order_number = {purchase_orders_partition}.order_number"
+                )
+                # the partition of the line items goes first, nothing references the orders after it
+                for partition, table in ((line_items_partition, "line_items"), (purchase_orders_partition, "purchase_orders")):
+                    cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {partition}")
+                    cursor.execute(f"DROP TABLE {partition}")
+        return dropped_months
@@ -0,0 +1,120 @@
+from django.conf import settings
+from django.db import connection
+
+from order.models.supplier_daily_spend import SupplierDailySpend
+from sumtracker_project.metrics import instrument_service
+
+# Adds (sign 1) or subtracts (sign -1) the stored totals of PurchaseOrders to the rollups of their
+# supplier and day, one upsert per statement. The orders are locked first so a concurrent write of the
+# same order waits and then applies its own delta to the totals this one leaves, and the rollups are
+# upserted in key order so concurrent writers lock them in the same order.
+APPLY_PURCHASE_ORDERS_SQL = """
+INSERT INTO supplier_daily_spend AS spend (supplier_id, day, order_count, total_quantity, total_amount, total_tax)
+SELECT po.supplier_id, (po.order_time AT TIME ZONE %(time_zone)s)::date,
+       %(sign)s * count(*), %(sign)s * sum(po.total_quantity),
+       %(sign)s * sum(po.total_amount), %(sign)s * sum(po.total_tax)
+FROM (SELECT * FROM purchase_orders WHERE {condition}) po
+GROUP BY 1, 2
+ORDER BY 1, 2
+ON CONFLICT (supplier_id, day) DO UPDATE SET
+    order_count = spend.order_count + EXCLUDED.order_count,
+    total_quantity = spend.total_quantity + EXCLUDED.total_quantity,
+    total_amount = spend.total_amount + EXCLUDED.total_amount,
+    total_tax = spend.total_tax + EXCLUDED.total_tax
+RETURNING spend.id, spend.order_count
+"""
+ORDERS_BY_ID = "id = ANY(%(purchase_order_ids)s) FOR UPDATE"
+# orders of a dropped partition, which nothing writes anymore
+ORDERS_PLACED_BETWEEN = "order_time >= %(order_time_from)s AND order_time < %(order_time_to)s"
+
+# Recomputes every rollup with one GROUP BY over the orders
+REBUILD_SQL = """
+INSERT INTO supplier_daily_spend (supplier_id, day, order_count, total_quantity, total_amount, total_tax)
+SELECT supplier_id, (order_time AT TIME ZONE %s)::date, count(*), sum(total_quantity), sum(total_amount), sum(total_tax)
+FROM purchase_orders
+GROUP BY 1, 2
+"""
+
+
+@instrument_service
+class SupplierDailySpendService:
+    """
+        Service class for the SupplierDailySpend rollups, the orders and spend of each supplier per
+        day in TIME_ZONE.
+
+        Writes of PurchaseOrders apply the difference they make to the rollups within their own
+        transaction, from the totals stored in purchase_orders, so the rollups stay equal to a
+        GROUP BY of the orders written through the services. rebuild() recomputes them all.
+
+        Methods:
+        - add_purchase_orders(purchase_order_ids)
+        - remove_purchase_orders(purchase_order_ids)
+        - remove_purchase_orders_placed_between(order_time_from, order_time_to)
+        - apply_purchase_orders(purchase_order_ids, sign)
+        - apply(condition, params)
+        - rebuild()
+        - get_report(date_from, date_to, supplier_id)
+    """
+    def add_purchase_orders(self, purchase_order_ids):
+        """
+        Adds saved PurchaseOrders to the rollups, after they are inserted or updated.
+        """
+        self.apply_purchase_orders(purchase_order_ids, 1)
+
+    def remove_purchase_orders(self, purchase_order_ids):
+        """
+        Subtracts PurchaseOrders from the rollups, before they are updated or deleted.
+        """
+        self.apply_purchase_orders(purchase_order_ids, -1)
+
+    def apply_purchase_orders(self, purchase_order_ids, sign):
+        """
+        Applies the totals of PurchaseOrders to the rollups with a single upsert, deleting the
+        rollups left without orders.
+        """
+        if not purchase_order_ids:
+            return
+        self.apply(ORDERS_BY_ID, {"sign": sign, "purchase_order_ids": list(purchase_order_ids)})
+
+    def remove_purchase_orders_placed_between(self, order_time_from, order_time_to):
+        """
+        Subtracts the PurchaseOrders placed in [order_time_from, order_time_to) from the rollups,
+        before they are dropped together.
+        """
+        self.apply(ORDERS_PLACED_BETWEEN, {"sign": -1, "order_time_from": order_time_from, "order_time_to": order_time_to})
+
+    def apply(self, condition, params):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                APPLY_PURCHASE_ORDERS_SQL.format(condition=condition), {"time_zone": settings.TIME_ZONE, **params}
+            )
+            empty_ids = [spend_id for spend_id, order_count in cursor.fetchall() if order_count == 0]
+        if empty_ids:
+            SupplierDailySpend.objects.filter(id__in=empty_ids, order_count=0).delete()
+
+    def rebuild(self):
+        """
+        Replaces every rollup with one recomputed from purchase_orders. Meant to run in a transaction,
+        which keeps the previous rollups visible to readers until it commits.
+
+        Returns:
+        - int: Number of rollups written.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {SupplierDailySpend._meta.db_table}")
+            cursor.execute(REBUILD_SQL, [settings.TIME_ZONE])
+            return cursor.rowcount
+
+    def get_report(self, date_from=None, date_to=None, supplier_id=None):
+        """
+        Returns the rollups between two days, both included, optionally of a single supplier,
+        ordered by day and supplier.
+        """
+        rollups = SupplierDailySpend.objects.all()
+        if date_from is not None:
+            rollups = rollups.filter(day__gte=date_from)
+        if date_to is not None:
+            rollups = rollups.filter(day__lte=date_to)
+        if supplier_id is not None:
+            rollups = rollups.filter(supplier_id=supplier_id)
+        return rollups.select_related("supplier").order_by("day", "supplier_id")
@@ -0,0 +1,9 @@
+from django.dispatch import receiver
+
+from order.api_services.purchase_order import PurchaseOrderAPIService
+from supplier.signals import suppliers_changed
+
+
+@receiver(suppliers_changed)
+def invalidate_purchase_orders_of_suppliers(sender, supplier_ids, **kwargs):
+    PurchaseOrderAPIService().invalidate_cached_purchase_orders_of_suppliers(supplier_ids)
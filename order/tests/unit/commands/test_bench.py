@@ -0,0 +1,43 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+
+from order.management.commands.bench import ENDPOINTS, percentile
+from order.models.purchase_order import PurchaseOrder
+from supplier.model.supplier import Supplier
+
+
+class BenchCommandTest(TransactionTestCase):
+    def test_bench_reports_every_endpoint(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = Path(directory) / "bench.json"
+
+            call_command(
+                "bench", orders=2, line_items_per_order=1, requests=2, concurrency=1, output=str(output),
+                stdout=StringIO(),
+            )
+
+            results = json.loads(output.read_text())
+        self.assertEqual(results["options"]["requests"], 2)
+        self.assertEqual(list(results["results"]), ENDPOINTS)
+        for endpoint, result in results["results"].items():
+            self.assertEqual((endpoint, result["requests"], result["errors"]), (endpoint, 2, 0))
+            self.assertGreater(result["queries_per_request"]["mean"], 0)
+        self.assertFalse(Supplier.objects.exists())
+        self.assertFalse(PurchaseOrder.objects.exists())
+
+
+class PercentileTest(TestCase):
+    def test_percentile_is_the_nearest_rank(self):
+        values = list(range(1, 101))
+
+        self.assertEqual(percentile(values, 0.50), 50)
+        self.assertEqual(percentile(values, 0.95), 95)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertEqual(percentile([1, 2], 0.50), 1)
+        self.assertEqual(percentile([1], 0.0), 1)
+        self.assertEqual(percentile([], 0.50), 0.0)
@@ -0,0 +1,29 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import TransactionTestCase
+
+from supplier.services.search_index import TRIGRAM_INDEXES, TrigramIndexService
+
+
+class CreateTrigramIndexesCommandTest(TransactionTestCase):
+    def test_create_fails_while_pg_trgm_is_not_available(self):
+        with mock.patch.object(TrigramIndexService, "is_available", return_value=False):
+            with self.assertRaisesMessage(CommandError, "pg_trgm is not available"):
+                call_command("create_trigram_indexes", stdout=StringIO())
+
+    def test_create_adds_the_missing_indexes_once_pg_trgm_is_available(self):
+        trigram_index_service = TrigramIndexService()
+        if not trigram_index_service.is_available():
+            self.assertEqual(trigram_index_service.get_missing_indexes(), list(TRIGRAM_INDEXES))
+            return
+        trigram_index_service.drop_indexes()
+        stdout = StringIO()
+
+        call_command("create_trigram_indexes", stdout=stdout)
+        call_command("create_trigram_indexes", stdout=stdout)
+
+        self.assertIn(f"Created {', '.join(TRIGRAM_INDEXES)}", stdout.getvalue())
+        self.assertIn("No trigram index to create", stdout.getvalue())
+        self.assertEqual(trigram_index_service.get_missing_indexes(), [])
@@ -0,0 +1,124 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from order.models.purchase_order import PurchaseOrder
+from supplier.model.line_items import LineItem
+from supplier.model.supplier import Supplier
+from supplier.tests.factory.supplier import SupplierFactory
+
+
+class ImportPurchaseOrdersCommandTest(TestCase):
+    def setUp(self) -> None:
+        self.supplier = SupplierFactory.create()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write_file(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w") as file:
+            file.write(content)
+        return path
+
+    def get_purchase_order_data(self, item_name="test prod"):
+        return {
+            "supplier": {"id": self.supplier.id, "name": self.supplier.name, "email": self.supplier.email},
+            "order_time": "2024-01-06T18:09:00Z",
+            "line_items": [
+                {
+                    "item_name": item_name,
+                    "quantity": 2,
+                    "price_without_tax": "10.05",
+                    "tax_name": "GST 5%",
+                    "tax_amount": "0.51"
+                }
+                for _ in range(2)
+            ]
+        }
+
+    def test_import_ndjson(self):
+        path = self.write_file(
+            "purchase_orders.ndjson", "\n".join(json.dumps(self.get_purchase_order_data()) for _ in range(3))
+        )
+
+        call_command("import_purchase_orders", path, chunk_size=2, stdout=StringIO())
+        purchase_orders = PurchaseOrder.objects.all()
+
+        self.assertEqual(purchase_orders.count(), 3)
+        for purchase_order in purchase_orders:
+            self.assertIsNotNone(purchase_order.order_number)
+            self.assertEqual(purchase_order.supplier_id, self.supplier.id)
+            self.assertEqual(purchase_order.order_time.isoformat(), "2024-01-06T18:09:00+00:00")
+            self.assertEqual(str(purchase_order.total_amount), "21.12")
+            self.assertEqual(str(purchase_order.total_tax), "1.02")
+            self.assertEqual(purchase_order.total_quantity, 4)
+        self.assertEqual(LineItem.objects.filter(line_total="10.56").count(), 6)
+        self.assertFalse(os.path.exists(f"{path}.checkpoint"))
+
+    def test_import_csv(self):
+        path = self.write_file(
+            "purchase_orders.csv",
+            "order_ref,order_time,supplier_id,supplier_name,supplier_email,item_name,quantity,"
+            "price_without_tax,tax_name,tax_amount\n"
+            "a,,,new supplier,new@email.com,test prod,1,10.00,GST 5%,0.50\n"
+            "a,,,new supplier,new@email.com,other prod,3,6.00,GST 5%,0.30\n"
+            "b,,,new supplier,new@email.com,test prod,1,10.00,GST 5%,0.50\n"
+        )
+
+        call_command("import_purchase_orders", path, stdout=StringIO())
+        purchase_orders = PurchaseOrder.objects.order_by("id")
+
+        self.assertEqual([purchase_order.total_quantity for purchase_order in purchase_orders], [4, 1])
+        self.assertEqual([str(purchase_order.total_amount) for purchase_order in purchase_orders], ["16.80", "10.50"])
+        self.assertEqual(len({purchase_order.supplier_id for purchase_order in purchase_orders}), 1)
+        self.assertEqual(LineItem.objects.count(), 3)
+
+    def test_import_csv_matches_the_supplier_by_id(self):
+        path = self.write_file(
+            "purchase_orders.csv",
+            "order_ref,order_time,supplier_id,supplier_name,supplier_email,item_name,quantity,"
+            "price_without_tax,tax_name,tax_amount\n"
+            f"a,,{self.supplier.id},renamed supplier,{self.supplier.email},test prod,1,10.00,GST 5%,0.50\n"
+        )
+
+        call_command("import_purchase_orders", path, stdout=StringIO())
+        self.supplier.refresh_from_db()
+
+        self.assertEqual(PurchaseOrder.objects.get().supplier_id, self.supplier.id)
+        self.assertEqual(self.supplier.name, "renamed supplier")
+        self.assertEqual(Supplier.objects.count(), 1)
+
+    def test_import_csv_with_an_invalid_supplier_id(self):
+        path = self.write_file(
+            "purchase_orders.csv",
+            "order_ref,order_time,supplier_id,supplier_name,supplier_email,item_name,quantity,"
+            "price_without_tax,tax_name,tax_amount\n"
+            f"a,,x1,{self.supplier.name},{self.supplier.email},test prod,1,10.00,GST 5%,0.50\n"
+        )
+
+        with self.assertRaisesMessage(CommandError, "Order 1: Invalid purchase order data: invalid supplier id x1"):
+            call_command("import_purchase_orders", path, stdout=StringIO())
+        self.assertFalse(PurchaseOrder.objects.exists())
+
+    def test_import_resumes_from_failed_chunk(self):
+        invalid_purchase_order_data = self.get_purchase_order_data()
+        del invalid_purchase_order_data["line_items"][0]["tax_amount"]
+        lines = [json.dumps(self.get_purchase_order_data(item_name=f"prod {index}")) for index in range(4)]
+        path = self.write_file("purchase_orders.ndjson", "\n".join(lines[:2] + [json.dumps(invalid_purchase_order_data)]))
+
+        with self.assertRaises(CommandError):
+            call_command("import_purchase_orders", path, chunk_size=2, stdout=StringIO())
+        self.assertEqual(PurchaseOrder.objects.count(), 2)
+
+        self.write_file("purchase_orders.ndjson", "\n".join(lines))
+        call_command("import_purchase_orders", path, chunk_size=2, resume=True, stdout=StringIO())
+
+        self.assertEqual(
+            sorted(LineItem.objects.values_list("item_name", flat=True).distinct()),
+            ["prod 0", "prod 1", "prod 2", "prod 3"]
+        )
+        self.assertEqual(PurchaseOrder.objects.count(), 4)
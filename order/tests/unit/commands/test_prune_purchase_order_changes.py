@@ -0,0 +1,27 @@
+import datetime
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from order.models.purchase_order_change import PurchaseOrderChange
+from order.tests.factory.purchase_order import PurchaseOrderFactory
+
+
+class PrunePurchaseOrderChangesCommandTest(TestCase):
+    def test_prune_deletes_the_changes_older_than_the_retention(self):
+        purchase_orders = PurchaseOrderFactory.create_batch(size=2)
+        PurchaseOrderChange.objects.filter(purchase_order_id=purchase_orders[0].id).update(
+            changed_at=timezone.now() - datetime.timedelta(days=settings.PURCHASE_ORDER_CHANGES_RETENTION_DAYS + 1)
+        )
+        stdout = StringIO()
+
+        call_command("prune_purchase_order_changes", stdout=stdout)
+
+        self.assertIn("Deleted 1 purchase order changes", stdout.getvalue())
+        self.assertEqual(
+            list(PurchaseOrderChange.objects.values_list("purchase_order_id", "deleted")),
+            [(purchase_orders[1].id, False)],
+        )
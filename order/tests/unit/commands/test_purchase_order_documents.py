@@ -0,0 +1,47 @@
+import datetime
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from order.api_services.purchase_order import PurchaseOrderAPIService
+from order.models.purchase_order_document import PurchaseOrderDocument
+from order.tests.factory.purchase_order import PurchaseOrderFactory
+from supplier.tests.factory.line_item import LineItemFactory
+from supplier.tests.factory.supplier import SupplierFactory
+
+
+class PurchaseOrderDocumentsCommandTest(TestCase):
+    def setUp(self) -> None:
+        self.purchase_order_api_service = PurchaseOrderAPIService()
+        supplier = SupplierFactory.create()
+        self.purchase_orders = [
+            PurchaseOrderFactory.create(supplier=supplier, order_time=order_time)
+            for order_time in [
+                datetime.datetime(2024, 1, 6, 18, 9, tzinfo=datetime.timezone.utc),
+                datetime.datetime(2024, 1, 6, 18, 9, 1, 250, tzinfo=datetime.timezone.utc),
+            ]
+        ]
+        LineItemFactory.create_batch(size=2, purchase_order=self.purchase_orders[0])
+
+    def test_rebuild_writes_documents_matching_the_api_representation(self):
+        call_command("purchase_order_documents", rebuild=True, stdout=StringIO())
+
+        for purchase_order in self.purchase_orders:
+            self.assertEqual(
+                self.purchase_order_api_service.purchase_order_document_service.get_document(purchase_order.id),
+                self.purchase_order_api_service.serialize_purchase_order_by_id(purchase_order.id),
+            )
+        stdout = StringIO()
+        call_command("purchase_order_documents", verify=True, stdout=stdout)
+        self.assertIn("Checked 2 orders", stdout.getvalue())
+        self.assertIn("0 without a current document, 0 mismatched", stdout.getvalue())
+
+    def test_verify_fails_on_a_document_differing_from_the_api_representation(self):
+        call_command("purchase_order_documents", rebuild=True, stdout=StringIO())
+        document = PurchaseOrderDocument.objects.get(purchase_order=self.purchase_orders[0])
+        document.document["total_amount"] = "0.01"
+        document.save()
+
+        with self.assertRaises(CommandError):
+            call_command("purchase_order_documents", verify=True, stdout=StringIO())
@@ -0,0 +1,167 @@
+import datetime
+from io import StringIO
+
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+from django.utils import timezone
+
+from order.api_services.purchase_order import PurchaseOrderAPIService
+from order.models.purchase_order import PurchaseOrder
+from order.models.purchase_order_document import PurchaseOrderDocument
+from order.models.supplier_daily_spend import SupplierDailySpend
+from order.services.purchase_order_partition import PurchaseOrderPartitionService
+from order.tests.factory.purchase_order import PurchaseOrderFactory
+from supplier.model.line_items import LineItem
+from supplier.tests.factory.line_item import LineItemFactory
+from supplier.tests.factory.supplier import SupplierFactory
+
+
+class PurchaseOrderPartitionsCommandTest(TestCase):
+    def setUp(self) -> None:
+        self.purchase_order_api_service = PurchaseOrderAPIService()
+        self.supplier = SupplierFactory.create()
+        self.purchase_orders = [
+            PurchaseOrderFactory.create(
+                supplier=self.supplier, order_time=datetime.datetime(2024, month, 10, tzinfo=datetime.timezone.utc)
+            )
+            for month in (1, 2)
+        ]
+        for purchase_order in self.purchase_orders:
+            LineItemFactory.create_batch(size=2, purchase_order=purchase_order)
+        purchase_order_ids = [purchase_order.id for purchase_order in self.purchase_orders]
+        self.purchase_order_api_service.purchase_order_document_service.write_documents(purchase_order_ids)
+        self.purchase_order_api_service.supplier_daily_spend_service.add_purchase_orders(purchase_order_ids)
+
+    def test_convert_keeps_the_orders_and_prunes_reads_by_order_time(self):
+        serialized_purchase_orders = [
+            self.purchase_order_api_service.serialize_purchase_order_by_id(purchase_order.id)
+            for purchase_order in self.purchase_orders
+        ]
+
+        call_command("purchase_order_partitions", convert=True, months_ahead=1, stdout=StringIO())
+
+        current_month = timezone.now().date().replace(day=1)
+        partition_months = PurchaseOrderPartitionService().get_partition_months()
+        self.assertEqual(partition_months[:3], [datetime.date(2024, 1, 1), datetime.date(2024, 2, 1), datetime.date(2024, 3, 1)])
+        self.assertIn(current_month, partition_months)
+        self.assertGreater(partition_months[-1], current_month)
+        self.assertEqual(
+            [
+                self.purchase_order_api_service.serialize_purchase_order_by_id(purchase_order.id)
+                for purchase_order in self.purchase_orders
+            ],
+            serialized_purchase_orders,
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = 'line_items'::regclass AND contype = 'f'"
+            )
+            self.assertIn(
+                "FOREIGN KEY (purchase_order_id, order_time) REFERENCES purchase_orders(id, order_time) "
+                "DEFERRABLE INITIALLY DEFERRED",
+                [row[0] for row in cursor.fetchall()],
+            )
+
+        # new orders get ids after the copied ones and land in the partition of the current month
+        created_purchase_order = self.purchase_order_api_service.create({
+            "supplier": {"id": self.supplier.id, "name": self.supplier.name, "email": self.supplier.email},
+            "line_items": [
+                {"item_name": "test prod", "quantity": 1, "price_without_tax": "10.00",
+                 "tax_name": "GST 5%", "tax_amount": "0.50"}
+            ],
+        })
+        self.assertGreater(created_purchase_order["id"], self.purchase_orders[-1].id)
+        self.assertEqual(LineItem.objects.filter(purchase_order_id=created_purchase_order["id"]).count(), 1)
+
+        purchase_orders = self.purchase_order_api_service.get_purchase_orders_for_query_params({
+            "order_time_from": "2024-02-01T00:00:00Z", "order_time_to": "2024-02-15T00:00:00Z", "item_name": "a",
+        })
+        plan = self.purchase_order_api_service.pagination.get_page_queryset(purchase_orders, 50, None).explain()
+        self.assertIn("purchase_orders_p202402", plan)
+        self.assertNotIn("purchase_orders_p202401", plan)
+        line_item_plan = self.purchase_order_api_service.line_item_service.get_item_rows_queryset(
+            [self.purchase_orders[1].id], [self.purchase_orders[1].order_time]
+        ).explain()
+        self.assertIn("line_items_p202402", line_item_plan)
+        self.assertNotIn("line_items_p202401", line_item_plan)
+
+    def test_drop_before_drops_the_partitions_of_older_months(self):
+        call_command("purchase_order_partitions", convert=True, months_ahead=0, stdout=StringIO())
+        stdout = StringIO()
+
+        # options of a required group go through the parser, so the month is given as on the command line
+        call_command("purchase_order_partitions", "--drop-before", "2024-02", stdout=stdout)
+
+        self.assertIn("Dropped the partitions of 2024-01", stdout.getvalue())
+        self.assertEqual(PurchaseOrderPartitionService().get_partition_months()[0], datetime.date(2024, 2, 1))
+        self.assertEqual(list(PurchaseOrder.objects.values_list("id", flat=True)), [self.purchase_orders[1].id])
+        self.assertEqual(
+            set(LineItem.objects.values_list("purchase_order_id", flat=True)), {self.purchase_orders[1].id}
+        )
+        self.assertEqual(
+            list(PurchaseOrderDocument.objects.values_list("purchase_order_id", flat=True)), [self.purchase_orders[1].id]
+        )
+        self.assertEqual(list(SupplierDailySpend.objects.values_list("day", flat=True)), [datetime.date(2024, 2, 10)])
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT purchase_order_id FROM purchase_order_numbers")
+            self.assertEqual([row[0] for row in cursor.fetchall()], [self.purchase_orders[1].id])
+
+    def test_create_adds_the_partitions_ahead(self):
+        with self.assertRaises(CommandError):
+            call_command("purchase_order_partitions", create=True, stdout=StringIO())
+        call_command("purchase_order_partitions", convert=True, months_ahead=0, stdout=StringIO())
+        partition_months = PurchaseOrderPartitionService().get_partition_months()
+        stdout = StringIO()
+
+        call_command("purchase_order_partitions", create=True, months_ahead=2, stdout=stdout)
+
+        self.assertEqual(len(PurchaseOrderPartitionService().get_partition_months()), len(partition_months) + 2)
+        call_command("purchase_order_partitions", create=True, months_ahead=2, stdout=stdout)
+        self.assertIn("No partition to create", stdout.getvalue())
+
+    def test_orders_of_months_without_a_partition_are_moved_out_of_the_default_partition(self):
+        call_command("purchase_order_partitions", convert=True, months_ahead=0, stdout=StringIO())
+        purchase_order = PurchaseOrderFactory.create(
+            supplier=self.supplier, order_time=datetime.datetime(2023, 6, 10, tzinfo=datetime.timezone.utc)
+        )
+        LineItemFactory.create_batch(size=2, purchase_order=purchase_order)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT id FROM purchase_orders_default")
+            self.assertEqual([row[0] for row in cursor.fetchall()], [purchase_order.id])
+
+        with self.assertLogs("order.services.purchase_order_partition", level="WARNING"):
+            call_command("purchase_order_partitions", create=True, months_ahead=0, stdout=StringIO())
+
+        self.assertIn(datetime.date(2023, 6, 1), PurchaseOrderPartitionService().get_partition_months())
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM purchase_orders_default")
+            self.assertEqual(cursor.fetchone()[0], 0)
+            cursor.execute("SELECT count(*) FROM line_items_default")
+            self.assertEqual(cursor.fetchone()[0], 0)
+            cursor.execute("SELECT count(*) FROM line_items_p202306")
+            self.assertEqual(cursor.fetchone()[0], 2)
+        self.assertEqual(LineItem.objects.filter(purchase_order_id=purchase_order.id).count(), 2)
+
+    def test_order_numbers_stay_unique_across_partitions(self):
+        call_command("purchase_order_partitions", convert=True, months_ahead=0, stdout=StringIO())
+        order_number = self.purchase_orders[0].order_number
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            PurchaseOrderFactory.create(
+                supplier=self.supplier, order_number=order_number,
+                order_time=datetime.datetime(2024, 2, 20, tzinfo=datetime.timezone.utc),
+            )
+
+        # the number of a deleted order can be taken again, and renumbering moves the key
+        PurchaseOrder.objects.filter(id=self.purchase_orders[0].id).delete()
+        purchase_order = PurchaseOrderFactory.create(
+            supplier=self.supplier, order_number=order_number,
+            order_time=datetime.datetime(2024, 2, 20, tzinfo=datetime.timezone.utc),
+        )
+        PurchaseOrder.objects.filter(id=self.purchase_orders[1].id).update(order_number=order_number + 1000)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT order_number, purchase_order_id FROM purchase_order_numbers ORDER BY order_number")
+            self.assertEqual(
+                cursor.fetchall(), [(order_number, purchase_order.id), (order_number + 1000, self.purchase_orders[1].id)]
+            )
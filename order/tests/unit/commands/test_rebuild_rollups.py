@@ -0,0 +1,36 @@
+import datetime
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from order.models.supplier_daily_spend import SupplierDailySpend
+from order.tests.factory.purchase_order import PurchaseOrderFactory
+from supplier.tests.factory.supplier import SupplierFactory
+
+
+class RebuildRollupsCommandTest(TestCase):
+    def test_rebuild_recomputes_the_rollups_from_the_orders(self):
+        supplier = SupplierFactory.create()
+        for hour in (0, 23):
+            PurchaseOrderFactory.create(
+                supplier=supplier, total_quantity=3, total_amount=10.50, total_tax=0.50,
+                order_time=datetime.datetime(2024, 1, 6, hour, tzinfo=datetime.timezone.utc),
+            )
+        # a stale rollup of a day without orders
+        SupplierDailySpend.objects.create(
+            supplier=supplier, day=datetime.date(2024, 1, 5), order_count=1, total_quantity=1,
+            total_amount=1, total_tax=0,
+        )
+
+        stdout = StringIO()
+        call_command("rebuild_rollups", stdout=stdout)
+
+        self.assertIn("Rebuilt 1 supplier daily spend rollups", stdout.getvalue())
+        self.assertEqual(
+            list(SupplierDailySpend.objects.values_list(
+                "supplier_id", "day", "order_count", "total_quantity", "total_amount", "total_tax"
+            )),
+            [(supplier.id, datetime.date(2024, 1, 6), 2, 6, Decimal("21.00"), Decimal("1.00"))],
+        )
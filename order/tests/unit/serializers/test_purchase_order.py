@@ -0,0 +1,43 @@
+import datetime
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+
+from order.api_services.purchase_order import PurchaseOrderAPIService
+from order.models.purchase_order import PurchaseOrder
+from order.tests.factory.purchase_order import PurchaseOrderFactory
+from supplier.tests.factory.line_item import LineItemFactory
+from supplier.tests.factory.supplier import SupplierFactory
+
+
+class PurchaseOrderRowSerializerTest(TestCase):
+    def setUp(self) -> None:
+        self.purchase_order_api_service = PurchaseOrderAPIService()
+        supplier = SupplierFactory.create()
+        whole_second_order = PurchaseOrderFactory.create(
+            supplier=supplier,
+            order_time=datetime.datetime(2024, 1, 6, 18, 9, tzinfo=datetime.timezone.utc),
+            total_amount=Decimal("0"),
+            total_tax=Decimal("-1.5"),
+        )
+        PurchaseOrder.objects.filter(id=whole_second_order.id).update(order_number=None)
+        PurchaseOrderFactory.create(
+            supplier=supplier,
+            order_time=datetime.datetime(2024, 1, 6, 18, 9, 1, 5, tzinfo=datetime.timezone.utc),
+            total_amount=Decimal("12345678.99"),
+        )
+        LineItemFactory.create(purchase_order=whole_second_order, price_without_tax=Decimal("0.01"), tax_total=0)
+        LineItemFactory.create(purchase_order=whole_second_order, item_name="ünïcode", tax_total=Decimal("99.99"))
+
+    def test_row_serializers_render_the_same_json_as_the_drf_serializers(self):
+        purchase_orders = PurchaseOrder.objects.select_related("supplier").order_by("id")
+
+        serialized_with_drf = self.purchase_order_api_service.serialize_purchase_orders(purchase_orders.all())
+        serialized_with_rows = self.purchase_order_api_service.serialize_purchase_order_rows(
+            self.purchase_order_api_service.get_purchase_order_rows(purchase_orders.all())
+        )
+
+        self.assertIsNone(serialized_with_rows[0]["order_number"])
+        self.assertEqual(len(serialized_with_rows[0]["line_items"]), 2)
+        self.assertEqual(JSONRenderer().render(serialized_with_rows), JSONRenderer().render(serialized_with_drf))
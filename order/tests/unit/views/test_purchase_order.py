@@ -1,8 +1,21 @@
+import csv
+import datetime
+import gzip
+import json
+from unittest import mock
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APITestCase
 
+from order.api_services.purchase_order import PurchaseOrderAPIService
+from order.cache import DjangoPurchaseOrderCache, LocalPurchaseOrderCache
+from order.models.purchase_order import PurchaseOrder
 from order.tests.factory.purchase_order import PurchaseOrderFactory
 from supplier.model.line_items import LineItem
+from supplier.model.supplier import Supplier
 from supplier.tests.factory.line_item import LineItemFactory
 from supplier.tests.factory.supplier import SupplierFactory
 
@@ -124,6 +137,18 @@ class PurchaseOrderViewTest(APITestCase):
 
         self.assertEqual(response.status_code, 204)
 
+    def test_purchase_order_delete_request_deletes_the_line_items_without_loading_them(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.delete(
+                path=reverse('purchase_order_view', kwargs={'purchase_order_id': self.purchase_order.id}),
+            )
+
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(LineItem.objects.filter(purchase_order_id=self.purchase_order.id).exists())
+        self.assertFalse([
+            query for query in queries if query["sql"].startswith("SELECT") and '"line_items"' in query["sql"]
+        ])
+
     def test_purchase_order_delete_request_by_invalid_id(self):
         response = self.client.delete(
             path=reverse('purchase_order_view', kwargs={'purchase_order_id': 9999}),
@@ -240,7 +265,7 @@ class PurchaseOrderViewTest(APITestCase):
             path=reverse('purchase_order_creation'),
             **{'supplier_name': f'{self.supplier.name[0:2]}'}
         )
-        response_data = response.data
+        response_data = response.data["results"]
 
         self.assertEqual(response.status_code, 200)
         self.assertEqual(len(response_data),1)
@@ -258,7 +283,7 @@ class PurchaseOrderViewTest(APITestCase):
             path=reverse('purchase_order_creation'),
             **{'item_name': f'{self.line_items[0].item_name[0:2]}'}
         )
-        response_data = response.data
+        response_data = response.data["results"]
 
         self.assertEqual(response.status_code, 200)
         self.assertEqual(len(response_data),1)
@@ -269,3 +294,741 @@ class PurchaseOrderViewTest(APITestCase):
         self.assertEqual(response_data[0]["total_tax"], "1.00")
         self.assertEqual(response_data[0]["total_amount"], "5.00")
         self.assertEqual(response_data[0]["total_quantity"], 4)
+
+    def test_get_all_purchase_orders_query_count_does_not_grow_with_orders(self):
+        for _ in range(5):
+            purchase_order = PurchaseOrderFactory.create(supplier=SupplierFactory.create())
+            for line_item in LineItemFactory.build_batch(size=3, purchase_order=purchase_order):
+                line_item.save()
+
+        # one query for the ETag of the page, one for the orders joined with their suppliers
+        # and one for all their line items
+        with self.assertNumQueries(3):
+            response = self.client.get(path=reverse('purchase_order_creation'))
+
+        response_data = response.data["results"]
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response_data), 6)
+        self.assertEqual(sum(len(purchase_order["line_items"]) for purchase_order in response_data), 17)
+
+    def test_get_purchase_orders_pages_with_cursor(self):
+        # factory orders share the same order_time so the pages also split on ties of order_time
+        purchase_order_ids = [self.purchase_order.id] + [
+            purchase_order.id for purchase_order in PurchaseOrderFactory.create_batch(size=4, supplier=self.supplier)
+        ]
+
+        first_page = self.client.get(path=reverse('purchase_order_creation'), data={'limit': 2}).data
+        second_page = self.client.get(first_page["next"]).data
+        last_page = self.client.get(second_page["next"]).data
+        previous_page = self.client.get(last_page["prev"]).data
+
+        self.assertIsNone(first_page["prev"])
+        self.assertEqual([purchase_order["id"] for purchase_order in first_page["results"]], purchase_order_ids[0:2])
+        self.assertEqual([purchase_order["id"] for purchase_order in second_page["results"]], purchase_order_ids[2:4])
+        self.assertEqual([purchase_order["id"] for purchase_order in last_page["results"]], purchase_order_ids[4:])
+        self.assertIsNone(last_page["next"])
+        self.assertEqual(previous_page["results"], second_page["results"])
+
+    def test_get_purchase_orders_pages_with_item_name_filter(self):
+        other_purchase_order = PurchaseOrderFactory.create(supplier=self.supplier)
+        LineItemFactory.build(purchase_order=other_purchase_order, item_name="test_product").save()
+        PurchaseOrderFactory.create(supplier=self.supplier)
+
+        first_page = self.client.get(
+            path=reverse('purchase_order_creation'), data={'item_name': 'test_', 'limit': 1}
+        ).data
+        last_page = self.client.get(first_page["next"]).data
+
+        self.assertEqual([purchase_order["id"] for purchase_order in first_page["results"]], [self.purchase_order.id])
+        self.assertEqual([purchase_order["id"] for purchase_order in last_page["results"]], [other_purchase_order.id])
+        self.assertIsNone(last_page["next"])
+
+    def test_get_purchase_orders_with_invalid_cursor(self):
+        response = self.client.get(path=reverse('purchase_order_creation'), data={'cursor': 'invalid'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["error"], "Invalid cursor invalid")
+
+    def test_get_purchase_orders_with_order_time_range_and_supplier_name(self):
+        other_supplier = SupplierFactory.create(name="other supplier")
+        purchase_orders = {
+            (supplier.id, hour): PurchaseOrderFactory.create(
+                supplier=supplier, order_time=datetime.datetime(2024, 1, 6, hour, tzinfo=datetime.timezone.utc)
+            )
+            for supplier in (self.supplier, other_supplier)
+            for hour in (8, 9, 10)
+        }
+
+        response = self.client.get(path=reverse('purchase_order_creation'), data={
+            'order_time_from': '2024-01-06T09:00:00Z', 'order_time_to': '2024-01-06T10:00:00Z'
+        })
+        self.assertEqual(
+            [purchase_order["id"] for purchase_order in response.data["results"]],
+            sorted([purchase_orders[(self.supplier.id, 9)].id, purchase_orders[(other_supplier.id, 9)].id]),
+        )
+
+        # naive times are read in TIME_ZONE
+        response = self.client.get(path=reverse('purchase_order_creation'), data={
+            'order_time_from': '2024-01-06T09:00:00', 'supplier_name': 'other'
+        })
+        self.assertEqual(
+            [purchase_order["id"] for purchase_order in response.data["results"]],
+            [purchase_orders[(other_supplier.id, 9)].id, purchase_orders[(other_supplier.id, 10)].id],
+        )
+
+    def test_get_purchase_orders_with_invalid_order_time(self):
+        response = self.client.get(path=reverse('purchase_order_creation'), data={'order_time_from': 'yesterday'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["error"], "Invalid order_time_from yesterday, expected an ISO 8601 date and time"
+        )
+        response = self.client.get(path=reverse('purchase_order_export'), data={'order_time_to': '2024-13-01'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_get_purchase_orders_of_an_order_time_range_scans_the_order_time_index(self):
+        first_order_time = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+        PurchaseOrder.objects.bulk_create([
+            PurchaseOrder(
+                supplier=self.supplier, total_quantity=1, total_amount=1, total_tax=0,
+                order_time=first_order_time + datetime.timedelta(minutes=10 * i),
+            )
+            for i in range(5000)
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE purchase_orders")
+        purchase_order_api_service = PurchaseOrderAPIService()
+        purchase_orders = purchase_order_api_service.get_purchase_orders_for_query_params({
+            'order_time_from': '2024-01-20T00:00:00Z', 'order_time_to': '2024-01-21T00:00:00Z'
+        })
+
+        plan = purchase_order_api_service.pagination.get_page_queryset(purchase_orders, 50, None).explain()
+
+        self.assertIn("Index Scan using purchase_order_time_id_idx on purchase_orders", plan)
+        self.assertIn("Index Cond: ((order_time >= ", plan)
+        self.assertNotIn("Seq Scan on purchase_orders", plan)
+        # the index hands the rows out in page order, nothing is sorted
+        self.assertNotIn("Sort", plan)
+
+    def test_export_purchase_orders_as_ndjson(self):
+        response = self.client.get(path=reverse('purchase_order_export'))
+        exported_purchase_orders = [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(len(exported_purchase_orders), 1)
+        self.assertEqual(exported_purchase_orders[0]["id"], self.purchase_order.id)
+        self.assertEqual(exported_purchase_orders[0]["total_amount"], "5.00")
+        self.assertEqual(len(exported_purchase_orders[0]["line_items"]), len(self.line_items))
+
+    def test_export_purchase_orders_as_gzipped_csv(self):
+        PurchaseOrderFactory.create(supplier=self.supplier)
+
+        response = self.client.get(
+            path=reverse('purchase_order_export'), data={'export_format': 'csv', 'compression': 'gzip'}
+        )
+        rows = list(csv.DictReader(gzip.decompress(b"".join(response.streaming_content)).decode().splitlines()))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="purchase_orders.csv.gz"')
+        # one row per line item plus a single row for the order without line items
+        self.assertEqual(len(rows), len(self.line_items) + 1)
+        self.assertEqual(rows[0]["supplier_name"], self.supplier.name)
+        self.assertEqual(rows[0]["line_item_item_name"], "test_product")
+        self.assertEqual(rows[-1]["line_item_id"], "")
+
+    def test_export_purchase_orders_with_invalid_format(self):
+        response = self.client.get(path=reverse('purchase_order_export'), data={'export_format': 'xml'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["error"], "Invalid export format xml, expected one of ndjson, csv")
+
+    def test_purchase_order_creation_request_inserts_line_items_in_one_statement(self):
+        request_data = {
+            "supplier": {
+                "id": self.supplier.id,
+                "name": self.supplier.name,
+                "email": self.supplier.email
+            },
+            "line_items": [
+                {
+                    "item_name": f"test prod {index}",
+                    "quantity": 1,
+                    "price_without_tax": "10.05",
+                    "tax_name": "GST 5%",
+                    "tax_amount": "0.51"
+                }
+                for index in range(200)
+            ]
+        }
+
+        with CaptureQueriesContext(connection) as captured_queries:
+            response = self.client.post(
+                path=reverse('purchase_order_creation'),
+                data=request_data,
+                format='json'
+            )
+        line_item_inserts = [
+            query for query in captured_queries if query["sql"].startswith('INSERT INTO "line_items"')
+        ]
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(line_item_inserts), 1)
+        self.assertEqual(len(response.data["line_items"]), 200)
+        self.assertEqual(response.data["total_amount"], "2112.00")
+        self.assertTrue(all(line_item["line_total"] == "10.56" for line_item in response.data["line_items"]))
+        self.assertEqual(
+            LineItem.objects.filter(purchase_order_id=response.data["id"], line_total="10.56").count(), 200
+        )
+
+    def test_purchase_order_update_request_writes_only_line_item_differences(self):
+        removed_line_item = LineItemFactory.build(purchase_order=self.purchase_order)
+        removed_line_item.save()
+        unchanged_line_item, changed_line_item = self.line_items
+        request_data = {
+            "id": self.purchase_order.id,
+            "supplier": {
+                "id": self.supplier.id,
+                "name": self.supplier.name,
+                "email": self.supplier.email
+            },
+            "line_items": [
+                {
+                    "id": unchanged_line_item.id,
+                    "item_name": unchanged_line_item.item_name,
+                    "quantity": unchanged_line_item.quantity,
+                    "price_without_tax": "2.00",
+                    "tax_name": unchanged_line_item.tax_name,
+                    "tax_amount": "0.50"
+                },
+                {
+                    "id": changed_line_item.id,
+                    "item_name": "changed prod",
+                    "quantity": 3,
+                    "price_without_tax": "2.00",
+                    "tax_name": changed_line_item.tax_name,
+                    "tax_amount": "0.75"
+                },
+                {
+                    "item_name": "new prod",
+                    "quantity": 4,
+                    "price_without_tax": "6.00",
+                    "tax_name": "GST 5%",
+                    "tax_amount": "0.30"
+                }
+            ]
+        }
+
+        with CaptureQueriesContext(connection) as captured_queries:
+            response = self.client.put(
+                path=reverse('purchase_order_view', kwargs={'purchase_order_id': self.purchase_order.id}),
+                data=request_data,
+                format='json'
+            )
+        line_item_writes = [
+            query["sql"].split(" ")[0] for query in captured_queries
+            if '"line_items"' in query["sql"] and not query["sql"].startswith("SELECT")
+        ]
+        changed_line_item.refresh_from_db()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(line_item_writes, ["UPDATE", "INSERT", "DELETE"])
+        self.assertEqual([line_item["item_name"] for line_item in response.data["line_items"]],
+                         [unchanged_line_item.item_name, "changed prod", "new prod"])
+        self.assertEqual(changed_line_item.item_name, "changed prod")
+        self.assertEqual(str(changed_line_item.line_total), "2.75")
+        self.assertFalse(LineItem.objects.filter(id=removed_line_item.id).exists())
+
+    def test_purchase_order_update_request_with_line_item_of_another_order(self):
+        other_line_item = LineItemFactory.build(purchase_order=PurchaseOrderFactory.create(supplier=self.supplier))
+        other_line_item.save()
+        request_data = {
+            "id": self.purchase_order.id,
+            "supplier": {
+                "id": self.supplier.id,
+                "name": self.supplier.name,
+                "email": self.supplier.email
+            },
+            "line_items": [
+                {
+                    "id": other_line_item.id,
+                    "item_name": "test prod",
+                    "quantity": 1,
+                    "price_without_tax": "10.00",
+                    "tax_name": "GST 5%",
+                    "tax_amount": "0.50"
+                }
+            ]
+        }
+
+        response = self.client.put(
+            path=reverse('purchase_order_view', kwargs={'purchase_order_id': self.purchase_order.id}),
+            data=request_data,
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.data["error"], f"Line Item id not found for id {other_line_item.id}")
+        self.assertEqual(LineItem.objects.filter(purchase_order=self.purchase_order).count(), len(self.line_items))
+
+    def test_purchase_order_creation_request_allocates_order_number_in_insert(self):
+        request_data = {
+            "supplier": {
+                "id": self.supplier.id,
+                "name": self.supplier.name,
+                "email": self.supplier.email
+            },
+            "line_items": []
+        }
+
+        with CaptureQueriesContext(connection) as captured_queries:
+            response = self.client.post(
+                path=reverse('purchase_order_creation'),
+                data=request_data,
+                format='json'
+            )
+        purchase_order_writes = [query for query in captured_queries if '"purchase_orders"' in query["sql"]]
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(purchase_order_writes), 1)
+        self.assertGreater(response.data["order_number"], self.purchase_order.order_number)
+
+    def test_get_purchase_orders_with_supplier_and_item_name_returns_each_order_once(self):
+        response = self.client.get(
+            path=reverse('purchase_order_creation'),
+            data={'supplier_name': self.supplier.name[1:4].lower(), 'item_name': 'PRODUCT'}
+        )
+        response_data = response.data["results"]
+
+        # both line items of the order match the item name
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([purchase_order["id"] for purchase_order in response_data], [self.purchase_order.id])
+        self.assertEqual(len(response_data[0]["line_items"]), len(self.line_items))
+
+    def test_bulk_purchase_order_creation_request(self):
+        new_supplier = {"id": None, "name": "bulk supplier", "email": "bulk@email.com"}
+        line_item = {
+            "item_name": "test prod",
+            "quantity": 2,
+            "price_without_tax": "10.00",
+            "tax_name": "GST 5%",
+            "tax_amount": "0.50"
+        }
+        request_data = [
+            {"supplier": dict(new_supplier), "line_items": [dict(line_item), dict(line_item)]},
+            {"supplier": {"id": self.supplier.id, "name": "renamed supplier", "email": self.supplier.email},
+             "line_items": [dict(line_item)]},
+            {"supplier": dict(new_supplier)},
+            {"supplier": dict(new_supplier), "line_items": [dict(line_item)]},
+        ]
+
+        response = self.client.post(
+            path=reverse('purchase_order_bulk_creation'),
+            data=request_data,
+            format='json'
+        )
+        response_data = response.data
+        created_ids = [result["id"] for result in response_data if "id" in result]
+        self.supplier.refresh_from_db()
+
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(len(response_data), 4)
+        self.assertEqual(response_data[2], {"error": "Invalid purchase order data: missing 'line_items'"})
+        self.assertEqual(len(created_ids), 3)
+        self.assertEqual(self.supplier.name, "renamed supplier")
+        created_purchase_orders = self.client.get(
+            path=reverse('purchase_order_view', kwargs={'purchase_order_id': response_data[0]["id"]})
+        ).data
+        self.assertEqual(created_purchase_orders["total_amount"], "21.00")
+        self.assertEqual(created_purchase_orders["total_quantity"], 4)
+        self.assertEqual(len(created_purchase_orders["line_items"]), 2)
+        self.assertIsNotNone(created_purchase_orders["order_number"])
+        # both orders of the new supplier share a single supplier row
+        self.assertEqual(
+            self.client.get(
+                path=reverse('purchase_order_view', kwargs={'purchase_order_id': response_data[3]["id"]})
+            ).data["supplier"]["id"],
+            created_purchase_orders["supplier"]["id"]
+        )
+
+    def test_bulk_purchase_order_creation_request_reports_errors_per_order(self):
+        line_item = {
+            "item_name": "test prod",
+            "quantity": 1,
+            "price_without_tax": "10.00",
+            "tax_name": "GST 5%",
+            "tax_amount": "0.50"
+        }
+        supplier_count = Supplier.objects.count()
+        request_data = [
+            # a numeric string id matches the existing supplier
+            {"supplier": {"id": str(self.supplier.id), "name": "renamed supplier", "email": self.supplier.email},
+             "line_items": [dict(line_item)]},
+            {"supplier": {"id": "abc", "name": self.supplier.name, "email": self.supplier.email},
+             "line_items": [dict(line_item)]},
+            {"supplier": {"id": self.supplier.id, "name": self.supplier.name, "email": self.supplier.email},
+             "line_items": [dict(line_item, item_name="x" * 300)]},
+            # out of the range of the quantity column, only rejected by the database
+            {"supplier": {"id": self.supplier.id, "name": self.supplier.name, "email": self.supplier.email},
+             "line_items": [dict(line_item, quantity=10 ** 12)]},
+            {"supplier": {"id": self.supplier.id, "name": self.supplier.name, "email": self.supplier.email},
+             "line_items": [dict(line_item)]},
+        ]
+
+        response_data = self.client.post(
+            path=reverse('purchase_order_bulk_creation'), data=request_data, format='json'
+        ).data
+
+        self.assertEqual(Supplier.objects.count(), supplier_count)
+        self.assertEqual(
+            PurchaseOrder.objects.get(id=response_data[0]["id"]).supplier_id, self.supplier.id
+        )
+        self.assertEqual(response_data[1], {"error": "Invalid purchase order data: invalid supplier id abc"})
+        self.assertEqual(
+            response_data[2], {"error": "Invalid purchase order data: line item item_name is longer than 256 characters"}
+        )
+        self.assertTrue(response_data[3]["error"].startswith("Purchase order could not be saved"))
+        self.assertIn("id", response_data[4])
+
+    def test_bulk_purchase_order_creation_request_with_ndjson(self):
+        purchase_order = {
+            "supplier": {"id": self.supplier.id, "name": self.supplier.name, "email": self.supplier.email},
+            "line_items": [
+                {
+                    "item_name": "test prod",
+                    "quantity": 1,
+                    "price_without_tax": "10.00",
+                    "tax_name": "GST 5%",
+                    "tax_amount": "0.50"
+                }
+            ]
+        }
+        request_body = "\n".join(json.dumps(purchase_order) for _ in range(3)) + "\n"
+
+        response = self.client.post(
+            path=reverse('purchase_order_bulk_creation'),
+            data=request_body,
+            content_type='application/x-ndjson'
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(
+            LineItem.objects.filter(purchase_order_id__in=[result["id"] for result in response.data]).count(), 3
+        )
+
+    def test_purchase_order_get_request_with_matching_etag_is_not_modified(self):
+        path = reverse('purchase_order_view', kwargs={'purchase_order_id': self.purchase_order.id})
+        etag = self.client.get(path=path)["ETag"]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(path=path, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("line_items", queries[0]["sql"])
+
+    def test_purchase_order_etag_changes_with_line_items_and_supplier(self):
+        path = reverse('purchase_order_view', kwargs={'purchase_order_id': self.purchase_order.id})
+        first_etag = self.client.get(path=path)["ETag"]
+        self.line_items[0].quantity = 5
+        self.line_items[0].save()
+        second_etag = self.client.get(path=path)["ETag"]
+        self.supplier.name = "renamed supplier"
+        self.supplier.save()
+
+        response = self.client.get(path=path, HTTP_IF_NONE_MATCH=second_etag)
+
+        self.assertNotEqual(first_etag, second_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], second_etag)
+
+    def test_get_purchase_orders_page_with_matching_etag_is_not_modified(self):
+        etag = self.client.get(path=reverse('purchase_order_creation'))["ETag"]
+        not_modified_response = self.client.get(path=reverse('purchase_order_creation'), HTTP_IF_NONE_MATCH=etag)
+        PurchaseOrderFactory.create(supplier=self.supplier)
+
+        response = self.client.get(path=reverse('purchase_order_creation'), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(not_modified_response.status_code, 304)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_get_purchase_orders_page_is_sent_with_the_etag_of_the_page_read(self):
+        path = reverse('purchase_order_creation')
+        get_etag_by_query_params = PurchaseOrderAPIService.get_etag_by_query_params
+
+        def get_etag_then_update_the_order(service, query_params):
+            etag = get_etag_by_query_params(service, query_params)
+            # written by another request between the ETag check and the read of the page
+            PurchaseOrder.objects.filter(id=self.purchase_order.id).update(total_amount=6)
+            return etag
+
+        for query_params in ({}, {"fields": "id,total_amount"}):
+            with mock.patch.object(
+                PurchaseOrderAPIService, "get_etag_by_query_params", get_etag_then_update_the_order
+            ):
+                response = self.client.get(path=path, data=query_params)
+
+            self.assertEqual(response.data["results"][0]["total_amount"], "6.00")
+            self.assertEqual(response["ETag"], self.client.get(path=path, data=query_params)["ETag"])
+
+    def test_purchase_order_get_request_reads_the_document_written_on_creation(self):
+        request_data = {
+            "supplier": {"id": self.supplier.id, "name": self.supplier.name, "email": self.supplier.email},
+            "line_items": [
+                {
+                    "item_name": "test prod",
+                    "quantity": 1,
+                    "price_without_tax": "10.00",
+                    "tax_name": "GST 5%",
+                    "tax_amount": "0.50"
+                }
+            ]
+        }
+        purchase_order_id = self.client.post(
+            path=reverse('purchase_order_creation'), data=request_data, format='json'
+        ).data["id"]
+        path = reverse('purchase_order_view', kwargs={'purchase_order_id': purchase_order_id})
+
+        PurchaseOrderAPIService.purchase_order_cache.delete_many([purchase_order_id])
+        # the ETag lookup and the document
+        with self.assertNumQueries(2):
+            response = self.client.get(path=path)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            json.dumps(response.data),
+            json.dumps(PurchaseOrderAPIService().serialize_purchase_order_by_id(purchase_order_id))
+        )
+
+    def test_purchase_order_get_request_skips_the_document_of_a_changed_order(self):
+        PurchaseOrderAPIService().purchase_order_document_service.write_documents([self.purchase_order.id])
+        self.line_items[0].item_name = "renamed item"
+        self.line_items[0].save()
+
+        response = self.client.get(
+            path=reverse('purchase_order_view', kwargs={'purchase_order_id': self.purchase_order.id})
+        )
+
+        self.assertEqual(response.data["line_items"][0]["item_name"], "renamed item")
+
+    def test_get_purchase_orders_with_fields_selects_only_their_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                path=reverse('purchase_order_creation'), data={"fields": "order_number,total_amount"}
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.data["results"],
+            [{"order_number": self.purchase_order.order_number, "total_amount": "5.00"}],
+        )
+        # the ETag of the page and the page itself, without a join on suppliers or a line items query
+        self.assertEqual(len(queries), 2)
+        self.assertNotIn("suppliers", queries[1]["sql"])
+        self.assertNotIn("total_tax", queries[1]["sql"])
+
+    def test_purchase_order_get_request_by_id_with_fields_and_include(self):
+        path = reverse('purchase_order_view', kwargs={'purchase_order_id': self.purchase_order.id})
+        full_response = self.client.get(path=path)
+
+        response = self.client.get(path=path, data={"fields": "id", "include": "line_items"})
+        supplier_response = self.client.get(path=path, data={"include": "supplier"})
+
+        self.assertEqual(list(response.data), ["id", "line_items"])
+        self.assertEqual(response.data["line_items"], full_response.data["line_items"])
+        self.assertNotEqual(response["ETag"], full_response["ETag"])
+        self.assertEqual(supplier_response.data, {
+            key: value for key, value in full_response.data.items() if key != "line_items"
+        })
+
+    def test_get_purchase_orders_with_invalid_fields(self):
+        response = self.client.get(path=reverse('purchase_order_creation'), data={"fields": "id,supplier"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["error"],
+            "Invalid fields supplier, expected any of id, order_time, order_number, total_quantity, "
+            "total_amount, total_tax"
+        )
+
+    def test_async_purchase_order_get_request_by_id_matches_the_sync_view(self):
+        path = reverse('purchase_order_view', kwargs={'purchase_order_id': self.purchase_order.id})
+        async_path = reverse('purchase_order_async_view', kwargs={'purchase_order_id': self.purchase_order.id})
+        sync_response = self.client.get(path=path)
+        PurchaseOrderAPIService.purchase_order_cache.delete_many([self.purchase_order.id])
+
+        response = self.client.get(path=async_path)
+        not_modified_response = self.client.get(path=async_path, HTTP_IF_NONE_MATCH=response["ETag"])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, sync_response.content)
+        self.assertEqual(response["ETag"], sync_response["ETag"])
+        self.assertEqual(not_modified_response.status_code, 304)
+
+    def test_async_purchase_order_get_request_by_invalid_id(self):
+        response = self.client.get(path=reverse('purchase_order_async_view', kwargs={'purchase_order_id': 9999}))
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()["error"], "Purchase id not found for id 9999")
+
+    def test_async_purchase_order_get_requests_with_fields_and_include_match_the_sync_view(self):
+        sparse_params = {"fields": "id,order_number", "include": "line_items"}
+        for path, async_path in (
+            (reverse('purchase_order_view', kwargs={'purchase_order_id': self.purchase_order.id}),
+             reverse('purchase_order_async_view', kwargs={'purchase_order_id': self.purchase_order.id})),
+            (reverse('purchase_order_creation'), reverse('purchase_order_async_list')),
+        ):
+            sync_response = self.client.get(path=path, data=sparse_params)
+
+            response = self.client.get(path=async_path, data=sparse_params)
+            full_response = self.client.get(path=async_path)
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json(), json.loads(sync_response.content))
+            self.assertEqual(response["ETag"], sync_response["ETag"])
+            self.assertNotEqual(response["ETag"], full_response["ETag"])
+
+        invalid_response = self.client.get(path=reverse('purchase_order_async_list'), data={"fields": "supplier"})
+        self.assertEqual(invalid_response.status_code, 400)
+
+    def test_async_get_purchase_orders_pages_with_cursor(self):
+        PurchaseOrderFactory.create_batch(size=2, supplier=self.supplier)
+        sync_results = json.loads(self.client.get(path=reverse('purchase_order_creation')).content)["results"]
+
+        first_page = self.client.get(path=reverse('purchase_order_async_list'), data={"limit": 2}).json()
+        second_page = self.client.get(path=first_page["next"]).json()
+
+        self.assertEqual(first_page["results"] + second_page["results"], sync_results)
+        self.assertIsNone(second_page["next"])
+        self.assertIsNotNone(second_page["prev"])
+
+
+class PurchaseOrderCacheTest(APITestCase):
+    def setUp(self) -> None:
+        self.purchase_order_cache = LocalPurchaseOrderCache()
+        patcher = mock.patch.object(PurchaseOrderAPIService, "purchase_order_cache", self.purchase_order_cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.supplier = SupplierFactory.create()
+        self.purchase_order = PurchaseOrderFactory.create(supplier=self.supplier)
+        self.line_item = LineItemFactory.create(purchase_order=self.purchase_order, item_name="cached item")
+        self.path = reverse('purchase_order_view', kwargs={'purchase_order_id': self.purchase_order.id})
+
+    def test_purchase_order_get_request_is_served_from_the_cache(self):
+        first_response = self.client.get(path=self.path)
+        # only the version lookup of the ETag
+        with self.assertNumQueries(1):
+            second_response = self.client.get(path=self.path)
+
+        self.assertEqual(second_response.status_code, 200)
+        self.assertEqual(second_response.data, first_response.data)
+        self.assertEqual(self.purchase_order_cache.stats(), {"hits": 1, "misses": 1})
+
+    def test_purchase_order_update_request_invalidates_the_cache(self):
+        self.client.get(path=self.path)
+        request_data = {
+            "supplier": {"id": self.supplier.id, "name": self.supplier.name, "email": self.supplier.email},
+            "line_items": [
+                {
+                    "id": self.line_item.id,
+                    "item_name": "updated item",
+                    "quantity": 1,
+                    "price_without_tax": "10.00",
+                    "tax_name": "GST 5%",
+                    "tax_amount": "0.50"
+                }
+            ]
+        }
+        self.client.put(path=self.path, data=request_data, format='json')
+
+        response_data = self.client.get(path=self.path).data
+
+        self.assertEqual(response_data["line_items"][0]["item_name"], "updated item")
+        self.assertEqual(self.purchase_order_cache.stats(), {"hits": 0, "misses": 2})
+
+    def test_purchase_order_updated_by_another_process_is_not_served_from_the_cache(self):
+        self.client.get(path=self.path)
+        request_data = {
+            "supplier": {"id": self.supplier.id, "name": self.supplier.name, "email": self.supplier.email},
+            "line_items": [
+                {
+                    "id": self.line_item.id,
+                    "item_name": "updated item",
+                    "quantity": 1,
+                    "price_without_tax": "10.00",
+                    "tax_name": "GST 5%",
+                    "tax_amount": "0.50"
+                }
+            ]
+        }
+        # the write invalidates the cache of its own process only
+        with mock.patch.object(PurchaseOrderAPIService, "purchase_order_cache", LocalPurchaseOrderCache()):
+            self.client.put(path=self.path, data=request_data, format='json')
+
+        response_data = self.client.get(path=self.path).data
+
+        self.assertEqual(response_data["line_items"][0]["item_name"], "updated item")
+        self.assertEqual(self.purchase_order_cache.stats(), {"hits": 0, "misses": 2})
+
+    def test_purchase_order_etag_is_never_sent_with_a_stale_cached_body(self):
+        async_path = reverse('purchase_order_async_view', kwargs={'purchase_order_id': self.purchase_order.id})
+        stale_etag = self.client.get(path=self.path)["ETag"]
+        # renamed by another process, whose cache is the only one invalidated
+        with mock.patch.object(PurchaseOrderAPIService, "purchase_order_cache", LocalPurchaseOrderCache()):
+            self.client.post(path=reverse('purchase_order_creation'), data={
+                "supplier": {"id": self.supplier.id, "name": "renamed supplier", "email": self.supplier.email},
+                "line_items": []
+            }, format='json')
+
+        response = self.client.get(path=self.path, HTTP_IF_NONE_MATCH=stale_etag)
+        async_response = self.client.get(path=async_path, HTTP_IF_NONE_MATCH=stale_etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], stale_etag)
+        self.assertEqual(response.data["supplier"]["name"], "renamed supplier")
+        self.assertEqual(async_response["ETag"], response["ETag"])
+        self.assertEqual(async_response.json()["supplier"]["name"], "renamed supplier")
+
+    def test_purchase_order_delete_request_invalidates_the_cache(self):
+        self.client.get(path=self.path)
+        self.client.delete(path=self.path)
+
+        response = self.client.get(path=self.path)
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_line_item_change_invalidates_the_cache(self):
+        self.client.get(path=self.path)
+        self.line_item.item_name = "renamed item"
+        self.line_item.save()
+
+        response_data = self.client.get(path=self.path).data
+
+        self.assertEqual(response_data["line_items"][0]["item_name"], "renamed item")
+
+    def test_supplier_rename_through_another_order_invalidates_the_cache(self):
+        self.client.get(path=self.path)
+        request_data = {
+            "supplier": {"id": self.supplier.id, "name": "renamed supplier", "email": self.supplier.email},
+            "line_items": []
+        }
+        self.client.post(path=reverse('purchase_order_creation'), data=request_data, format='json')
+
+        response_data = self.client.get(path=self.path).data
+
+        self.assertEqual(response_data["supplier"]["name"], "renamed supplier")
+
+    def test_django_cache_backend_invalidates_orders_of_changed_suppliers(self):
+        purchase_order_cache = DjangoPurchaseOrderCache()
+        purchase_order_cache.cache = LocMemCache("purchase_orders", {})
+        purchase_order_data = {"id": self.purchase_order.id, "supplier": {"id": self.supplier.id}, "line_items": []}
+        purchase_order_cache.set(self.purchase_order.id, 1, purchase_order_data)
+
+        self.assertEqual(purchase_order_cache.get(self.purchase_order.id, 1), purchase_order_data)
+        self.assertIsNone(purchase_order_cache.get(self.purchase_order.id, 2))
+        purchase_order_cache.delete_for_suppliers([self.supplier.id])
+        self.assertIsNone(purchase_order_cache.get(self.purchase_order.id, 1))
+        self.assertEqual(purchase_order_cache.stats(), {"hits": 1, "misses": 2})
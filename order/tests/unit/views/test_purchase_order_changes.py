@@ -0,0 +1,106 @@
+import datetime
+
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITransactionTestCase
+
+from order.models.purchase_order import PurchaseOrder
+from order.pagination import ChangeCursor, PurchaseOrderChangePagination
+from supplier.tests.factory.supplier import SupplierFactory
+
+
+# The feed only returns the changes of ended transactions, so the writes of these tests are committed
+class PurchaseOrderChangesViewTest(APITransactionTestCase):
+    def setUp(self) -> None:
+        self.supplier = SupplierFactory.create()
+
+    def get_order_data(self, quantity):
+        return {
+            "supplier": {"id": self.supplier.id, "name": self.supplier.name, "email": self.supplier.email},
+            "line_items": [
+                {"item_name": "test prod", "quantity": quantity, "price_without_tax": "10.00",
+                 "tax_name": "GST 5%", "tax_amount": "0.50"}
+            ],
+        }
+
+    def create_order(self, quantity=1):
+        return self.client.post(
+            reverse("purchase_order_creation"), data=self.get_order_data(quantity), format="json"
+        ).data
+
+    def get_changes(self, **query_params):
+        response = self.client.get(reverse("purchase_order_changes"), data=query_params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_changes_return_the_current_orders_and_tombstones_after_the_cursor(self):
+        updated_order = self.create_order()
+        deleted_order = self.create_order()
+        updated_at = PurchaseOrder.objects.get(id=updated_order["id"]).updated_at
+        update_data = self.get_order_data(3)
+        update_data["line_items"][0]["id"] = updated_order["line_items"][0]["id"]
+        updated_order = self.client.put(
+            reverse("purchase_order_view", kwargs={"purchase_order_id": updated_order["id"]}),
+            data=update_data, format="json",
+        ).data
+        self.client.delete(reverse("purchase_order_view", kwargs={"purchase_order_id": deleted_order["id"]}))
+
+        changes = self.get_changes()
+
+        self.assertFalse(changes["has_more"])
+        self.assertEqual(
+            [(change["id"], change["deleted"], change["purchase_order"]) for change in changes["changes"]],
+            [(updated_order["id"], False, updated_order), (deleted_order["id"], True, None)],
+        )
+        self.assertGreater(PurchaseOrder.objects.get(id=updated_order["id"]).updated_at, updated_at)
+
+        # nothing changed since, the cursor stays usable
+        unchanged = self.get_changes(since=changes["next_cursor"])
+        self.assertEqual(unchanged["changes"], [])
+        self.assertFalse(unchanged["has_more"])
+        created_order = self.create_order()
+        self.assertEqual(
+            [change["purchase_order"] for change in self.get_changes(since=unchanged["next_cursor"])["changes"]],
+            [created_order],
+        )
+
+    def test_changes_are_read_in_batches(self):
+        purchase_order_ids = [self.create_order()["id"] for _ in range(3)]
+
+        first_batch = self.get_changes(limit=2)
+        second_batch = self.get_changes(limit=2, since=first_batch["next_cursor"])
+
+        self.assertTrue(first_batch["has_more"])
+        self.assertFalse(second_batch["has_more"])
+        self.assertEqual(
+            [change["id"] for change in first_batch["changes"] + second_batch["changes"]], purchase_order_ids
+        )
+
+    def test_changes_of_running_transactions_are_left_for_later(self):
+        with transaction.atomic():
+            purchase_order_id = self.create_order()["id"]
+            self.assertEqual(self.get_changes()["changes"], [])
+        self.assertEqual([change["id"] for change in self.get_changes()["changes"]], [purchase_order_id])
+
+    def test_invalid_and_expired_cursors_are_refused(self):
+        response = self.client.get(reverse("purchase_order_changes"), data={"since": "not-a-cursor"})
+        self.assertEqual(response.status_code, 400)
+
+        pagination = PurchaseOrderChangePagination()
+        expired_cursor = pagination.encode_cursor(ChangeCursor(
+            transaction_id=1, id=1, complete_at=timezone.now() - pagination.retention - datetime.timedelta(minutes=1)
+        ))
+        response = self.client.get(reverse("purchase_order_changes"), data={"since": expired_cursor})
+        self.assertEqual(response.status_code, 410)
+        self.assertIn("sync the purchase orders in full again", response.data["error"])
+
+    def test_cursor_with_a_naive_time_is_refused(self):
+        naive_cursor = PurchaseOrderChangePagination().encode_cursor(
+            ChangeCursor(transaction_id=1, id=1, complete_at=datetime.datetime(2030, 1, 1))
+        )
+
+        response = self.client.get(reverse("purchase_order_changes"), data={"since": naive_cursor})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["error"], f"Invalid cursor {naive_cursor}")
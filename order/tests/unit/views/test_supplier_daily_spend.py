@@ -0,0 +1,133 @@
+import datetime
+from decimal import Decimal
+
+from django.db import transaction
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from order.models.purchase_order import PurchaseOrder
+from order.models.supplier_daily_spend import SupplierDailySpend
+from order.services.supplier_daily_spend import SupplierDailySpendService
+from order.tests.factory.purchase_order import PurchaseOrderFactory
+from supplier.tests.factory.supplier import SupplierFactory
+
+
+class SupplierDailySpendViewTest(APITestCase):
+    def setUp(self) -> None:
+        self.supplier = SupplierFactory.create()
+
+    def get_order_data(self, supplier, quantities):
+        return {
+            "supplier": {"id": supplier.id, "name": supplier.name, "email": supplier.email},
+            "line_items": [
+                {"item_name": "test prod", "quantity": quantity, "price_without_tax": "10.00",
+                 "tax_name": "GST 5%", "tax_amount": "0.55"}
+                for quantity in quantities
+            ],
+        }
+
+    def get_rollups(self):
+        return sorted(SupplierDailySpend.objects.values_list(
+            "supplier_id", "day", "order_count", "total_quantity", "total_amount", "total_tax"
+        ))
+
+    def get_rebuilt_rollups(self):
+        """
+        Rollups recomputed from the orders, rolled back afterwards.
+        """
+        with transaction.atomic():
+            SupplierDailySpendService().rebuild()
+            rebuilt_rollups = self.get_rollups()
+            transaction.set_rollback(True)
+        return rebuilt_rollups
+
+    def test_rollups_follow_created_updated_and_deleted_orders(self):
+        other_supplier = SupplierFactory.create()
+        purchase_order_ids = [
+            self.client.post(
+                reverse("purchase_order_creation"), data=self.get_order_data(self.supplier, quantities), format="json"
+            ).data["id"]
+            for quantities in ([1, 2], [3], [4])
+        ]
+        [rollup] = self.get_rollups()
+        self.assertEqual(rollup[0], self.supplier.id)
+        self.assertEqual(rollup[2:], (3, 10, Decimal("42.20"), Decimal("2.20")))
+
+        # an order moved to another supplier leaves the rollup of the first one
+        update_data = self.get_order_data(other_supplier, [5])
+        update_data["line_items"][0]["id"] = self.client.get(
+            reverse("purchase_order_view", kwargs={"purchase_order_id": purchase_order_ids[2]})
+        ).data["line_items"][0]["id"]
+        response = self.client.put(
+            reverse("purchase_order_view", kwargs={"purchase_order_id": purchase_order_ids[2]}),
+            data=update_data, format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get_rollups(), self.get_rebuilt_rollups())
+        self.assertEqual(
+            [rollup[2:4] for rollup in self.get_rollups()],
+            [(2, 6), (1, 5)] if self.supplier.id < other_supplier.id else [(1, 5), (2, 6)],
+        )
+
+        self.client.delete(reverse("purchase_order_view", kwargs={"purchase_order_id": purchase_order_ids[0]}))
+        self.assertEqual(self.get_rollups(), self.get_rebuilt_rollups())
+        self.client.delete(reverse("purchase_order_view", kwargs={"purchase_order_id": purchase_order_ids[2]}))
+        # the rollup of a supplier and day without orders left is deleted
+        self.assertEqual([rollup[0] for rollup in self.get_rollups()], [self.supplier.id])
+        self.assertEqual(self.get_rollups(), self.get_rebuilt_rollups())
+
+    def test_rollups_follow_bulk_created_orders(self):
+        response = self.client.post(
+            reverse("purchase_order_bulk_creation"),
+            data=[self.get_order_data(self.supplier, [1]), self.get_order_data(self.supplier, [2, 3])],
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.get_rollups(), self.get_rebuilt_rollups())
+        self.assertEqual(SupplierDailySpend.objects.get(supplier=self.supplier).order_count, 2)
+
+    def test_get_supplier_daily_spend_report_with_filters(self):
+        other_supplier = SupplierFactory.create()
+        for supplier, day in [(self.supplier, 1), (self.supplier, 2), (other_supplier, 2), (self.supplier, 3)]:
+            PurchaseOrderFactory.create(
+                supplier=supplier, total_quantity=2, total_amount=5.25, total_tax=0.25,
+                order_time=datetime.datetime(2024, 1, day, 12, tzinfo=datetime.timezone.utc),
+            )
+        PurchaseOrderFactory.create(
+            supplier=self.supplier, total_quantity=1, total_amount=1.00, total_tax=0.00,
+            order_time=datetime.datetime(2024, 1, 2, 23, 59, tzinfo=datetime.timezone.utc),
+        )
+        SupplierDailySpendService().add_purchase_orders(PurchaseOrder.objects.values_list("id", flat=True))
+
+        response = self.client.get(
+            reverse("supplier_daily_spend_report"), {"date_from": "2024-01-02", "date_to": "2024-01-03"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(row["day"], row["supplier"]["id"], row["order_count"]) for row in response.data],
+            [("2024-01-02", self.supplier.id, 2), ("2024-01-02", other_supplier.id, 1),
+             ("2024-01-03", self.supplier.id, 1)],
+        )
+        self.assertEqual(response.data[0]["total_quantity"], 3)
+        self.assertEqual(response.data[0]["total_amount"], "6.25")
+        self.assertEqual(response.data[0]["total_tax"], "0.25")
+
+        response = self.client.get(
+            reverse("supplier_daily_spend_report"),
+            {"date_from": "2024-01-01", "date_to": "2024-01-31", "supplier_id": other_supplier.id},
+        )
+        self.assertEqual([row["supplier"]["id"] for row in response.data], [other_supplier.id])
+
+    def test_get_supplier_daily_spend_report_with_invalid_filters(self):
+        for query_params in [
+            {"date_to": "2024-01-31"},
+            {"date_from": "2024-02-30", "date_to": "2024-03-01"},
+            {"date_from": "2024-01-31", "date_to": "2024-01-01"},
+            {"date_from": "2020-01-01", "date_to": "2024-01-01"},
+            {"date_from": "2024-01-01", "date_to": "2024-01-31", "supplier_id": "abc"},
+        ]:
+            response = self.client.get(reverse("supplier_daily_spend_report"), query_params)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("Invalid", response.data["error"])
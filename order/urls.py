@@ -1,8 +1,23 @@
 from django.urls import path
 
-from .views.purchase_order import PurchaseOrderAPIView
+from .views.purchase_order import (
+    AsyncPurchaseOrderView, PurchaseOrderAPIView, PurchaseOrderBulkAPIView, PurchaseOrderChangesAPIView,
+    PurchaseOrderExportAPIView, SupplierDailySpendAPIView
+)
 
 urlpatterns = [
+    # Creates many purchase orders from a JSON array or NDJSON body
+    path('bulk/', PurchaseOrderBulkAPIView.as_view(), name='purchase_order_bulk_creation'),
+    # Streams every purchase order as NDJSON or CSV
+    path('export/', PurchaseOrderExportAPIView.as_view(), name='purchase_order_export'),
+    # Orders created, updated or deleted after a cursor, in batches
+    path('changes/', PurchaseOrderChangesAPIView.as_view(), name='purchase_order_changes'),
+    # Orders and spend of each supplier per day, filtered by date range and supplier
+    path('reports/supplier-daily-spend/', SupplierDailySpendAPIView.as_view(), name='supplier_daily_spend_report'),
+    # Async GET of a purchase order by purchase_order_id, for ASGI servers
+    path('async/<int:purchase_order_id>/', AsyncPurchaseOrderView.as_view(), name='purchase_order_async_view'),
+    # Async GET of a page of purchase orders, for ASGI servers
+    path('async/', AsyncPurchaseOrderView.as_view(), name='purchase_order_async_list'),
     # For GET PUT DELETE API calls with purchase_order_id
     path('<int:purchase_order_id>/', PurchaseOrderAPIView.as_view(), name='purchase_order_view'),
     # For GET POST API calls since GET might have no purchase_order_id & POST will be without purchase_order_id
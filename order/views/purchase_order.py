@@ -1,9 +1,19 @@
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.views import View
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from order.api_services.purchase_order import PurchaseOrderAPIService
-from order.exceptions import PurchaseOrderNotFound
+from order.api_services.purchase_order_change import PurchaseOrderChangeAPIService
+from order.api_services.supplier_daily_spend import SupplierDailySpendAPIService
+from order.exceptions import ExpiredChangeCursor, PurchaseOrderNotFound
+from order.exporters import get_exporter, gzip_blocks, iter_blocks
+from order.parsers import NDJSONParser
 from supplier.exceptions import LineItemNotFound
+from sumtracker_project.performance import measure_rendering
 
 
 class PurchaseOrderAPIView(APIView):
@@ -12,25 +22,48 @@ class PurchaseOrderAPIView(APIView):
     def get(self, request, purchase_order_id=None):
         """
         Retrieve a single Purchase Order if 'purchase_order_id' is provided,
-        else return a list of Purchase Orders based on query_params if provided.
+        else return a page of Purchase Orders based on query_params if provided.
+        Pages are requested with the 'limit' and 'cursor' query_params and link to
+        their neighbours through 'next' and 'prev'.
+        Responses carry an ETag, a request with a matching If-None-Match header is answered
+        with 304 Not Modified without loading the line items.
+        The 'order_time_from' and 'order_time_to' query_params, ISO 8601 date and times, limit the list
+        to the orders placed from order_time_from on and before order_time_to.
+        The 'fields' and 'include' query_params select the fields of the orders and whether their
+        supplier and line_items are embedded, e.g. ?fields=order_number,total_amount&include=supplier
         """
         query_params = request.query_params
         # If Id is given in the url then that will take the precedence over the query_params
         try:
             if purchase_order_id:
-                response_data = self.purchase_order_api_service.get_by_id(purchase_order_id=purchase_order_id)
-            elif query_params:
-                response_data = self.purchase_order_api_service.get_by_query_params(query_params=query_params)
+                # the body is read at the version of the ETag, a cached one of another version is discarded
+                version = self.purchase_order_api_service.get_version_by_id(purchase_order_id=purchase_order_id)
+                etag = self.purchase_order_api_service.get_etag_by_id(
+                    purchase_order_id=purchase_order_id, query_params=query_params, version=version
+                )
             else:
-                # if there is no purchase_order_id or query_params provided then return all purchase orders list
-                response_data = self.purchase_order_api_service.get_all_purchase_orders()
+                etag = self.purchase_order_api_service.get_etag_by_query_params(query_params=query_params)
+            not_modified_response = get_conditional_response(request, etag=etag)
+            if not_modified_response is not None:
+                not_modified_response["ETag"] = etag
+                return not_modified_response
+            if purchase_order_id:
+                response_data = self.purchase_order_api_service.get_by_id(
+                    purchase_order_id=purchase_order_id, query_params=query_params, version=version
+                )
+            else:
+                # if there is no purchase_order_id then return a page of the purchase orders list,
+                # filtered by the query_params if provided
+                # the page read may be newer than the one of the ETag checked above, it goes with its own
+                page, etag = self.purchase_order_api_service.get_by_query_params(query_params=query_params)
+                response_data = self.purchase_order_api_service.pagination.get_paginated_response_data(request, page)
         except PurchaseOrderNotFound as e:
             return Response(status=404, data=e.__dict__)
         except LineItemNotFound as e:
             return Response(status=404, data=e.__dict__)
         except Exception as e:
             return Response(status=400, data=e.__dict__)
-        return Response(status=200, data=response_data)
+        return Response(status=200, data=response_data, headers={"ETag": etag})
 
     def post(self, request):
         """
@@ -116,3 +149,150 @@ class PurchaseOrderAPIView(APIView):
         else:
             return Response(status=400, data={"error": "missing purchase id"})
         return Response(status=204)
+
+
+class AsyncPurchaseOrderView(View):
+    """
+    Read-only async counterpart of PurchaseOrderAPIView, answering the same GET requests with the
+    same bodies and ETags through the async ORM. Django 5.0 still runs the queries of the async ORM in a
+    thread, but under an ASGI server the rest of the request stays on the event loop, unlike APIView
+    which DRF only runs synchronously.
+    """
+    http_method_names = ["get"]
+    purchase_order_api_service = PurchaseOrderAPIService()
+    renderer = JSONRenderer()
+
+    async def get(self, request, purchase_order_id=None):
+        """
+        Retrieve a single Purchase Order if 'purchase_order_id' is provided,
+        else return a page of Purchase Orders based on query_params if provided,
+        like PurchaseOrderAPIView.get().
+        """
+        query_params = request.GET
+        try:
+            if purchase_order_id:
+                version = await self.purchase_order_api_service.aget_version_by_id(purchase_order_id=purchase_order_id)
+                etag = await self.purchase_order_api_service.aget_etag_by_id(
+                    purchase_order_id=purchase_order_id, query_params=query_params, version=version
+                )
+            else:
+                etag = await self.purchase_order_api_service.aget_etag_by_query_params(query_params=query_params)
+            not_modified_response = get_conditional_response(request, etag=etag)
+            if not_modified_response is not None:
+                not_modified_response["ETag"] = etag
+                return not_modified_response
+            if purchase_order_id:
+                response_data = await self.purchase_order_api_service.aget_by_id(
+                    purchase_order_id=purchase_order_id, query_params=query_params, version=version
+                )
+            else:
+                page, etag = await self.purchase_order_api_service.aget_by_query_params(query_params=query_params)
+                response_data = self.purchase_order_api_service.pagination.get_paginated_response_data(request, page)
+        except PurchaseOrderNotFound as e:
+            return self.render(404, e.__dict__)
+        except Exception as e:
+            return self.render(400, e.__dict__)
+        return self.render(200, response_data, headers={"ETag": etag})
+
+    def render(self, status, data, headers=None):
+        with measure_rendering():
+            content = self.renderer.render(data)
+        return HttpResponse(content, status=status, content_type="application/json", headers=headers)
+
+
+class PurchaseOrderExportAPIView(APIView):
+    purchase_order_api_service = PurchaseOrderAPIService()
+    chunk_size = 2000
+
+    def get(self, request):
+        """
+        Stream every Purchase Order with its Line Items, filtered by the supplier_name, item_name,
+        order_time_from and order_time_to query_params if provided.
+        query_params:
+        - export_format: 'ndjson' (default), one order per line, or 'csv', one row per line item
+        - compression: 'gzip' to download the export gzipped
+        """
+        query_params = request.query_params
+        try:
+            exporter = get_exporter(query_params.get("export_format", "ndjson"))
+            serialized_purchase_orders = self.purchase_order_api_service.iterate_by_query_params(
+                query_params=query_params, chunk_size=self.chunk_size
+            )
+        except Exception as e:
+            return Response(status=400, data=e.__dict__)
+        content = iter_blocks(exporter.rows(serialized_purchase_orders))
+        content_type = exporter.content_type
+        filename = f"purchase_orders.{exporter.extension}"
+        if query_params.get("compression") == "gzip":
+            content = gzip_blocks(content)
+            content_type = "application/gzip"
+            filename += ".gz"
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+class PurchaseOrderBulkAPIView(APIView):
+    purchase_order_api_service = PurchaseOrderAPIService()
+    parser_classes = [JSONParser, NDJSONParser]
+
+    def post(self, request):
+        """
+        Create many Purchase Orders at once.
+        request.data: a JSON array, or NDJSON with one order per line, of orders in the shape
+        accepted by POST /purchase/orders/.
+        response: one result per order, in request order, either {"id": <created purchase order id>}
+        or {"error": <reason>}. The status is 201 when every order was created, else 207.
+        """
+        request_data = request.data
+        if not isinstance(request_data, list):
+            return Response(status=400, data={"error": "expected a list of purchase orders"})
+        try:
+            results = self.purchase_order_api_service.bulk_create(purchase_orders_data=request_data)
+        except Exception as e:
+            return Response(status=400, data=e.__dict__)
+        status = 201 if all("id" in result for result in results) else 207
+        return Response(status=status, data=results)
+
+
+class SupplierDailySpendAPIView(APIView):
+    supplier_daily_spend_api_service = SupplierDailySpendAPIService()
+
+    def get(self, request):
+        """
+        Report of the orders and spend of each supplier per day, kept up to date as orders are written.
+        query_params:
+        - date_from, date_to: first and last day of the report, YYYY-MM-DD
+        - supplier_id: only report this supplier
+        response: [{"day": ..., "supplier": {...}, "order_count": ..., "total_quantity": ...,
+        "total_amount": ..., "total_tax": ...}] ordered by day and supplier, days without orders left out.
+        """
+        try:
+            report = self.supplier_daily_spend_api_service.get_report_by_query_params(query_params=request.query_params)
+        except Exception as e:
+            return Response(status=400, data=e.__dict__)
+        return Response(status=200, data=report)
+
+
+class PurchaseOrderChangesAPIView(APIView):
+    purchase_order_change_api_service = PurchaseOrderChangeAPIService()
+
+    def get(self, request):
+        """
+        Purchase Orders created, updated or deleted after a cursor, for incremental syncs.
+        query_params:
+        - since: next_cursor of the previous response, omitted to read from the oldest change kept
+        - limit: changes read, 100 by default and 1000 at most
+        response: {"changes": [{"id": ..., "deleted": ..., "changed_at": ..., "purchase_order": {...}}],
+        "next_cursor": ..., "has_more": ...}, the last change of each order with its current data, or
+        null for deleted orders. A 410 means the cursor is older than the changes kept.
+        """
+        try:
+            changes = self.purchase_order_change_api_service.get_changes_by_query_params(
+                query_params=request.query_params
+            )
+        except ExpiredChangeCursor as e:
+            return Response(status=410, data=e.__dict__)
+        except Exception as e:
+            return Response(status=400, data=e.__dict__)
+        return Response(status=200, data=changes)
@@ -0,0 +1,143 @@
+import functools
+import inspect
+import os
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+from django.http import HttpResponse
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest,
+)
+from prometheus_client import multiprocess
+
+SERVICE_METHOD_DURATION = Histogram(
+    "service_method_duration_seconds",
+    "Time spent in the methods of the services",
+    ["service", "method"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+SERVICE_METHOD_ERRORS = Counter(
+    "service_method_errors",
+    "Exceptions raised by the methods of the services",
+    ["service", "method", "exception"],
+)
+PURCHASE_ORDER_LINE_ITEMS = Histogram(
+    "purchase_order_line_items",
+    "Line items of the purchase orders created or updated",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+TRANSACTION_ROWS_WRITTEN = Histogram(
+    "transaction_rows_written",
+    "Rows inserted, updated or deleted by the committed transactions of the services",
+    ["operation"],
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 50000),
+)
+# updated by the pooled database backend as connections are taken and given back, summed over
+# the live processes in multiprocess mode
+DATABASE_POOL_CONNECTIONS_IN_USE = Gauge(
+    "database_pool_connections_in_use",
+    "Connections of the pool held by the process",
+    ["database"],
+    multiprocess_mode="livesum",
+)
+DATABASE_POOL_REQUESTS_WAITING = Gauge(
+    "database_pool_requests_waiting",
+    "Threads of the process waiting for a connection of the pool",
+    ["database"],
+    multiprocess_mode="livesum",
+)
+DATABASE_POOL_ACQUIRE_DURATION = Histogram(
+    "database_pool_acquire_duration_seconds",
+    "Time taken to get a connection from the pool",
+    ["database"],
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10),
+)
+DATABASE_POOL_TIMEOUTS = Counter(
+    "database_pool_timeouts",
+    "Requests which got no connection from the pool within its timeout",
+    ["database"],
+)
+
+WRITE_STATEMENTS = ("INSERT", "UPDATE", "DELETE")
+
+
+def instrument_service(service_class):
+    """
+    Class decorator timing every public method of a service in SERVICE_METHOD_DURATION and counting
+    the exceptions they raise by type in SERVICE_METHOD_ERRORS. Methods returning querysets or
+    generators are only timed while building them.
+
+    The labelled histogram of each method is looked up once here, so a call only costs the
+    observation itself.
+    """
+    for name, method in list(vars(service_class).items()):
+        if name.startswith("_") or not inspect.isfunction(method):
+            continue
+        setattr(service_class, name, instrument_method(service_class.__name__, name, method))
+    return service_class
+
+
+def instrument_method(service_name, method_name, method):
+    duration = SERVICE_METHOD_DURATION.labels(service_name, method_name)
+
+    def count_error(e):
+        SERVICE_METHOD_ERRORS.labels(service_name, method_name, type(e).__name__).inc()
+
+    if inspect.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def instrumented_coroutine(*args, **kwargs):
+            started_at = time.perf_counter()
+            try:
+                return await method(*args, **kwargs)
+            except Exception as e:
+                count_error(e)
+                raise
+            finally:
+                duration.observe(time.perf_counter() - started_at)
+        return instrumented_coroutine
+
+    @functools.wraps(method)
+    def instrumented(*args, **kwargs):
+        started_at = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        except Exception as e:
+            count_error(e)
+            raise
+        finally:
+            duration.observe(time.perf_counter() - started_at)
+    return instrumented
+
+
+@contextmanager
+def count_rows_written(operation):
+    """
+    Counts the rows written by the INSERT, UPDATE and DELETE statements of the block, to be wrapped
+    around a transaction, and records them in TRANSACTION_ROWS_WRITTEN when it succeeds.
+    """
+    rows_written = [0]
+
+    def count_rows(execute, sql, params, many, context):
+        result = execute(sql, params, many, context)
+        if sql.lstrip()[:6].upper() in WRITE_STATEMENTS and context["cursor"].rowcount > 0:
+            rows_written[0] += context["cursor"].rowcount
+        return result
+
+    with connection.execute_wrapper(count_rows):
+        yield
+    TRANSACTION_ROWS_WRITTEN.labels(operation).observe(rows_written[0])
+
+
+def metrics_view(request):
+    """
+    Serves the metrics in the Prometheus text format. With several worker processes the
+    PROMETHEUS_MULTIPROC_DIR environment variable points to the directory where each process
+    writes its metrics, and they are added up here.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,300 @@
+import cProfile
+import heapq
+import io
+import json
+import logging
+import pstats
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils.text import slugify
+
+logger = logging.getLogger(__name__)
+
+# RequestTimings of the request being handled, set by PerformanceMiddleware
+request_timings = ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    """
+    Time spent by one request in the database, serializing and rendering, in milliseconds.
+
+    Methods:
+    - record_query(execute, sql, params, many, context)
+    - slowest_queries(count)
+    """
+    def __init__(self):
+        self.db_ms = 0.0
+        # (duration in ms, sql) of every statement, without its parameters
+        self.queries = []
+        self.serialize_ms = 0.0
+        self.render_ms = 0.0
+        self.serializing = False
+        self.render_started_at = None
+
+    def record_query(self, execute, sql, params, many, context):
+        """
+        Database execute wrapper timing each statement.
+        """
+        started_at = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - started_at) * 1000
+            self.db_ms += duration
+            self.queries.append((duration, sql))
+
+    def slowest_queries(self, count):
+        return heapq.nlargest(count, self.queries, key=lambda query: query[0])
+
+
+@contextmanager
+def measure_serialization():
+    """
+    Adds the time spent in the block to the serialization time of the current request. Queries run
+    by the block, e.g. by lazy querysets, are left out, and so are nested blocks.
+    """
+    timings = request_timings.get()
+    if timings is None or timings.serializing:
+        yield
+        return
+    timings.serializing = True
+    started_at = time.perf_counter()
+    db_ms = timings.db_ms
+    try:
+        yield
+    finally:
+        timings.serialize_ms += (time.perf_counter() - started_at) * 1000 - (timings.db_ms - db_ms)
+        timings.serializing = False
+
+
+@contextmanager
+def measure_rendering():
+    """
+    Adds the time spent in the block to the rendering time of the current request, for responses
+    rendered by the view itself rather than by Django after PerformanceMiddleware.process_template_response().
+    """
+    timings = request_timings.get()
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings is not None:
+            timings.render_ms += (time.perf_counter() - started_at) * 1000
+
+
+class PerformanceMiddleware:
+    """
+    Measures every request: total time, database time and query count, serialization and rendering
+    time and payload size. They are sent back in a Server-Timing header and logged as one JSON line.
+    Requests slower than SLOW_REQUEST_THRESHOLD_MS are logged as warnings with their
+    SLOW_REQUEST_LOGGED_QUERIES slowest statements.
+
+    Both sync and async, so async views are not run in a thread under ASGI because of it.
+
+    Methods:
+    - record_queries(timings)
+    - end_request(request, response, timings, started_at)
+    - process_template_response(request, response)
+    - end_render(timings)
+    - get_server_timing(timings, total_ms, size)
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+        self.slow_request_threshold_ms = settings.SLOW_REQUEST_THRESHOLD_MS
+        self.slow_request_logged_queries = settings.SLOW_REQUEST_LOGGED_QUERIES
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = RequestTimings()
+        token = request_timings.set(timings)
+        started_at = time.perf_counter()
+        try:
+            with self.record_queries(timings):
+                response = self.get_response(request)
+        finally:
+            request_timings.reset(token)
+        return self.end_request(request, response, timings, started_at)
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = request_timings.set(timings)
+        started_at = time.perf_counter()
+        # connections are per thread, the async ORM runs queries on the ones of the thread of sync_to_async()
+        stack = ExitStack()
+        await sync_to_async(stack.enter_context)(self.record_queries(timings))
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+            request_timings.reset(token)
+        return self.end_request(request, response, timings, started_at)
+
+    @contextmanager
+    def record_queries(self, timings):
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timings.record_query))
+            yield
+
+    def end_request(self, request, response, timings, started_at):
+        """
+        Adds the Server-Timing header to the response and logs the request.
+        """
+        total_ms = (time.perf_counter() - started_at) * 1000
+        # the size of streamed responses is unknown until they are sent
+        size = None if response.streaming else len(response.content)
+        response["Server-Timing"] = self.get_server_timing(timings, total_ms, size)
+
+        log_data = {
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "total_ms": round(total_ms, 2),
+            "db_ms": round(timings.db_ms, 2),
+            "queries": len(timings.queries),
+            "serialize_ms": round(timings.serialize_ms, 2),
+            "render_ms": round(timings.render_ms, 2),
+            "bytes": size,
+        }
+        if total_ms >= self.slow_request_threshold_ms:
+            log_data["slowest_queries"] = [
+                {"ms": round(duration, 2), "sql": sql}
+                for duration, sql in timings.slowest_queries(self.slow_request_logged_queries)
+            ]
+            logger.warning(json.dumps(log_data))
+        else:
+            logger.info(json.dumps(log_data))
+        return response
+
+    def process_template_response(self, request, response):
+        """
+        Times the rendering of DRF responses, which Django does right after this hook.
+        """
+        timings = request_timings.get()
+        if timings is not None:
+            timings.render_started_at = time.perf_counter()
+            response.add_post_render_callback(lambda rendered: self.end_render(timings))
+        return response
+
+    def end_render(self, timings):
+        timings.render_ms += (time.perf_counter() - timings.render_started_at) * 1000
+
+    def get_server_timing(self, timings, total_ms, size):
+        metrics = [
+            f"total;dur={total_ms:.2f}",
+            f'db;dur={timings.db_ms:.2f};desc="{len(timings.queries)} queries"',
+            f"serialize;dur={timings.serialize_ms:.2f}",
+            f"render;dur={timings.render_ms:.2f}",
+        ]
+        if size is not None:
+            metrics.append(f'size;desc="{size} bytes"')
+        return ", ".join(metrics)
+
+
+class ProfilerMiddleware:
+    """
+    Runs a request under cProfile when REQUEST_PROFILER_ENABLED is set, the request carries the
+    REQUEST_PROFILER_HEADER header and comes from a staff user. The profile is saved to
+    REQUEST_PROFILER_DIR as a .prof file, for pstats or snakeviz, next to a .txt summary of the
+    REQUEST_PROFILER_TOP_FUNCTIONS functions with the highest cumulative time, and its name is
+    returned in the X-Profile header.
+
+    When REQUEST_PROFILER_ENABLED is off the middleware is left out of the chain altogether.
+    Only the thread handling the request is profiled, so the sync views are the ones to profile: for
+    async views that is the event loop, including any other request it runs meanwhile, and not the
+    threads their queries run in.
+
+    Methods:
+    - should_profile(request)
+    - ashould_profile(request)
+    - is_staff(user)
+    - profile(request)
+    - aprofile(request)
+    - save_profile(request, profiler)
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_PROFILER_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+        self.header = settings.REQUEST_PROFILER_HEADER
+        self.directory = Path(settings.REQUEST_PROFILER_DIR)
+        self.top_functions = settings.REQUEST_PROFILER_TOP_FUNCTIONS
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if self.should_profile(request):
+            return self.profile(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        if await self.ashould_profile(request):
+            return await self.aprofile(request)
+        return await self.get_response(request)
+
+    def should_profile(self, request):
+        if not request.headers.get(self.header):
+            return False
+        return self.is_staff(getattr(request, "user", None))
+
+    async def ashould_profile(self, request):
+        # request.user loads the user synchronously on first access
+        if not request.headers.get(self.header) or not hasattr(request, "auser"):
+            return False
+        return self.is_staff(await request.auser())
+
+    def is_staff(self, user):
+        return user is not None and user.is_active and user.is_staff
+
+    def profile(self, request):
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        response["X-Profile"] = self.save_profile(request, profiler)
+        return response
+
+    async def aprofile(self, request):
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            response = await self.get_response(request)
+        finally:
+            profiler.disable()
+        response["X-Profile"] = self.save_profile(request, profiler)
+        return response
+
+    def save_profile(self, request, profiler):
+        """
+        Writes the profile and its summary, returning their common file name without extension.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        name = f"{datetime.now():%Y%m%d-%H%M%S-%f}-{request.method.lower()}-{slugify(request.path) or 'root'}"
+        profiler.dump_stats(self.directory / f"{name}.prof")
+        summary = io.StringIO()
+        summary.write(f"{request.method} {request.get_full_path()}\n\n")
+        pstats.Stats(profiler, stream=summary).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top_functions)
+        (self.directory / f"{name}.txt").write_text(summary.getvalue())
+        logger.info(json.dumps({"profile": name, "method": request.method, "path": request.path}))
+        return name
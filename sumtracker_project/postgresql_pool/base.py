@@ -0,0 +1,166 @@
+import threading
+import time
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.base.base import NO_DB_ALIAS
+from django.db.backends.postgresql import base
+
+from .creation import DatabaseCreation
+from sumtracker_project.metrics import (
+    DATABASE_POOL_ACQUIRE_DURATION, DATABASE_POOL_CONNECTIONS_IN_USE, DATABASE_POOL_REQUESTS_WAITING,
+    DATABASE_POOL_TIMEOUTS,
+)
+
+
+class PoolStats:
+    """
+    Counts the connections handed out by a pool and the time spent waiting for them.
+    """
+    def __init__(self):
+        self.acquired = 0
+        self.acquire_ms_total = 0.0
+        self.acquire_ms_max = 0.0
+        self._lock = threading.Lock()
+
+    def record_acquire(self, acquire_ms):
+        with self._lock:
+            self.acquired += 1
+            self.acquire_ms_total += acquire_ms
+            self.acquire_ms_max = max(self.acquire_ms_max, acquire_ms)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    PostgreSQL backend taking its connections from a psycopg_pool.ConnectionPool shared by all the
+    threads of the process, instead of opening one per request.
+
+    The pool is configured by OPTIONS["pool"], a dict of ConnectionPool arguments (min_size, max_size,
+    max_idle, timeout, ...), or True for its defaults. Without it the backend behaves like the stock
+    one. CONN_HEALTH_CHECKS makes the pool check a connection before handing it out, so connections
+    broken by a Postgres restart are replaced instead of failing the request that gets them.
+
+    The connections in use, the threads waiting for one and the time taken to acquire them are
+    published on /metrics (see DATABASE_POOL_* in sumtracker_project.metrics).
+
+    Methods:
+    - pool
+    - pool_stats()
+    - close_pool()
+    """
+    creation_class = DatabaseCreation
+    # ConnectionPool and PoolStats of each alias, shared by the per-thread wrappers
+    _connection_pools = {}
+    _pool_stats = {}
+    _pools_lock = threading.Lock()
+
+    @property
+    def pool(self):
+        pool_options = self.settings_dict["OPTIONS"].get("pool")
+        if self.alias == NO_DB_ALIAS or not pool_options:
+            return None
+        if self.alias not in self._connection_pools:
+            with self._pools_lock:
+                if self.alias not in self._connection_pools:
+                    self._connection_pools[self.alias] = self.create_pool(
+                        {} if pool_options is True else pool_options
+                    )
+                    self._pool_stats[self.alias] = PoolStats()
+        return self._connection_pools[self.alias]
+
+    def create_pool(self, pool_options):
+        if self.settings_dict["CONN_MAX_AGE"] != 0:
+            raise ImproperlyConfigured("A pooled database needs CONN_MAX_AGE = 0, the pool keeps the connections.")
+        try:
+            from psycopg_pool import ConnectionPool
+        except ImportError as e:
+            raise ImproperlyConfigured("OPTIONS['pool'] needs the psycopg-pool package.") from e
+        connect_kwargs = self.get_connection_params()
+        # pooled connections rest in autocommit, Django sets the mode it wants when taking one
+        connect_kwargs["autocommit"] = True
+        pool = ConnectionPool(
+            kwargs=connect_kwargs,
+            open=False,
+            check=ConnectionPool.check_connection if self.settings_dict["CONN_HEALTH_CHECKS"] else None,
+            name=self.alias,
+            **pool_options,
+        )
+        pool.open()
+        return pool
+
+    def get_connection_params(self):
+        conn_params = super().get_connection_params()
+        conn_params.pop("pool", None)
+        return conn_params
+
+    @base.async_unsafe
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+        from psycopg_pool import PoolTimeout
+
+        requests_waiting = DATABASE_POOL_REQUESTS_WAITING.labels(self.alias)
+        requests_waiting.inc()
+        started_at = time.perf_counter()
+        try:
+            connection = pool.getconn()
+        except PoolTimeout:
+            DATABASE_POOL_TIMEOUTS.labels(self.alias).inc()
+            raise
+        finally:
+            requests_waiting.dec()
+        acquire_ms = (time.perf_counter() - started_at) * 1000
+        self._pool_stats[self.alias].record_acquire(acquire_ms)
+        DATABASE_POOL_ACQUIRE_DURATION.labels(self.alias).observe(acquire_ms / 1000)
+        DATABASE_POOL_CONNECTIONS_IN_USE.labels(self.alias).inc()
+        isolation_level = self.settings_dict["OPTIONS"].get("isolation_level")
+        self.isolation_level = base.IsolationLevel(isolation_level or base.IsolationLevel.READ_COMMITTED)
+        if isolation_level is not None:
+            connection.isolation_level = self.isolation_level
+        return connection
+
+    def _close(self):
+        if self.connection is None or self.pool is None:
+            return super()._close()
+        with self.wrap_database_errors:
+            # the pool discards connections left broken or in a failed transaction
+            try:
+                self.connection._pool.putconn(self.connection)
+            finally:
+                self.connection = None
+                DATABASE_POOL_CONNECTIONS_IN_USE.labels(self.alias).dec()
+
+    def pool_stats(self):
+        """
+        Returns the usage of the pool: connections in use and idle, requests waiting for one and
+        the time taken to acquire them, None when the database is not pooled.
+        """
+        pool = self.pool
+        if pool is None:
+            return None
+        pool_stats = pool.get_stats()
+        stats = self._pool_stats[self.alias]
+        return {
+            "size": pool_stats["pool_size"],
+            "in_use": pool_stats["pool_size"] - pool_stats["pool_available"],
+            "idle": pool_stats["pool_available"],
+            "waiting": pool_stats["requests_waiting"],
+            "acquired": stats.acquired,
+            "acquire_ms_avg": stats.acquire_ms_total / stats.acquired if stats.acquired else 0.0,
+            "acquire_ms_max": stats.acquire_ms_max,
+            "timeouts": pool_stats.get("requests_errors", 0),
+            "connections_lost": pool_stats.get("connections_lost", 0),
+            "connection_errors": pool_stats.get("connections_errors", 0),
+        }
+
+    def close_pool(self):
+        """
+        Closes the pool of this alias, e.g. before its database is dropped. The next connection
+        opens a new one.
+        """
+        with self._pools_lock:
+            pool = self._connection_pools.pop(self.alias, None)
+            self._pool_stats.pop(self.alias, None)
+        if pool is not None:
+            self.close()
+            pool.close()
@@ -0,0 +1,16 @@
+from django.db.backends.postgresql import creation
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+    """
+    Closes the connection pool around the creation and destruction of the test database, since its
+    connections point to the database in use before and would keep the test database from being dropped.
+    """
+    def _create_test_db(self, verbosity, autoclobber, keepdb=False):
+        test_database_name = super()._create_test_db(verbosity, autoclobber, keepdb)
+        self.connection.close_pool()
+        return test_database_name
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        self.connection.close_pool()
+        super()._destroy_test_db(test_database_name, verbosity)
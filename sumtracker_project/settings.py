@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+import sys
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -45,6 +46,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # first, so its timings cover the other middleware too
+    'sumtracker_project.performance.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -52,6 +55,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # after AuthenticationMiddleware, it only profiles requests of staff users
+    'sumtracker_project.performance.ProfilerMiddleware',
 ]
 
 ROOT_URLCONF = 'sumtracker_project.urls'
@@ -80,12 +85,27 @@ WSGI_APPLICATION = 'sumtracker_project.wsgi.application'
 
 DATABASES = {
     'default': {
-        "ENGINE": "django.db.backends.postgresql",
+        # postgresql backend taking connections from a psycopg_pool.ConnectionPool, see OPTIONS["pool"]
+        "ENGINE": "sumtracker_project.postgresql_pool",
         "NAME": "postgres",
         "USER": "postgres",
         "PASSWORD": "postgres",
         "HOST": "db",
         "PORT": 5432,
+        # the pool keeps the connections open, Django hands them back at the end of each request
+        "CONN_MAX_AGE": 0,
+        # pooled connections are checked before use, replacing the ones broken by a Postgres restart
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            # psycopg_pool.ConnectionPool arguments: idle connections above min_size are closed after
+            # max_idle seconds, and a request waits at most timeout seconds for a connection
+            "pool": {
+                "min_size": 2,
+                "max_size": 20,
+                "max_idle": 300,
+                "timeout": 10,
+            },
+        },
     }
 }
 
@@ -133,3 +153,71 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
+
+# Resolved Suppliers kept in memory by SupplierService.update_or_create, so requests repeating
+# an unchanged Supplier read it by primary key instead of writing it. Each hit is checked against
+# the Supplier, so entries of Suppliers changed by another process are dropped on their next use,
+# or after the TTL (in seconds).
+SUPPLIER_CACHE_MAX_SIZE = 1024
+SUPPLIER_CACHE_TTL = 60
+
+# Serialized purchase orders returned by GET /purchase/orders/<id>/. Entries are only served for
+# the current version of their order, read on every request, so the in-process backend stays
+# correct with several processes even though writes only invalidate the cache of their own. It is
+# replaced by order.cache.DjangoPurchaseOrderCache, with the cache_alias and ttl OPTIONS, to share
+# one of the CACHES between processes.
+PURCHASE_ORDER_CACHE = {
+    "BACKEND": "order.cache.LocalPurchaseOrderCache",
+    "OPTIONS": {"max_size": 1000, "ttl": 300},
+}
+
+# Keeps a JSONB document with the API representation of every purchase order written through
+# the API, so GET /purchase/orders/<id>/ is a single row fetch. Orders without a current
+# document (imported, or changed outside the API) are served from the tables instead, and
+# `manage.py purchase_order_documents --rebuild` brings all documents up to date.
+PURCHASE_ORDER_DOCUMENTS = True
+
+# Lists and exports of purchase orders serialize values_list() rows with precompiled converters
+# (sumtracker_project.row_serializer) instead of model instances with the DRF serializers. The
+# output is the same, `manage.py benchmark_serializers` compares both.
+FAST_SERIALIZATION = True
+
+# Months of partitions `manage.py purchase_order_partitions --create` keeps ahead of the current one,
+# once purchase_orders and line_items are partitioned by month with `--convert`. Orders can only be
+# written into an existing partition, so the command is meant to run monthly, e.g. from cron.
+PURCHASE_ORDER_PARTITIONS_AHEAD = 3
+
+# Days of purchase order changes kept for GET /purchase/orders/changes/, pruned by
+# `manage.py prune_purchase_order_changes`. Change cursors older than that are refused, their
+# clients have to sync in full again.
+PURCHASE_ORDER_CHANGES_RETENTION_DAYS = 30
+
+# PerformanceMiddleware logs every request with its timings, and requests taking at least
+# SLOW_REQUEST_THRESHOLD_MS milliseconds as warnings listing their SLOW_REQUEST_LOGGED_QUERIES
+# slowest SQL statements.
+SLOW_REQUEST_THRESHOLD_MS = 500
+SLOW_REQUEST_LOGGED_QUERIES = 5
+
+# Requests of staff users sending the REQUEST_PROFILER_HEADER header are run under cProfile, and
+# the profile with a summary of its REQUEST_PROFILER_TOP_FUNCTIONS slowest functions is saved to
+# REQUEST_PROFILER_DIR. Off, the profiler is not part of the middleware chain at all.
+REQUEST_PROFILER_ENABLED = False
+REQUEST_PROFILER_HEADER = "X-Profile"
+REQUEST_PROFILER_DIR = BASE_DIR / "profiles"
+REQUEST_PROFILER_TOP_FUNCTIONS = 40
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        # test runs only keep the slow request warnings
+        "sumtracker_project.performance": {
+            "handlers": ["console"],
+            "level": "WARNING" if sys.argv[1:2] == ["test"] else "INFO",
+            "propagate": False,
+        },
+    },
+}
@@ -0,0 +1,59 @@
+from django.urls import reverse
+from prometheus_client import REGISTRY
+from rest_framework.test import APITestCase
+
+from order.tests.factory.purchase_order import PurchaseOrderFactory
+from supplier.tests.factory.line_item import LineItemFactory
+
+
+def get_sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsTest(APITestCase):
+    def setUp(self) -> None:
+        self.purchase_order = PurchaseOrderFactory.create()
+        LineItemFactory.create_batch(size=2, purchase_order=self.purchase_order)
+
+    def test_service_methods_are_timed(self):
+        calls = get_sample(
+            "service_method_duration_seconds_count", service="PurchaseOrderAPIService", method="get_by_id"
+        )
+
+        self.client.get(path=reverse('purchase_order_view', kwargs={'purchase_order_id': self.purchase_order.id}))
+        response = self.client.get(path=reverse('metrics'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"service_method_duration_seconds_bucket", response.content)
+        self.assertEqual(
+            get_sample("service_method_duration_seconds_count", service="PurchaseOrderAPIService", method="get_by_id"),
+            calls + 1,
+        )
+
+    def test_errors_are_counted_by_exception_type(self):
+        labels = {"service": "PurchaseOrderService", "method": "get_version_by_id", "exception": "PurchaseOrderNotFound"}
+        errors = get_sample("service_method_errors_total", **labels)
+
+        self.client.get(path=reverse('purchase_order_view', kwargs={'purchase_order_id': 9999}))
+
+        self.assertEqual(get_sample("service_method_errors_total", **labels), errors + 1)
+
+    def test_rows_written_and_line_items_of_created_orders_are_recorded(self):
+        request_data = {
+            "supplier": {"id": None, "name": "metrics supplier", "email": "metrics@example.com"},
+            "line_items": [
+                {"item_name": f"item {i}", "quantity": 1, "price_without_tax": "10.00",
+                 "tax_name": "GST 5%", "tax_amount": "0.50"}
+                for i in range(3)
+            ],
+        }
+        transactions = get_sample("transaction_rows_written_count", operation="create")
+        rows_written = get_sample("transaction_rows_written_sum", operation="create")
+        line_items = get_sample("purchase_order_line_items_sum")
+
+        self.client.post(path=reverse('purchase_order_creation'), data=request_data, format='json')
+
+        self.assertEqual(get_sample("transaction_rows_written_count", operation="create"), transactions + 1)
+        # the order, its three line items and its document, the supplier is upserted by a CTE
+        self.assertGreaterEqual(get_sample("transaction_rows_written_sum", operation="create") - rows_written, 5)
+        self.assertEqual(get_sample("purchase_order_line_items_sum") - line_items, 3)
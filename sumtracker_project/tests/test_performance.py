@@ -0,0 +1,107 @@
+import json
+import re
+import tempfile
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from order.tests.factory.purchase_order import PurchaseOrderFactory
+from supplier.tests.factory.line_item import LineItemFactory
+from sumtracker_project.performance import PerformanceMiddleware
+
+
+class PerformanceMiddlewareTest(APITestCase):
+    def setUp(self) -> None:
+        self.purchase_order = PurchaseOrderFactory.create()
+        LineItemFactory.create_batch(size=2, purchase_order=self.purchase_order)
+
+    def test_response_carries_server_timing(self):
+        with self.assertLogs("sumtracker_project.performance", level="INFO") as logs:
+            response = self.client.get(path=reverse('purchase_order_creation'))
+
+        server_timing = dict(
+            re.match(r"(\w+);(.*)", metric).groups() for metric in response["Server-Timing"].split(", ")
+        )
+        log_data = json.loads(logs.records[0].getMessage())
+        self.assertEqual(set(server_timing), {"total", "db", "serialize", "render", "size"})
+        self.assertIn(f'desc="{log_data["queries"]} queries"', server_timing["db"])
+        self.assertEqual(server_timing["size"], f'desc="{len(response.content)} bytes"')
+        self.assertEqual(log_data["status"], 200)
+        self.assertEqual(log_data["queries"], 3)
+        self.assertGreater(log_data["serialize_ms"], 0)
+        self.assertGreater(log_data["render_ms"], 0)
+
+    async def test_async_request_is_measured_without_leaving_the_event_loop(self):
+        path = reverse('purchase_order_async_view', kwargs={'purchase_order_id': self.purchase_order.id})
+
+        with self.assertLogs("sumtracker_project.performance", level="INFO") as logs:
+            response = await self.async_client.get(path=path)
+
+        log_data = json.loads(logs.records[0].getMessage())
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(f'desc="{log_data["queries"]} queries"', response["Server-Timing"])
+        self.assertGreater(log_data["queries"], 0)
+        self.assertTrue(iscoroutinefunction(PerformanceMiddleware(self.async_client.handler.get_response_async)))
+
+    @override_settings(SLOW_REQUEST_THRESHOLD_MS=0, SLOW_REQUEST_LOGGED_QUERIES=2)
+    def test_slow_request_logs_its_slowest_queries(self):
+        with self.assertLogs("sumtracker_project.performance", level="WARNING") as logs:
+            self.client.get(path=reverse('purchase_order_creation'))
+
+        log_data = json.loads(logs.records[0].getMessage())
+        self.assertEqual(len(log_data["slowest_queries"]), 2)
+        self.assertGreaterEqual(log_data["slowest_queries"][0]["ms"], log_data["slowest_queries"][1]["ms"])
+
+
+class ProfilerMiddlewareTest(APITestCase):
+    def setUp(self) -> None:
+        self.purchase_order = PurchaseOrderFactory.create()
+        self.path = reverse('purchase_order_view', kwargs={'purchase_order_id': self.purchase_order.id})
+        self.profile_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.profile_dir.cleanup)
+        self.user = User.objects.create_user(username="staff", is_staff=True)
+
+    def get_with_profiler(self, **settings):
+        with override_settings(REQUEST_PROFILER_ENABLED=True, REQUEST_PROFILER_DIR=self.profile_dir.name, **settings):
+            return self.client.get(path=self.path, HTTP_X_PROFILE="1")
+
+    def test_request_of_staff_user_with_header_is_profiled(self):
+        self.client.force_login(self.user)
+
+        response = self.get_with_profiler()
+
+        profile = Path(self.profile_dir.name) / response["X-Profile"]
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(profile.with_suffix(".prof").exists())
+        self.assertIn("(get_by_id)", profile.with_suffix(".txt").read_text())
+
+    def test_request_of_other_user_is_not_profiled(self):
+        self.user.is_staff = False
+        self.user.save()
+        self.client.force_login(self.user)
+
+        response = self.get_with_profiler()
+
+        self.assertNotIn("X-Profile", response)
+        self.assertEqual(list(Path(self.profile_dir.name).iterdir()), [])
+
+    def test_disabled_profiler_is_not_in_the_middleware_chain(self):
+        self.client.force_login(self.user)
+
+        response = self.client.get(path=self.path, HTTP_X_PROFILE="1")
+
+        self.assertNotIn("X-Profile", response)
+
+    async def test_async_request_of_staff_user_with_header_is_profiled(self):
+        await self.async_client.aforce_login(self.user)
+        path = reverse('purchase_order_async_view', kwargs={'purchase_order_id': self.purchase_order.id})
+
+        with override_settings(REQUEST_PROFILER_ENABLED=True, REQUEST_PROFILER_DIR=self.profile_dir.name):
+            response = await self.async_client.get(path=path, headers={"X-Profile": "1"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue((Path(self.profile_dir.name) / response["X-Profile"]).with_suffix(".prof").exists())
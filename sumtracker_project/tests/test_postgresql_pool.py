@@ -0,0 +1,50 @@
+from django.db import connection
+from django.test import TransactionTestCase
+from django.urls import reverse
+from prometheus_client import REGISTRY
+
+
+class PostgresqlPoolTest(TransactionTestCase):
+    def get_backend_pid(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_backend_pid()")
+            return cursor.fetchone()[0]
+
+    def test_closed_connections_go_back_to_the_pool(self):
+        backend_pids = set()
+        for _ in range(5):
+            backend_pids.add(self.get_backend_pid())
+            self.assertEqual(connection.pool_stats()["in_use"], 1)
+            connection.close()
+
+        self.assertLessEqual(len(backend_pids), connection.pool_stats()["size"])
+        self.assertEqual(connection.pool_stats()["in_use"], 0)
+        self.assertGreaterEqual(connection.pool_stats()["acquired"], 5)
+
+    def test_pool_usage_is_published_on_metrics(self):
+        connection.close()
+        acquired = REGISTRY.get_sample_value("database_pool_acquire_duration_seconds_count", {"database": "default"}) or 0
+
+        self.get_backend_pid()
+        in_use = REGISTRY.get_sample_value("database_pool_connections_in_use", {"database": "default"})
+        connection.close()
+        response = self.client.get(path=reverse('metrics'))
+
+        self.assertEqual(in_use, 1)
+        self.assertEqual(REGISTRY.get_sample_value("database_pool_requests_waiting", {"database": "default"}), 0)
+        self.assertGreaterEqual(
+            REGISTRY.get_sample_value("database_pool_acquire_duration_seconds_count", {"database": "default"}),
+            acquired + 1,
+        )
+        self.assertIn(b'database_pool_connections_in_use{database="default"}', response.content)
+
+    def test_connection_terminated_by_the_server_is_replaced(self):
+        backend_pid = self.get_backend_pid()
+        connection.close()
+        # what a Postgres restart does to the idle connections of the pool
+        with connection.pool.connection() as other_connection:
+            other_connection.execute("SELECT pg_terminate_backend(%s)", [backend_pid])
+
+        for _ in range(connection.pool_stats()["size"]):
+            self.assertNotEqual(self.get_backend_pid(), backend_pid)
+            connection.close()
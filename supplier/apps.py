@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class SupplierConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'supplier'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .services import supplier  # noqa: F401, evicts supplier_cache on suppliers_changed
@@ -0,0 +1,35 @@
+import sys
+
+from django.db import migrations
+
+from supplier.services.search_index import TrigramIndexService
+
+
+def create_trigram_indexes(apps, schema_editor):
+    trigram_index_service = TrigramIndexService()
+    if not trigram_index_service.is_available():
+        # The searches still work without pg_trgm, through sequential scans, so the migration does not
+        # fail, but the indexes have to be created by the command once the extension is installed.
+        sys.stderr.write(
+            "\n  pg_trgm is not available, the trigram search indexes were not created. Install the "
+            "PostgreSQL contrib package, then run: python manage.py create_trigram_indexes\n"
+        )
+        return
+    trigram_index_service.create_indexes()
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    TrigramIndexService().drop_indexes()
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY does not block writes on large tables but cannot run in a transaction
+    atomic = False
+
+    dependencies = [
+        ('supplier', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
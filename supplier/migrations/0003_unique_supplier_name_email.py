@@ -0,0 +1,36 @@
+# Generated by Django 5.0.1 on 2026-10-18 09:35
+
+from django.db import migrations, models
+
+# Suppliers used to be matched by name and email without a constraint, so duplicates may exist.
+# The lowest id of every (name, email) group is kept, matching the Supplier lookups so far,
+# and the purchase orders of the other ones are moved over to it before they are deleted.
+MERGE_DUPLICATE_SUPPLIERS = """
+CREATE TEMPORARY TABLE duplicate_suppliers ON COMMIT DROP AS
+SELECT id, kept_id
+FROM (SELECT id, min(id) OVER (PARTITION BY name, email) AS kept_id FROM suppliers) grouped
+WHERE id <> kept_id;
+
+UPDATE purchase_orders
+SET supplier_id = duplicate_suppliers.kept_id
+FROM duplicate_suppliers
+WHERE purchase_orders.supplier_id = duplicate_suppliers.id;
+
+DELETE FROM suppliers USING duplicate_suppliers WHERE suppliers.id = duplicate_suppliers.id;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0002_initial'),
+        ('supplier', '0002_trigram_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(MERGE_DUPLICATE_SUPPLIERS, reverse_sql=migrations.RunSQL.noop),
+        migrations.AddConstraint(
+            model_name='supplier',
+            constraint=models.UniqueConstraint(fields=('name', 'email'), name='unique_supplier_name_email'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.0.1 on 2026-10-18 10:40
+
+from django.db import migrations, models
+
+
+# Only adds the column, nullable so that no row is rewritten under the lock of ADD COLUMN. The
+# existing line items are backfilled in batches by 0005 and NOT NULL is enforced by 0006.
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0007_supplier_daily_spend'),
+        ('supplier', '0003_unique_supplier_name_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lineitem',
+            name='order_time',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.0.1 on 2026-10-18 10:41
+
+from django.db import migrations, transaction
+
+BATCH_SIZE = 10000
+
+# Copies the order_time of the purchase orders onto one id range of their line items
+BACKFILL_ORDER_TIME = """
+UPDATE line_items
+SET order_time = purchase_orders.order_time
+FROM purchase_orders
+WHERE purchase_orders.id = line_items.purchase_order_id
+    AND line_items.id >= %s AND line_items.id < %s AND line_items.order_time IS NULL
+"""
+
+# Statement trigger of order migrations 0005 and 0008 bumping the version and updated_at of the
+# orders of updated line items, which the backfill leaves unchanged
+TOUCH_TRIGGER = "line_items_touch_purchase_orders_on_update"
+
+
+def backfill_order_time(apps, schema_editor):
+    """
+    Backfills the line items BATCH_SIZE ids at a time. The migration is not atomic, so every batch
+    commits on its own and only holds its locks for the time of one batch.
+
+    The touch trigger is disabled within each batch only, so other transactions never see it
+    disabled, and the orders keep their versions, ETags, documents and change feed entries.
+    Disabling it locks out other writes to line_items until the batch commits.
+    """
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT min(id), max(id) FROM line_items")
+        min_id, max_id = cursor.fetchone()
+        if min_id is None:
+            return
+        for start_id in range(min_id, max_id + 1, BATCH_SIZE):
+            with transaction.atomic(using=schema_editor.connection.alias):
+                cursor.execute(f"ALTER TABLE line_items DISABLE TRIGGER {TOUCH_TRIGGER}")
+                cursor.execute(BACKFILL_ORDER_TIME, [start_id, start_id + BATCH_SIZE])
+                cursor.execute(f"ALTER TABLE line_items ENABLE TRIGGER {TOUCH_TRIGGER}")
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        # runs after the triggers it disables have their final definitions
+        ('order', '0009_purchase_order_changes'),
+        ('supplier', '0004_line_item_order_time'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_order_time, reverse_code=migrations.RunPython.noop),
+    ]
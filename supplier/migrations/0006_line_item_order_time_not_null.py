@@ -0,0 +1,41 @@
+# Generated by Django 5.0.1 on 2026-10-18 10:42
+
+from django.db import migrations, models
+
+# SET NOT NULL scans the whole table under an ACCESS EXCLUSIVE lock, unless a valid CHECK constraint
+# already proves it. The constraint is added NOT VALID, which only takes a brief lock, and validated
+# separately under a lock that lets reads and writes go on. The migration is not atomic so that each
+# statement commits, and releases its lock, on its own.
+ADD_NOT_NULL_CHECK = """
+ALTER TABLE line_items ADD CONSTRAINT line_items_order_time_not_null CHECK (order_time IS NOT NULL) NOT VALID
+"""
+VALIDATE_NOT_NULL_CHECK = "ALTER TABLE line_items VALIDATE CONSTRAINT line_items_order_time_not_null"
+SET_NOT_NULL = "ALTER TABLE line_items ALTER COLUMN order_time SET NOT NULL"
+DROP_NOT_NULL_CHECK = "ALTER TABLE line_items DROP CONSTRAINT line_items_order_time_not_null"
+DROP_NOT_NULL = "ALTER TABLE line_items ALTER COLUMN order_time DROP NOT NULL"
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('supplier', '0005_backfill_line_item_order_time'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(ADD_NOT_NULL_CHECK, reverse_sql=migrations.RunSQL.noop),
+                migrations.RunSQL(VALIDATE_NOT_NULL_CHECK, reverse_sql=migrations.RunSQL.noop),
+                migrations.RunSQL(SET_NOT_NULL, reverse_sql=DROP_NOT_NULL),
+                migrations.RunSQL(DROP_NOT_NULL_CHECK, reverse_sql=migrations.RunSQL.noop),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='lineitem',
+                    name='order_time',
+                    field=models.DateTimeField(editable=False),
+                ),
+            ],
+        ),
+    ]
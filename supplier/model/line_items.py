@@ -12,12 +12,31 @@ class LineItem(models.Model):
     tax_name = models.CharField(max_length=124)
     tax_total = models.DecimalField(max_digits=10, decimal_places=2)
     line_total = models.DecimalField(max_digits=10, decimal_places=2)
+    # once the tables are partitioned the foreign key in the database is (purchase_order_id, order_time)
+    # referencing purchase_orders(id, order_time), not the one on id the model state shows
     purchase_order = models.ForeignKey(PurchaseOrder, on_delete=models.CASCADE, help_text="Purchase Order")
+    # order_time of the purchase order, the partition key of line_items when the tables are partitioned
+    # (see PurchaseOrderPartitionService), which also lets reads of the line items of known orders be pruned
+    order_time = models.DateTimeField(editable=False)
 
     def save(self, *args, **kwargs):
-        self.line_total = Decimal(str(self.tax_total)) + Decimal(str(self.price_without_tax))
+        self.set_line_total()
+        self.set_order_time()
         super(LineItem, self).save(*args, **kwargs)
 
+    def set_line_total(self):
+        # bulk_create() and bulk_update() skip save(), so they have to call this themselves
+        self.line_total = self.calculate_line_total(self.tax_total, self.price_without_tax)
+
+    def set_order_time(self):
+        # like set_line_total(), left to the callers of bulk_create()
+        if self.order_time is None:
+            self.order_time = self.purchase_order.order_time
+
+    @staticmethod
+    def calculate_line_total(tax_total, price_without_tax):
+        return Decimal(str(tax_total)) + Decimal(str(price_without_tax))
+
     class Meta:
         db_table = "line_items"
         verbose_name = "Line Item"
@@ -3,10 +3,13 @@ from django.db import models
 
 class Supplier(models.Model):
     name = models.CharField(max_length=256, blank=True)
-    # considering email is not unique
+    # email alone is not unique, a Supplier is identified by its name and email together
     email = models.EmailField(max_length=256, null=False)
 
     class Meta:
         db_table = "suppliers"
         verbose_name = "Supplier"
         verbose_name_plural = "Suppliers"
+        constraints = [
+            models.UniqueConstraint(fields=["name", "email"], name="unique_supplier_name_email"),
+        ]
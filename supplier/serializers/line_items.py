@@ -1,5 +1,7 @@
 from rest_framework import serializers
 
+from sumtracker_project.row_serializer import RowSerializer
+
 
 class LineItemSerializer(serializers.Serializer):
     id = serializers.IntegerField()
@@ -9,3 +11,7 @@ class LineItemSerializer(serializers.Serializer):
     tax_name = serializers.CharField()
     tax_total = serializers.DecimalField(max_digits=10, decimal_places=2)
     line_total = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+
+# LineItemSerializer for rows of LineItem.objects.values_list(*line_item_row_serializer.columns)
+line_item_row_serializer = RowSerializer(LineItemSerializer)
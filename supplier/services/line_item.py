@@ -1,101 +1,212 @@
 from ..exceptions import LineItemNotFound
 from ..model.line_items import LineItem
-from ..serializers.line_items import LineItemSerializer
+from ..serializers.line_items import LineItemSerializer, line_item_row_serializer
+from sumtracker_project.metrics import instrument_service
 
 
+@instrument_service
 class LineItemService:
     """
         Service class to handle operations related to LineItem instances in Purchase Orders.
 
         Methods:
         - create_all_line_items_for_purchase_order(line_items, purchase_order)
+        - create_line_items_for_purchase_orders(line_items_by_purchase_order)
         - create_line_item_for_purchase_order(line_item, purchase_order)
+        - build_line_item_for_purchase_order(line_item, purchase_order)
         - get_items_for_purchase_order(purchase_order)
+        - get_items_for_purchase_orders(purchase_orders)
+        - get_item_rows_for_purchase_orders(purchase_order_ids, order_times)
+        - aget_item_rows_for_purchase_orders(purchase_order_ids, order_times)
+        - get_item_rows_queryset(purchase_order_ids, order_times)
+        - group_item_rows(purchase_order_ids, rows)
         - update_all_line_items_for_purchase_order(line_items, purchase_order)
-        - update_line_item_for_purchase_order_by_id(line_item_id, purchase_order, line_item)
-        - delete_deprecated_line_items_for_purchase_order(valid_line_item_ids, purchase_order)
+        - get_existing_line_item(existing_line_items, line_item_id)
+        - apply_line_item_changes(line_item_object, line_item)
     """
+    # rows per statement of bulk_create() and bulk_update()
+    bulk_batch_size = 1000
+    updatable_fields = ["item_name", "quantity", "price_without_tax", "tax_name", "tax_total", "line_total"]
+
     def create_all_line_items_for_purchase_order(self, line_items, purchase_order):
         """
-        Creates LineItem instances for a Purchase Order.
+        Creates LineItem instances for a Purchase Order with batched multi-row INSERTs.
         """
-        # Optimisation: We can insert via .bulk_create() as well
-        line_items_objects = []
-        for line_item in line_items:
-            line_items_objects.append(self.create_line_item_for_purchase_order(line_item, purchase_order))
+        line_items_objects = [
+            self.build_line_item_for_purchase_order(line_item, purchase_order) for line_item in line_items
+        ]
+        LineItem.objects.bulk_create(line_items_objects, batch_size=self.bulk_batch_size)
         serialized_line_items = LineItemSerializer(line_items_objects, many=True)
         return serialized_line_items.data
 
+    def create_line_items_for_purchase_orders(self, line_items_by_purchase_order):
+        """
+        Creates the LineItems of many Purchase Orders with batched multi-row INSERTs.
+
+        Args:
+        - line_items_by_purchase_order (list): (purchase_order, line_items) pairs.
+        """
+        line_items_objects = [
+            self.build_line_item_for_purchase_order(line_item, purchase_order)
+            for purchase_order, line_items in line_items_by_purchase_order
+            for line_item in line_items
+        ]
+        LineItem.objects.bulk_create(line_items_objects, batch_size=self.bulk_batch_size)
+        return line_items_objects
+
     def create_line_item_for_purchase_order(self, line_item, purchase_order):
         """
         Creates a LineItem for a Purchase Order.
         """
-        line_item = LineItem.objects.create(
+        line_item = self.build_line_item_for_purchase_order(line_item, purchase_order)
+        line_item.save()
+        return line_item
+
+    def build_line_item_for_purchase_order(self, line_item, purchase_order):
+        """
+        Builds an unsaved LineItem for a Purchase Order with its line_total and order_time already set.
+        """
+        line_item = LineItem(
             item_name=line_item["item_name"],
             quantity=line_item["quantity"],
             price_without_tax=line_item["price_without_tax"],
             tax_name=line_item["tax_name"],
             tax_total=line_item["tax_amount"],
-            purchase_order=purchase_order
+            purchase_order=purchase_order,
+            order_time=purchase_order.order_time
         )
+        line_item.set_line_total()
         return line_item
 
     def get_items_for_purchase_order(self, purchase_order):
         """
         Retrieves LineItems for a specific Purchase Order.
         """
-        line_items = LineItem.objects.filter(purchase_order=purchase_order)
+        line_items = LineItem.objects.filter(purchase_order=purchase_order, order_time=purchase_order.order_time)
         serialized_line_items = LineItemSerializer(line_items, many=True)
         return serialized_line_items.data
 
+    def get_items_for_purchase_orders(self, purchase_orders):
+        """
+        Retrieves LineItems for many Purchase Orders with a single query.
+
+        Returns:
+        - dict: Serialized LineItems grouped by purchase order id.
+        """
+        line_items_by_purchase_order = {purchase_order.id: [] for purchase_order in purchase_orders}
+        if not line_items_by_purchase_order:
+            return line_items_by_purchase_order
+        line_items = list(
+            LineItem.objects.filter(
+                purchase_order_id__in=line_items_by_purchase_order.keys(),
+                order_time__in={purchase_order.order_time for purchase_order in purchase_orders},
+            ).order_by("id")
+        )
+        serialized_line_items = LineItemSerializer(line_items, many=True).data
+        for line_item, serialized_line_item in zip(line_items, serialized_line_items):
+            line_items_by_purchase_order[line_item.purchase_order_id].append(serialized_line_item)
+        return line_items_by_purchase_order
+
+    def get_item_rows_for_purchase_orders(self, purchase_order_ids, order_times=None):
+        """
+        Same as get_items_for_purchase_orders, reading row tuples serialized by line_item_row_serializer
+        instead of building LineItem instances and running LineItemSerializer.
+        The order_times of the Purchase Orders, when known, narrow the read down to their partitions.
+        """
+        if not purchase_order_ids:
+            return {}
+        rows = list(self.get_item_rows_queryset(purchase_order_ids, order_times))
+        return self.group_item_rows(purchase_order_ids, rows)
+
+    async def aget_item_rows_for_purchase_orders(self, purchase_order_ids, order_times=None):
+        """
+        Async version of get_item_rows_for_purchase_orders().
+        """
+        if not purchase_order_ids:
+            return {}
+        rows = [row async for row in self.get_item_rows_queryset(purchase_order_ids, order_times)]
+        return self.group_item_rows(purchase_order_ids, rows)
+
+    def get_item_rows_queryset(self, purchase_order_ids, order_times=None):
+        line_items = LineItem.objects.filter(purchase_order_id__in=purchase_order_ids)
+        if order_times is not None:
+            line_items = line_items.filter(order_time__in=set(order_times))
+        # the purchase order id trails the serialized columns, which the row serializer ignores
+        return line_items.order_by("id").values_list(*line_item_row_serializer.columns, "purchase_order_id")
+
+    def group_item_rows(self, purchase_order_ids, rows):
+        line_items_by_purchase_order = {purchase_order_id: [] for purchase_order_id in purchase_order_ids}
+        for row, serialized_line_item in zip(rows, line_item_row_serializer.serialize_rows(rows)):
+            line_items_by_purchase_order[row[-1]].append(serialized_line_item)
+        return line_items_by_purchase_order
+
     def update_all_line_items_for_purchase_order(self, line_items, purchase_order):
         """
         Updates LineItems for a Purchase Order.
+
+        The existing LineItems are loaded once and diffed against the request: changed rows are
+        written with one bulk UPDATE, new rows with one bulk INSERT and missing rows with one DELETE,
+        while unchanged rows are not written at all.
         """
-        valid_line_items_for_purchase_order = []
+        existing_line_items = {
+            line_item.id: line_item
+            for line_item in LineItem.objects.filter(purchase_order=purchase_order, order_time=purchase_order.order_time)
+        }
         updated_line_items = []
+        changed_line_items = {}
+        new_line_items = []
         for line_item in line_items:
             line_item_id = line_item.get("id")
             if line_item_id:
-                line_item_object = self.update_line_item_for_purchase_order_by_id(
-                    line_item_id=line_item_id,
-                    purchase_order=purchase_order,
-                    line_item=line_item
-                )
+                line_item_object = self.get_existing_line_item(existing_line_items, line_item_id)
+                if self.apply_line_item_changes(line_item_object, line_item):
+                    changed_line_items[line_item_object.id] = line_item_object
             else:
-                line_item_object = self.create_line_item_for_purchase_order(
-                    purchase_order=purchase_order,
-                    line_item=line_item
-                )
-            valid_line_items_for_purchase_order.append(line_item_object.id)
+                line_item_object = self.build_line_item_for_purchase_order(line_item, purchase_order)
+                new_line_items.append(line_item_object)
             updated_line_items.append(line_item_object)
-        self.delete_deprecated_line_items_for_purchase_order(
-            valid_line_item_ids=valid_line_items_for_purchase_order,
-            purchase_order=purchase_order
-        )
+
+        if changed_line_items:
+            LineItem.objects.bulk_update(
+                changed_line_items.values(), fields=self.updatable_fields, batch_size=self.bulk_batch_size
+            )
+        if new_line_items:
+            LineItem.objects.bulk_create(new_line_items, batch_size=self.bulk_batch_size)
+        deprecated_line_item_ids = existing_line_items.keys() - {line_item.id for line_item in updated_line_items}
+        if deprecated_line_item_ids:
+            LineItem.objects.filter(id__in=deprecated_line_item_ids, order_time=purchase_order.order_time).delete()
         serialized_line_items = LineItemSerializer(updated_line_items, many=True)
         return serialized_line_items.data
 
-    def update_line_item_for_purchase_order_by_id(self, line_item_id, purchase_order, line_item):
+    def get_existing_line_item(self, existing_line_items, line_item_id):
         """
-        Updates a LineItem by ID.
+        Picks a LineItem of the Purchase Order out of its already loaded LineItems by ID.
         """
         try:
-            line_item_object = LineItem.objects.get(purchase_order=purchase_order, id=line_item_id)
-        except LineItem.DoesNotExist:
+            return existing_line_items[int(line_item_id)]
+        except (KeyError, TypeError, ValueError):
             raise LineItemNotFound(line_item_id)
-        line_item_object.item_name = line_item["item_name"]
-        line_item_object.quantity = line_item["quantity"]
-        line_item_object.price_without_tax = line_item["price_without_tax"]
-        line_item_object.tax_name = line_item["tax_name"]
-        line_item_object.tax_total = line_item["tax_amount"]
-        line_item_object.save()
-        return line_item_object
 
-    def delete_deprecated_line_items_for_purchase_order(self, valid_line_item_ids, purchase_order):
+    def apply_line_item_changes(self, line_item_object, line_item):
         """
-        Deletes deprecated LineItems.
+        Copies the requested values onto a LineItem.
+
+        Returns:
+        - bool: Whether any value differs from the stored one.
         """
-        deprecated_line_items = LineItem.objects.filter(purchase_order=purchase_order).exclude(id__in=valid_line_item_ids)
-        if deprecated_line_items.exists():
-            deprecated_line_items.delete()
+        requested_values = {
+            "item_name": line_item["item_name"],
+            "quantity": line_item["quantity"],
+            "price_without_tax": line_item["price_without_tax"],
+            "tax_name": line_item["tax_name"],
+            "tax_total": line_item["tax_amount"],
+        }
+        changed = False
+        for field_name, value in requested_values.items():
+            value = LineItem._meta.get_field(field_name).to_python(value)
+            if getattr(line_item_object, field_name) != value:
+                setattr(line_item_object, field_name, value)
+                changed = True
+        if changed:
+            line_item_object.set_line_total()
+        return changed
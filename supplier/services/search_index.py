@@ -0,0 +1,69 @@
+from django.db import connection
+
+from sumtracker_project.metrics import instrument_service
+
+# Substring searches on these columns are compiled by Django as UPPER(column::text) LIKE UPPER('%term%'),
+# which trigram GIN indexes on the same expression can serve instead of a sequential scan.
+TRIGRAM_INDEXES = {
+    "suppliers_name_trgm_idx": ("suppliers", "name"),
+    "line_items_item_name_trgm_idx": ("line_items", "item_name"),
+}
+
+
+@instrument_service
+class TrigramIndexService:
+    """
+        Service class for the trigram GIN indexes of the supplier name and item name searches, which need
+        the pg_trgm extension. It ships with the contrib package, which not every server has installed, so
+        the indexes are created by supplier migration 0002 where it is available and by create_indexes()
+        once it has been installed.
+
+        Methods:
+        - is_available()
+        - get_missing_indexes()
+        - create_indexes()
+        - drop_indexes()
+    """
+    def is_available(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+            return cursor.fetchone() is not None
+
+    def get_missing_indexes(self):
+        """
+        Returns the names of the trigram indexes which do not exist, or are invalid after a failed
+        concurrent build.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_class.relname FROM pg_index JOIN pg_class ON pg_class.oid = pg_index.indexrelid "
+                "WHERE pg_class.relname = ANY(%s) AND pg_index.indisvalid",
+                [list(TRIGRAM_INDEXES)],
+            )
+            existing_indexes = {row[0] for row in cursor.fetchall()}
+        return [index_name for index_name in TRIGRAM_INDEXES if index_name not in existing_indexes]
+
+    def create_indexes(self):
+        """
+        Creates pg_trgm and the missing trigram indexes, without blocking writes to the tables.
+        Must run outside of a transaction.
+
+        Returns:
+        - list: Names of the indexes created.
+        """
+        missing_indexes = self.get_missing_indexes()
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            for index_name in missing_indexes:
+                table, column = TRIGRAM_INDEXES[index_name]
+                # an invalid index left by a failed build would be kept by IF NOT EXISTS
+                cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}")
+                cursor.execute(
+                    f"CREATE INDEX CONCURRENTLY {index_name} ON {table} USING gin (UPPER({column}) gin_trgm_ops)"
+                )
+        return missing_indexes
+
+    def drop_indexes(self):
+        with connection.cursor() as cursor:
+            for index_name in TRIGRAM_INDEXES:
+                cursor.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}")
@@ -1,7 +1,46 @@
+from django.conf import settings
+from django.db import connection, transaction
+from django.dispatch import receiver
+
+from sumtracker_project.lru_cache import LRUCache
+from sumtracker_project.metrics import instrument_service
 from ..model.supplier import Supplier
 from ..serializers.supplier import SupplierSerializer
+from ..signals import suppliers_changed
+
+# Uses the Supplier already holding the name and email, else renames the Supplier with the given id.
+# Returns NULL when neither exists, and whether a row was renamed.
+RENAME_SUPPLIER_SQL = """
+WITH existing AS (
+    SELECT id FROM suppliers WHERE id = %(id)s
+), holder AS (
+    SELECT id FROM suppliers WHERE name = %(name)s AND email = %(email)s
+), renamed AS (
+    UPDATE suppliers SET name = %(name)s, email = %(email)s
+    FROM existing
+    WHERE suppliers.id = existing.id AND NOT EXISTS (SELECT 1 FROM holder)
+    RETURNING suppliers.id
+)
+SELECT COALESCE((SELECT id FROM holder), (SELECT id FROM existing)), EXISTS (SELECT 1 FROM renamed)
+"""
+
+# Inserts the Supplier unless one with the name and email exists, returning its id either way
+UPSERT_SUPPLIER_SQL = """
+WITH inserted AS (
+    INSERT INTO suppliers (name, email) VALUES (%(name)s, %(email)s)
+    ON CONFLICT ON CONSTRAINT unique_supplier_name_email DO NOTHING
+    RETURNING id
+)
+SELECT id FROM inserted
+UNION ALL
+SELECT id FROM suppliers WHERE name = %(name)s AND email = %(email)s
+"""
 
+# Whether a Supplier still has the name and email a cached resolution was made for
+SUPPLIER_IS_CURRENT_SQL = "SELECT EXISTS (SELECT 1 FROM suppliers WHERE id = %s AND name = %s AND email = %s)"
 
+
+@instrument_service
 class SupplierService:
     """
         Service class for handling operations related to the Supplier model.
@@ -11,9 +50,15 @@ class SupplierService:
         - get_by_name(supplier_name_regex)
         - create(name, email)
         - update_or_create(supplier_id, name, email)
+        - upsert(supplier_id, name, email)
+        - is_current(supplier_id, name, email)
+        - bulk_update_or_create(suppliers_data)
         - get_serialized_supplier_object(supplier)
         - get_by_name_and_email(name, email)
+        - evict_from_cache(supplier_ids)
     """
+    # (supplier_id, name, email) of update_or_create calls -> id of the Supplier they resolved to
+    supplier_cache = LRUCache(max_size=settings.SUPPLIER_CACHE_MAX_SIZE, ttl=settings.SUPPLIER_CACHE_TTL)
 
     def get_by_id(self, supplier_id):
         """
@@ -43,15 +88,98 @@ class SupplierService:
     def update_or_create(self, supplier_id, name, email):
         """
         Updates or creates a Supplier instance.
+
+        The Supplier holding the name and email is used as it is, otherwise the Supplier with
+        supplier_id is renamed to them, otherwise a new one is inserted. Each case is a single
+        statement, and repeated calls with the same arguments are served from supplier_cache
+        with a primary key read checking the cached Supplier still has the name and email, instead
+        of a write.
         """
-        supplier = self.get_by_id(supplier_id) or self.get_by_name_and_email(name, email)
-        if supplier:
-            supplier.name = name
-            supplier.email = email
-            supplier.save()
-        else:
-            supplier = self.create(email=email, name=name)
-        return supplier
+        cache_key = (supplier_id, name, email)
+        resolved_id = self.supplier_cache.get(cache_key)
+        if resolved_id is not None and not self.is_current(resolved_id, name, email):
+            # renamed or deleted, e.g. by another process whose changes never evict this cache
+            self.supplier_cache.delete(cache_key)
+            resolved_id = None
+        if resolved_id is None:
+            resolved_id = self.upsert(supplier_id, name, email)
+            # a rolled back Supplier must not be handed out again
+            transaction.on_commit(lambda: self.supplier_cache.set(cache_key, resolved_id))
+        return Supplier.from_db(connection.alias, ["id", "name", "email"], [resolved_id, name, email])
+
+    def upsert(self, supplier_id, name, email):
+        """
+        Writes the Supplier update_or_create resolves to, returning its id.
+        """
+        params = {"name": name, "email": email}
+        with connection.cursor() as cursor:
+            if supplier_id:
+                params["id"] = Supplier._meta.pk.get_prep_value(supplier_id)
+                cursor.execute(RENAME_SUPPLIER_SQL, params)
+                resolved_id, renamed = cursor.fetchone()
+                if renamed:
+                    suppliers_changed.send(sender=Supplier, supplier_ids=[resolved_id])
+                if resolved_id is not None:
+                    return resolved_id
+            row = None
+            while row is None:
+                cursor.execute(UPSERT_SUPPLIER_SQL, params)
+                # empty when a concurrent transaction inserted the Supplier after this statement
+                # started, the next statement sees it
+                row = cursor.fetchone()
+        return row[0]
+
+    def is_current(self, supplier_id, name, email):
+        with connection.cursor() as cursor:
+            cursor.execute(SUPPLIER_IS_CURRENT_SQL, [supplier_id, name, email])
+            return cursor.fetchone()[0]
+
+    def bulk_update_or_create(self, suppliers_data):
+        """
+        Updates or creates the Suppliers of many requests at once.
+
+        Suppliers are resolved the same way as update_or_create does, by name and email first and
+        then by id, but with one lookup query per kind for all of them, one INSERT for the new
+        Suppliers and one UPDATE for the renamed ones.
+
+        Args:
+        - suppliers_data (list): dicts with supplier_id, name and email.
+
+        Returns:
+        - list: Supplier instances in the order of suppliers_data.
+        """
+        supplier_ids = {supplier_data["supplier_id"] for supplier_data in suppliers_data if supplier_data["supplier_id"]}
+        suppliers_by_id = Supplier.objects.in_bulk(supplier_ids)
+        names = {supplier_data["name"] for supplier_data in suppliers_data}
+        emails = {supplier_data["email"] for supplier_data in suppliers_data}
+        suppliers_by_name_and_email = {}
+        for supplier in Supplier.objects.filter(name__in=names, email__in=emails):
+            suppliers_by_name_and_email[(supplier.name, supplier.email)] = supplier
+
+        suppliers = []
+        new_suppliers = []
+        changed_suppliers = {}
+        for supplier_data in suppliers_data:
+            key = (supplier_data["name"], supplier_data["email"])
+            supplier = suppliers_by_name_and_email.get(key) or suppliers_by_id.get(supplier_data["supplier_id"])
+            if supplier is None:
+                supplier = Supplier(name=supplier_data["name"], email=supplier_data["email"])
+                new_suppliers.append(supplier)
+            elif (supplier.name, supplier.email) != key:
+                supplier.name, supplier.email = key
+                if supplier.id:
+                    changed_suppliers[supplier.id] = supplier
+            suppliers_by_name_and_email.setdefault(key, supplier)
+            suppliers.append(supplier)
+
+        # a Supplier inserted concurrently is taken over instead of failing on the unique constraint
+        Supplier.objects.bulk_create(
+            new_suppliers, update_conflicts=True, unique_fields=["name", "email"], update_fields=["name"]
+        )
+        Supplier.objects.bulk_update(changed_suppliers.values(), fields=["name", "email"])
+        if changed_suppliers:
+            suppliers_changed.send(sender=Supplier, supplier_ids=list(changed_suppliers))
+        return suppliers
 
     def get_serialized_supplier_object(self, supplier):
         """
@@ -65,3 +193,15 @@ class SupplierService:
         """
         supplier = Supplier.objects.filter(name=name, email=email).first()
         return supplier
+
+    def evict_from_cache(self, supplier_ids):
+        """
+        Drops the cached resolutions pointing to the given Suppliers after they changed.
+        """
+        supplier_ids = set(supplier_ids)
+        self.supplier_cache.delete_matching(lambda key, resolved_id: resolved_id in supplier_ids)
+
+
+@receiver(suppliers_changed)
+def evict_changed_suppliers_from_cache(sender, supplier_ids, **kwargs):
+    SupplierService().evict_from_cache(supplier_ids)
@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from .model.supplier import Supplier
+
+# Sent with the supplier_ids of changed Suppliers, including the ones SupplierService renames
+# with plain UPDATEs which do not send post_save, so caches holding Supplier data can drop it
+suppliers_changed = Signal()
+
+
+@receiver(post_save, sender=Supplier)
+@receiver(post_delete, sender=Supplier)
+def send_suppliers_changed(sender, instance, **kwargs):
+    suppliers_changed.send(sender=Supplier, supplier_ids=[instance.id])
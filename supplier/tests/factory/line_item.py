@@ -16,3 +16,4 @@ class LineItemFactory(factory.django.DjangoModelFactory):
     tax_name = fake.word()
     tax_total = fake.pydecimal(left_digits=2, right_digits=2, positive=True)
     line_total = price_without_tax + tax_total
+    order_time = factory.SelfAttribute("purchase_order.order_time")
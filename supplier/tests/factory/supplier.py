@@ -11,4 +11,5 @@ class SupplierFactory(factory.django.DjangoModelFactory):
         model = Supplier
 
     name = fake.name()
-    email = fake.email()
+    # name and email are unique together
+    email = factory.Sequence(lambda n: f"supplier{n}@{fake.domain_name()}")
@@ -0,0 +1,74 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from supplier.model.supplier import Supplier
+from supplier.services.supplier import SupplierService
+from supplier.tests.factory.supplier import SupplierFactory
+
+
+class SupplierServiceTest(TestCase):
+    def setUp(self) -> None:
+        self.supplier_service = SupplierService()
+        self.supplier_service.supplier_cache.clear()
+        self.supplier = SupplierFactory.create()
+
+    def tearDown(self) -> None:
+        self.supplier_service.supplier_cache.clear()
+
+    def test_update_or_create_with_unchanged_supplier_is_one_statement_without_writes(self):
+        row_version = self.get_row_version(self.supplier.id)
+        with CaptureQueriesContext(connection) as queries:
+            supplier = self.supplier_service.update_or_create(self.supplier.id, self.supplier.name, self.supplier.email)
+        self.assertEqual(supplier.id, self.supplier.id)
+        self.assertEqual(len(queries), 1)
+        # an UPDATE would have written a new version of the row
+        self.assertEqual(self.get_row_version(self.supplier.id), row_version)
+
+    def test_update_or_create_is_served_from_the_cache_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.supplier_service.update_or_create(None, "cached supplier", "cached@email.com")
+        with CaptureQueriesContext(connection) as queries:
+            supplier = self.supplier_service.update_or_create(None, "cached supplier", "cached@email.com")
+        # only the check of the cached Supplier, without the upsert
+        self.assertEqual(len(queries), 1)
+        self.assertTrue(queries[0]["sql"].startswith("SELECT EXISTS"))
+        self.assertEqual(supplier.name, "cached supplier")
+        self.assertEqual(Supplier.objects.filter(name="cached supplier").count(), 1)
+
+    def test_update_or_create_uses_the_supplier_holding_the_name_and_email(self):
+        other_supplier = SupplierFactory.create()
+        supplier = self.supplier_service.update_or_create(self.supplier.id, other_supplier.name, other_supplier.email)
+        self.assertEqual(supplier.id, other_supplier.id)
+        self.supplier.refresh_from_db()
+        self.assertNotEqual(self.supplier.email, other_supplier.email)
+
+    def test_update_or_create_renames_the_supplier_and_evicts_its_cache_entries(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.supplier_service.update_or_create(self.supplier.id, self.supplier.name, self.supplier.email)
+        supplier = self.supplier_service.update_or_create(self.supplier.id, "renamed supplier", self.supplier.email)
+        self.assertEqual(supplier.id, self.supplier.id)
+        self.assertEqual(Supplier.objects.get(id=self.supplier.id).name, "renamed supplier")
+        self.assertEqual(len(self.supplier_service.supplier_cache), 0)
+
+    def test_update_or_create_does_not_serve_a_supplier_renamed_by_another_process(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.supplier_service.update_or_create(None, self.supplier.name, self.supplier.email)
+        # an update of another process, which does not evict the cache of this one
+        Supplier.objects.filter(id=self.supplier.id).update(name="renamed elsewhere")
+        supplier = self.supplier_service.update_or_create(None, self.supplier.name, self.supplier.email)
+        self.assertNotEqual(supplier.id, self.supplier.id)
+        self.assertEqual(Supplier.objects.get(id=supplier.id).name, self.supplier.name)
+        self.assertEqual(Supplier.objects.get(id=self.supplier.id).name, "renamed elsewhere")
+        self.assertIsNone(self.supplier_service.supplier_cache.get((None, self.supplier.name, self.supplier.email)))
+
+    def test_update_or_create_inserts_a_supplier_once(self):
+        first = self.supplier_service.update_or_create(None, "new supplier", "new@email.com")
+        second = self.supplier_service.update_or_create(None, "new supplier", "new@email.com")
+        self.assertEqual(first.id, second.id)
+        self.assertEqual(Supplier.objects.filter(name="new supplier", email="new@email.com").count(), 1)
+
+    def get_row_version(self, supplier_id):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT ctid::text FROM suppliers WHERE id = %s", [supplier_id])
+            return cursor.fetchone()[0]